@@ -2,9 +2,14 @@
 import pandas as pd
 import re
 from collections import defaultdict
-import pickle
 import numpy as np
 from pdfExtract import clean_class_list
+from prereq_graph import PrereqGraph, OP_ADD_ALL, OP_PICK, OP_PICK_MIN, OP_ADD_BEST
+from schedule_engine import schedule_classes, SEMESTER_FIELDS, DEFAULT_SEMESTERS, DEFAULT_MAX_UNITS, DEFAULT_LAST_SEMESTER_UNITS
+from schedule_solver import optimize_schedule
+from schedule_cache import schedule_cache
+from requirement_parser import parse_requirements, resolve_requirements
+from catalog import catalog
 
 # Examples are based on this PDF Agreement: https://assist.org/transfer/report/26298705
 
@@ -34,6 +39,9 @@ def createSubjects(classList):
 # Purpose: Use a disorganized list extracted from ASSIST PDF and clean it by uaing the logic of the conjuctions "AND" & "OR" in the agreement correctly to find what classes are required.
 # EX of disorganized list from ASSIST PDF: ['BIOL11A(5.00)', 'CHEM1A(5.00) & CHEM1B(5.00) OR ', 'CHEM28A(3.00) & CHEM28B(3.00)', 'CHEM29A(2.00)', 'ENGL1B(3.00) / ENGL1BH(3.00)', 'ENGL1A(4.00) / ENGL1AH(4.00)', 'MATH5A(5.00)', 'MATH5B(4.00)', 'MATH6(5.00)', 'MATH17(5.00) OR ', '', 'PHYS4A(4.00) & PHYS4B(4.00) & PHYS4C(4.00)']
 # Also find the Prerequisite of classes and add them to our clean list b4 creating our subject_dict
+# Results are cached by the class list & catalog version (see schedule_cache.py)
+# The order of the class list is part of the key: an item ending in 'OR ' is an alternative of the next one, so the same classes in another order can be different requirements
+@schedule_cache.memoize('createSchedule')
 def createSchedule(classList):
     print(f"CLASSLIST in Schedule: {classList}")
     cleaned_list = clean_class_list(classList)
@@ -44,29 +52,29 @@ def createSchedule(classList):
 
 # The following functions are dictionaries used in every user session. I was not provided this data and I had to scrape throught the course catalog and degree catalog to create these dictionaries. 
 
+# Every dictionary is loaded once per process by the catalog registry (see catalog.py) and shared, so these functions return read-only views of them (MappingProxyType)
+# The values inside (EX: the attributes of a class) are still the shared objects: a caller that needs to modify a dictionary gets its own copy w/ catalog.copy(name)
+
 # Dictionary for CSU-GE & IGETCRequirements where keys are the Areas and values are sub-dictionaries where the keys are subjects and the values are list of classes to the corresponding subject
 def createCSU_GE():
-    with open('file_dictionaries/CSU_GE.pkl', 'rb') as f:
-        CSU_GE = pickle.load(f) 
-    return CSU_GE
+    return catalog.view('CSU_GE')
 def createIGETC():
-    with open('file_dictionaries/IGETC.pkl', 'rb') as f:
-        IGETC = pickle.load(f) 
-    return IGETC
+    return catalog.view('IGETC')
 
 # Most important Dictionary where the key is the class ID and the attributes include subject, units, prereq depth, and prerequisites formatted as strings, tuples, and lists
 def createCourses():
-    with open('file_dictionaries/class_dict.pkl', 'rb') as f:
-        course_dictionary = pickle.load(f) 
-    return course_dictionary
+    return catalog.view('class_dict')
 class_dict = createCourses()
+# Version of the catalog: hash of the pickle, so cached schedules are never reused after class_dict.pkl changes
+CATALOG_VERSION = catalog.version('class_dict')
+schedule_cache.set_catalog_version(CATALOG_VERSION)
+# Compile the prerequisites of every class once, so the prerequisite helpers don't have to re-inspect the mixed str/tuple/list values on every call
+prereq_graph = PrereqGraph(class_dict)
 
 # Dictionary that maps out the requirements to earn each degree CCC has available by listing the required classes, optional classes, and the units/# of classes required from the optional classes
 # Also has special characters for some degrees that are not consistent with the majority of other degrees 
 def createDegreeDictionary():
-    with open('file_dictionaries/degree_dict.pkl', 'rb') as f:
-        degree_dict = pickle.load(f)
-    return degree_dict
+    return catalog.view('degree_dict')
 
 # Values were being stored as 'int64' so we need to reverse it
 def replace_nan(obj):
@@ -119,57 +127,6 @@ def createUniversityMap():
 }
     return university_map
     
-# Solved an edge case with the Assist Class Extraction where class items have nested conjuctions
-def process_complex_class_item(class_item):
-    if class_item.startswith('('):  # If it starts with '(', split the classes
-        class_item = re.findall(r'\[.*?\]', class_item)  # Find all substrings enclosed in square brackets
-        class_item = [re.sub(r'[&()]', '', item) for item in class_item]  # Remove '&', '(', and ')'
-    return class_item
-
-# Formatting the classes based on the conjugation logic from the ASSIST agreement, getting rid of any duplicates and invalid classes
-def format_classes(classList):
-    v4 = []  # List to maintain order
-    seen = set()  # Set for quick lookup
-
-    for item in classList:
-        # If item is a list, iterate over its elements
-        if isinstance(item, list):
-            for sublist in item:
-                sublist = sublist.split('/')[0]  # Select the text before the first '/'
-                sublist = re.sub(r'[\[\]]', '', sublist)  # Remove all brackets
-                if sublist in class_dict.keys() and sublist not in seen:
-                    v4.append(sublist)
-                    seen.add(sublist)
-        # Condition 1: Starts with '[' and does not contain '&'
-        elif item.startswith('[') and '&' not in item:
-            item = item.split('/')[0]  # Select the text before the first '/'
-            item = re.sub(r'[\[\]]', '', item)  # Remove all brackets
-            if item in class_dict.keys() and item not in seen:
-                v4.append(item)
-                seen.add(item)
-        # Condition 2: Starts with '[' and contains '&'
-        elif item.startswith('[') and '&' in item:
-            item = re.sub(r'[\[\]()]', '', item)  # Remove all brackets and parentheses
-            groups = item.split('&')  # Split into groups by '&'
-            for group in groups:
-                classes = group.split('/')  # split into classes by '/'
-                # If all classes in the group are already in the list, continue to next group
-                if all(class_ in seen for class_ in classes):
-                    continue
-                else:
-                    # Add classes to the list and seen set
-                    for class_ in classes:
-                        if class_ in class_dict.keys() and class_ not in seen:
-                            v4.append(class_)
-                            seen.add(class_)
-                    break  # exit loop once we find a group that hasn't been added yet
-        # If item doesn't start with '['
-        else:
-            if item in class_dict.keys() and item not in seen:
-                v4.append(item)
-                seen.add(item)
-    return v4
-
 # def clean_dict_ordered(subject_dict):
 #     cleaned_dict = defaultdict(list)
 #     for key, values in subject_dict.items():
@@ -202,73 +159,12 @@ def is_nan_value(val):
         return pd.isna(val)
     
 # Create the List of All the Required Classes using the data w/ the ASSIST agreements, PreRequisites of classes, and creating it based on the the  conjugation logic with "OR" & "AND". 
+# Each class item is parsed once into a requirement tree and the classes are picked directly from the trees (see requirement_parser.py)
 def clean_and_format_class_list(class_list):
-    # print(f"v0: {class_list}")
-    v1 = []
-    # v1 removes units, spaces, and errors in formatting
-    for class_item in class_list:
-        # Remove all text within parentheses
-        class_item = re.sub(r'\(.*?\)', '', class_item)
-        # Remove all spaces
-        class_item = class_item.replace(" ", "")
-        # Remove trailing "AND", "OR", "/" and "&"
-        class_item = re.sub(r'(AND|OR|/&)$', '', class_item)
-        
-        # Split into substrings by "OR"
-        substrings = class_item.split("OR")
-        for i, substring in enumerate(substrings):
-            # Split each substring into groups by "AND"
-            groups = substring.split("AND")
-            for j, group in enumerate(groups):
-                # Split each group into classes by "/"
-                classes = group.split("/")
-                # If a group contains more than one class, wrap it in "[...]"
-                if len(classes) > 1:
-                    groups[j] = "[" + "/".join(classes) + "]"
-            # If a substring contains more than one group, wrap it in "(...)"
-            if len(groups) > 1:
-                substrings[i] = "(" + "&".join(groups) + ")"
-            else:
-                substrings[i] = groups[0]
-        # If the original string contains more than one substring, wrap the entire string in "[...]"
-        if len(substrings) > 1:
-            class_item = "[" + "/".join(substrings) + "]"
-        else:
-            class_item = substrings[0]
-        v1.append(class_item)
-    # print(f"v1 list: {v1}")
-    v2 = []
-    seen = set()  # Keep track of seen items to eliminate duplicates
-    seen_items = set()  # Keep track of seen class items
-    # v2 removes duplicate classes and seperates the & classes 
-    for item in v1:
-        if item not in seen_items:  # check if class item has been seen before
-            seen_items.add(item)
-            if '/' in item:
-                v2.append(item)
-            elif '&' in item:
-                item = item.replace('(', '').replace(')', '')  # remove parentheses
-                for subitem in item.split('&'):
-                    if subitem not in seen:
-                        v2.append(subitem)
-                        seen.add(subitem)
-            else:
-                if item not in seen:
-                    v2.append(item)
-                    seen.add(item)
-
-    v3 = []
-    # print(f"v2 list: {v2}")
-    for item in v2:
-        v3.append(process_complex_class_item(item)
-)
-    # print(f"v3 list: {v3}")
-    v4 = format_classes(v3)
-    # print(f"v4 list: {v4}")
-
-    v5 = find_best_prerequisites(v4)
-    # print(f"v5 list: {v5}")
-    return v5
+    requirement_trees = parse_requirements(class_list)
+    required_classes = resolve_requirements(requirement_trees, class_dict)
+    # Add the best prerequisites of the required classes
+    return find_best_prerequisites(required_classes)
 
 # Purpose: Create a dictionary and Assign each class in the list as the key and the value is the class's prerequisite depth 
 def calculate_prereq_depths(class_list):
@@ -281,7 +177,13 @@ def calculate_prereq_depths(class_list):
 
 # My favorite Function: An algorithm I created to create a schedule from the classes in the final cleaned classList. Algorithm places classes in semesters based on unit count, prereq depth, and priority to classes w/ same subject being taken in back to back semesters. 
 # EX: IF a student is in MATH1 in their 1st semester then I want to prioritize MATH2 for the semester after
-def unverifiedScheduleGenerator(classList):
+# semesters / max_units / last_semester_units: # of semesters to fill (at most 6, the SEP PDF has 6 semesters), the unit cap of every semester, and the unit cap of the last semester
+# compat: True runs the original algorithm (same output as always), False runs the ready-queue engine (see schedule_engine.py)
+# use_bitsets: keep the completed classes as an integer bitmask so prerequisite & duplicate checks are a few AND operations instead of list scans (set it to False for the original list-based checks)
+# optimize_nodes: if set, the greedy schedule is used as the seed of the branch-and-bound solver (see schedule_solver.py), which returns the best schedule it finds within that many search nodes (a node count, not a time, so the cached result is the same on every server)
+# Results are cached by the class list, the arguments & the catalog version (see schedule_cache.py)
+@schedule_cache.memoize('unverifiedScheduleGenerator')
+def unverifiedScheduleGenerator(classList, semesters=DEFAULT_SEMESTERS, max_units=DEFAULT_MAX_UNITS, last_semester_units=DEFAULT_LAST_SEMESTER_UNITS, compat=True, use_bitsets=True, optimize_nodes=None):
     # print(f"unverified initial List {classList}")
     # If there is an empty classList
     if not classList:
@@ -291,110 +193,25 @@ def unverifiedScheduleGenerator(classList):
     # print(f"NEW FINAL LIST: {new_final_list}")
     depths = calculate_prereq_depths(new_final_list)
 
-# Phase 2: Create PreReq Depth
-    prereq_dict = defaultdict(list)
-    # Check each class in depths
-    invalid_classes = []
-    for class_name in depths.keys():
-        if class_name not in class_dict.keys():
-            invalid_classes.append(class_name)
-        else:
-            prereq_dict[depths[class_name]].append(class_name)
-        
-    # Remove invalid classes from depths
-    for class_name in invalid_classes:
-        del depths[class_name]
+# Phase 2: Place the classes into semesters
+    schedule, leftover_classes = schedule_classes(depths, class_dict, prereq_graph, semesters=semesters, max_units=max_units, last_semester_units=last_semester_units, compat=compat, use_bitsets=use_bitsets)
+    # Try to fit the leftovers & balance the semesters better w/o going over the search budget
+    if optimize_nodes:
+        schedule, leftover_classes = optimize_schedule(depths, class_dict, prereq_graph, (schedule, leftover_classes), semesters=semesters, max_units=max_units, last_semester_units=last_semester_units, max_nodes=optimize_nodes)
+    print(f"LEFTOVERS {leftover_classes} @ {semesters}") # Debug Statement to check for classes unable to fit in the schedule
 
 # Phase 3: Create the field_dict
-    field_dict = {
-    1: dict.fromkeys(['1_3', '1_4', '2_3', '2_4', '3_3', '3_4', '4_3', '4_4', '5_3', '5_4', '6_3', '6_4', '7_3', '7_4'], []),
-    2: dict.fromkeys(['1_5', '1_6', '2_5', '2_6', '3_5', '3_6', '4_5', '4_6', '5_5', '5_6', '6_5', '6_6', '7_5', '7_6'], []),
-    3: dict.fromkeys(['1_9', '1_10', '2_9', '2_10', '3_9', '3_10', '4_9', '4_10', '5_9', '5_10', '6_9', '6_10', '7_9', '7_10'], []),
-    4: dict.fromkeys(['1_11', '1_12', '2_11', '2_12', '3_11', '3_12', '4_11', '4_12', '5_11', '5_12', '6_11', '6_12', '7_11', '7_12'], []),
-    5: dict.fromkeys(['1_15', '1_16', '2_15', '2_16', '3_15', '3_16', '4_15', '4_16', '5_15', '5_16', '6_15', '6_16', '7_15', '7_16'], []),
-    6: dict.fromkeys(['1_17', '1_18', '2_17', '2_18', '3_17', '3_18', '4_17', '4_18', '5_17', '5_18', '6_17', '6_18', '7_17', '7_18'], [])
-    }
-    # cleaned_list = clean_class_list(classList)
-
-    # Start with an empty stack and @ the 1st semester
-    stack = []
-    i = 0
-    subject_order = set()
-    scheduled_classes = set()
-    leftover_classes = []
-    completed_classes = []
-    max_units = 15.0 # This is my suggest max Unit Cap. However, students can take more units per semester if they choose. 
-    for depth in range(7):
-        i += 1 # Increase the Semester 
-        if i > 6:
-            # If semester exceeds the maximum, store the leftover classes and break
-            leftover_classes.extend(stack)
-            break
-        # key iterator is how we know which semester to insert into based on our field_dict
-        keys_iterator = iter(field_dict[i].keys())
+    return schedule_to_fields(schedule)
 
-        # At the beginning of every semester, we start @ 0.0 units
-        semesterUnits = 0.0 
-        
-        # Add classes of the current depth to the stack
-        stack.extend(prereq_dict[depth])
-        invalid_classes = []
-        # Sort the stack:
-        # 1. By giving priority to classes with the lowest prereq_depth
-        # 2. By giving priority to classes whose subjects are the same as the last classes inserted
-        # print(f"SUBJECT ORDER for {i}: {subject_order}")
-        stack.sort(key=lambda x: (depths[x], -1 * (class_dict[x]['Subject'] in subject_order)), reverse=True)
-
-        subject_order = set()
-        subject_depth_scheduled = {}  # reset for new semester
-
-        # print(f"{i}: {stack}") # Debegging Statement
-        # Go through each class in the Stack and try to insert it into our current semester.
-        while stack:
-            # Pop class off the stack
-            classID = stack.pop()
-            # Get the units of the corresponding class, so we can make sure not to exceed 15.0 units
-            units = float(class_dict[classID]['Units'])
-            # Get the Subject of the corresponding class, so we can prioritize a class with the same subject on the next semester
-            subject = class_dict[classID]['Subject']
-            # Get the depth of the class
-            depth_of_class = depths[classID]
-            
-            # Check if the subject and depth are already scheduled
-            already_scheduled = subject_depth_scheduled.get(subject, None) == depth_of_class
-            # Check if the class has all there prereqs completed
-            prereq_completion = check_prereq_completion(classID, completed_classes)
-            # For the Last semester, increase the max_units so we can try and fit all classes in schedule 
-            if i == 6:
-                max_units = 18.0
-
-# Conditions for class to be inserted to Semester:
-    # 1.) Total Units <= max_units (15)
-    # 2.) Class of the same subject & different prereq depth cannot be inserted into the same semester
-    # 3.) The prereq depth of a class must be less than our semester (i)
-    # 4.) The prerequisites for the class must be completed
-    # 5.) No duplicate classes can be inserted
-            if (semesterUnits + units <= max_units) and ((subject not in subject_depth_scheduled) or already_scheduled) and (i > depth_of_class or semesterUnits == 0) and prereq_completion and classID not in completed_classes:
-                class_key = next(keys_iterator)
-                units_key = next(keys_iterator)
-                field_dict[i][class_key] = classID
-                field_dict[i][units_key] = units
-                semesterUnits += units
-                scheduled_classes.add(classID)
-                subject_order.add(subject)
-                subject_depth_scheduled[subject] = depth_of_class
-                completed_classes.append(classID)
-            # Class did not meet conditions:
-            else:
-                invalid_classes.append(classID)
-                # Go to next class on the stack if the stack is not empty
-                if stack:
-                    continue
-                # Else: # Go to next semester
-                stack.extend(invalid_classes)
-                break 
-
-    print(f"LEFTOVERS {leftover_classes} @ {i}") # Debug Statement to check for classes unable to fit in the schedule
+# Convert the classes of every semester into the SEP PDF textboxes: {textbox location: class or units}
+def schedule_to_fields(schedule):
+    field_dict = {i: dict.fromkeys(keys, []) for i, keys in enumerate(SEMESTER_FIELDS, start=1)}
+    for i, semester in enumerate(schedule, start=1):
+        # key iterator is how we know which textboxes to insert into based on our field_dict
+        keys_iterator = iter(field_dict[i].keys())
+        for classID in semester:
+            field_dict[i][next(keys_iterator)] = classID
+            field_dict[i][next(keys_iterator)] = float(class_dict[classID]['Units'])
 
     # Flatten out the sub dictionaries into 1 whole dictionary where the key is the textbox location and the values are the text for classes & units
     result_dict = {key: '' if not val else ', '.join(['{:.2f}'.format(i) if isinstance(i, float) else str(i) for i in val]) if isinstance(val, list) else '{:.2f}'.format(val) if isinstance(val, float) else val for sub_dict in field_dict.values() for key, val in sub_dict.items()}
@@ -425,174 +242,58 @@ def add_units_to_class_ids(classList):
 
 def find_all_prerequisites(classList):
     """Find all prerequisites (including prerequisites of prerequisites) for each class in the classList."""
-    # Create a list to store the results
-    result = classList.copy()
-
-    # Initialize an index to go through the classList
-    idx = 0
-
-    # Go through each class in the result list
-    while idx < len(result):
-        classID = result[idx]
-        
-        # Check if the classID is in the class_dict
-        if classID in class_dict:
-            # Get the prerequisites for the current class
-            prereqs = class_dict[classID]['PREREQUISITES']
-
-            # If the prerequisites is a string, add it to the result list if not already present
-            if isinstance(prereqs, str) and prereqs not in result:
-                result.append(prereqs)
-            
-            # If the prerequisites is a tuple, go through each item and add it to the result list if not already present
-            elif isinstance(prereqs, tuple):
-                for item in prereqs:
-                    # If the item is a list, go through each string in the list and add it to the result list if not already present
-                    if isinstance(item, list):
-                        for sub_item in item:
-                            if isinstance(sub_item, str) and sub_item not in result:
-                                result.append(sub_item)
-                    # If the item is a string, add it to the result list if not already present
-                    elif isinstance(item, str) and item not in result:
-                        result.append(item)
-
-            # If the prerequisites is a list, go through each item and add it to the result list if not already present
-            elif isinstance(prereqs, list):
-                for item in prereqs:
-                    # If the item is a tuple, go through each string in the tuple and add it to the result list if not already present
-                    if isinstance(item, tuple):
-                        for sub_item in item:
-                            if isinstance(sub_item, str) and sub_item not in result:
-                                result.append(sub_item)
-                    # If the item is a string, add it to the result list if not already present
-                    elif isinstance(item, str) and item not in result:
-                        result.append(item)
-        
-        # Move to the next index
-        idx += 1
-    return result
+    # The transitive prerequisites of every class are precomputed when the catalog loads, so this is a single union of bitmasks instead of walking the prerequisites class by class
+    # New prerequisites are appended in catalog order after the classes in the classList
+    return prereq_graph.all_prerequisites(classList)
 
 # Helper Function that is used to handle the conjugation logic and find the best prereqs to complete based on our classList and conjugations, then add them to our result list. THis logic is different than the ASSIST logic as I have set the types to be tuples, lists, and strings instead of parsing strings. 
 def find_best_prerequisites(classList):
     result = classList.copy() # Make a copy of our list
+    taken = prereq_graph.id_set(result) # IDs of the classes in our result list for quick lookup
+    names = prereq_graph.names
 
     idx = 0 # Loop through result list
     while idx < len(result):
-        classID = result[idx]
-        
-        if classID in class_dict:
-            # Find the prerequisites for the class
-            prereqs = class_dict[classID]['PREREQUISITES']
-            
-            # Skip if prereq is NaN (no prerequisites) 
-            if isinstance(prereqs, float):
-                idx += 1
-                continue
-            
-            # Handling strings and tuples of strings
-            if isinstance(prereqs, str) and prereqs not in result:
-                result.append(prereqs)
-            elif isinstance(prereqs, tuple) and all(isinstance(item, str) for item in prereqs):
-                for item in prereqs:
-                    if item not in result:
-                        result.append(item)
-            
-            # Handling types involving lists
-            else:
-                items_to_check = []
-                if isinstance(prereqs, list):
-                    items_to_check.extend(prereqs)
-                elif isinstance(prereqs, tuple):  # It's a tuple
-                    items_to_check.extend(prereqs)
-                
-                # Sorting items to check based on type priority
-                items_to_check.sort(key=lambda x: (
-                    0 if isinstance(x, str) else 
-                    1 if isinstance(x, tuple) and all(isinstance(i, str) for i in x) else 
-                    2 if isinstance(x, list) and all(isinstance(i, str) for i in x) else 
-                    3
-                ))
-                # Handle tuples of strings and lists or tuples containing lists
-                for item in items_to_check:
-                    # If the item is a standalone string, prioritize it
-                    if isinstance(item, str) and item in class_dict:
-                        if item not in result:
-                            result.append(item)
-                        
-                        break
-                    # For tuples, process them only if no standalone string was found
-                    elif isinstance(item, tuple) and all(isinstance(sub_item, str) for sub_item in item):
-                        for sub_item in item:
-                            if sub_item not in result:
-                                result.append(sub_item)
-                    
-                    if isinstance(item, list):
-                        # Lists containing only strings
-                        if all(isinstance(sub_item, str) for sub_item in item):
-                            if not any(sub_item in result for sub_item in item):
-                                best_prereq = min(item, key=lambda x: class_dict[x]['prereq_depth'])
-                                if best_prereq not in result:
-                                    result.append(best_prereq)
-                                    break
-                        # Lists containing tuples and strings
-                        elif all(isinstance(sub_item, (str, tuple)) for sub_item in item):
-                            strings = [sub_item for sub_item in item if isinstance(sub_item, str)]
-                            tuples = [sub_item for sub_item in item if isinstance(sub_item, tuple)]
-                            # Filter out strings that are present in any tuple
-                            strings = [string for string in strings if not any(string in tuple_item for tuple_item in tuples)]
-                            # Choose the string with the lowest prereq depth that is not in any tuple
-                            if strings:
-                                best_string = min(strings, key=lambda x: class_dict[x]['prereq_depth'])
-                                if best_string not in result:
-                                    result.append(best_string)
+        cid = prereq_graph.course_id(result[idx])
         idx += 1
+        if cid is None:
+            continue
+
+        # Run the pick plan that was compiled from the class's prerequisites (see PrereqGraph._compile_pick_plan)
+        for step in prereq_graph.pick_plans[cid]:
+            op = step[0]
+            # Required class(es): add the ones not already in our result list
+            if op == OP_ADD_ALL:
+                for prereq_id in step[1]:
+                    if prereq_id not in taken:
+                        result.append(names[prereq_id])
+                        taken.add(prereq_id)
+            # A standalone class is prioritized over every other option
+            elif op == OP_PICK:
+                if step[1] not in taken:
+                    result.append(names[step[1]])
+                    taken.add(step[1])
+                break
+            # "OR" options: pick the class with the lowest prereq depth if none of them were taken
+            elif op == OP_PICK_MIN:
+                if not any(prereq_id in taken for prereq_id in step[1]):
+                    result.append(names[step[2]])
+                    taken.add(step[2])
+                    break
+            # Options mixing classes & tuples: pick the class with the lowest prereq depth
+            elif op == OP_ADD_BEST:
+                if step[1] not in taken:
+                    result.append(names[step[1]])
+                    taken.add(step[1])
 
     return result
 
 # Return a Boolean Value that is depended on if a prerequisite has completed all the prerequisite classes. `class_list` acts as the list of completed classes. 
 def check_prereq_completion(classID, class_list):
-    # Get the prerequisites for the classID
-    prereqs = class_dict[classID]['PREREQUISITES']
-    
-    # Check if prereq is NaN (float)
-    if isinstance(prereqs, float):
-        return True
-    
-    # Handle string prerequisites
-    if isinstance(prereqs, str):
-        return prereqs in class_list
-    
-    # Handle list of only strings
-    if isinstance(prereqs, list) and all(isinstance(item, str) for item in prereqs):
-        return any(item in class_list for item in prereqs)
-    
-    # Handle list of strings and tuples
-    if isinstance(prereqs, list) and all(isinstance(item, (str, tuple)) for item in prereqs):
-        for item in prereqs:
-            if isinstance(item, str) and item in class_list:
-                return True
-            elif isinstance(item, tuple) and all(sub_item in class_list for sub_item in item):
-                return True
-        return False
-    
-    # Handle tuple of only strings
-    if isinstance(prereqs, tuple) and all(isinstance(item, str) for item in prereqs):
-        return all(item in class_list for item in prereqs)
-    
-    # Handle tuple of only lists
-    if isinstance(prereqs, tuple) and all(isinstance(item, list) for item in prereqs):
-        for item in prereqs:
-            if not any(sub_item in class_list for sub_item in item):
-                return False
-        return True
-    
-    # Handle tuple of strings and lists
-    if isinstance(prereqs, tuple) and all(isinstance(item, (str, list)) for item in prereqs):
-        for item in prereqs:
-            if isinstance(item, str) and item not in class_list:
-                return False
-            elif isinstance(item, list) and not any(sub_item in class_list for sub_item in item):
-                return False
-        return True
-    
-    return False
+    # Get the compiled prerequisites for the classID
+    cid = prereq_graph.course_id(classID)
+    if cid is None:
+        raise KeyError(classID)
+
+    # Every "AND" clause needs at least one of its "OR" classes completed
+    return prereq_graph.is_satisfied(cid, prereq_graph.id_set(class_list))
@@ -0,0 +1,141 @@
+import argparse
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+# Local index of the ASSIST major reports: (university ID, school year ID, major label) -> report key, stored in agreement_index.pkl next to u_map.pkl.
+# get_pdf_url used to fetch every agreement w/ the university & download the major reports of each agreement until a label matched (many seconds of sequential network calls per POST to /).
+# W/ the index it's a dictionary lookup. The index is rebuilt by this command (EX: from a scheduled job) or by a background thread in the app, and every process reloads the file when it changes.
+# EX: python agreement_index.py
+# EX: python agreement_index.py --universities 11 117
+
+AGREEMENT_INDEX_FILE = 'agreement_index.pkl'
+
+# Crawl ASSIST & build the index data for the given universities (default: every university of u_map)
+# The report order of every university is kept (agreements in ASSIST order, then reports), so lookup() picks the same report the crawl of get_pdf_url would
+# Every response is revalidated w/ ASSIST (the cached responses are only used for conditional requests), so a rebuild never uses stale agreements
+def build_index(university_ids=None, client=None):
+    from assist_client import get_assist_client
+    from pdfoutput import PDFOutput, agreement_year, u_map_unpickled
+
+    client = client or get_assist_client().revalidating()
+
+    reports = {}
+    years = {}
+    for university_id in (university_ids or [int(key) for key in u_map_unpickled.keys()]):
+        pdf_output = PDFOutput(university_id, client=client)
+        agreements = pdf_output.get_agreements()
+        university_years = []
+        # The reports of all the agreements are fetched concurrently by the ASSIST client
+        for agreement, agreement_reports in zip(agreements, pdf_output.get_all_reports(agreements)):
+            school_year_id = agreement_year(agreement)
+            for report in agreement_reports:
+                reports.setdefault((university_id, school_year_id, report['label']), report['key'])
+            if school_year_id not in university_years:
+                university_years.append(school_year_id)
+        # A university w/o agreements (EX: ASSIST was down) is left out, so get_pdf_url still crawls it
+        if university_years:
+            years[university_id] = university_years
+    return {'built_at': time.time(), 'reports': reports, 'years': years}
+
+class AgreementIndex:
+    def __init__(self, path=AGREEMENT_INDEX_FILE):
+        self.path = path
+        self.reports = {}
+        self.years = {}
+        self.by_label = {}
+        self.built_at = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    # (Re)load the file if it changed since the last load
+    def reload(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+            self._set(data)
+            self._mtime = mtime
+
+    def _set(self, data):
+        # (University ID, major label) -> report key of the first agreement year that has the major (like the crawl)
+        year_order = {(university_id, year): n for university_id, university_years in data['years'].items() for n, year in enumerate(university_years)}
+        by_label = {}
+        for (university_id, year, label), key in sorted(data['reports'].items(), key=lambda item: year_order.get(item[0][:2], 0), reverse=True):
+            by_label[(university_id, label)] = key
+        self.by_label = by_label
+        self.reports = data['reports']
+        self.years = data['years']
+        self.built_at = data['built_at']
+
+    def has_university(self, university_id):
+        self.reload()
+        return int(university_id) in self.years
+
+    # Report key of a major for a university: school_year_id if given, else the first agreement year that has the major
+    def lookup(self, university_id, major_name, school_year_id=None):
+        self.reload()
+        university_id = int(university_id)
+        if school_year_id is not None:
+            return self.reports.get((university_id, school_year_id, major_name))
+        return self.by_label.get((university_id, major_name))
+
+    # Crawl ASSIST, write the file atomically (so readers never see a partial file) & load it
+    def rebuild(self, university_ids=None):
+        data = build_index(university_ids)
+        if university_ids:
+            # Partial rebuild: keep the other universities
+            self.reload()
+            reports = {key: value for key, value in self.reports.items() if key[0] not in data['years']}
+            reports.update(data['reports'])
+            data['reports'] = reports
+            data['years'] = {**self.years, **data['years']}
+        # Unique temporary file in the same directory: the refresh threads of every worker can rebuild at the same time
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(self.path)), prefix=os.path.basename(self.path) + '.', suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            try:
+                pickle.dump(data, f)
+            except BaseException:
+                f.close()
+                os.remove(tmp_path)
+                raise
+        os.replace(tmp_path, self.path)
+        self.reload()
+        return data
+
+    # Rebuild the index every interval_seconds in a daemon thread. A failed rebuild keeps the current index
+    def start_background_refresh(self, interval_seconds):
+        if self._refresh_thread is not None:
+            return
+        def refresh():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    self.rebuild()
+                except Exception as e:
+                    print(f"Error refreshing the agreement index: {e}")
+        self._refresh_thread = threading.Thread(target=refresh, name='agreement-index-refresh', daemon=True)
+        self._refresh_thread.start()
+
+# Shared index for the whole process
+agreement_index = AgreementIndex()
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the local index of the ASSIST major reports.')
+    parser.add_argument('--universities', type=int, nargs='*', help='Only rebuild these ASSIST university IDs')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = agreement_index.rebuild(args.universities)
+    print(f"Indexed {len(data['reports'])} reports of {len(data['years'])} universities in {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,22 @@
 from flask import Flask, render_template, jsonify, session, redirect, send_file, request
 from flask_session import Session
 from pdfoutput import PDFOutput, generate_universities
-from pdfExtract import process_pdf
-from Schedule import createSchedule, unverifiedScheduleGenerator, createCSU_GE, createIGETC, replace_nan, createUniversityMap
-from outToPDF import write_fillable_pdf, inputSEP
-from degree import get_complete_degrees, complete_IGETC, complete_CSU_GE
-import pickle
+from extraction import extract_class_list
+from Schedule import createSchedule, unverifiedScheduleGenerator, replace_nan, createUniversityMap, CATALOG_VERSION
+from outToPDF import fill_sep_pdf, get_sep_template, inputSEP
+from schedule_cache import schedule_cache
+from static_responses import precomputed_response
+from ge_index import complete_IGETC, complete_CSU_GE, cheapest_remaining_IGETC, cheapest_remaining_CSU_GE, preload as preload_area_indexes
+from catalog import catalog
+from degree_index import DegreeRanker, get_degree_index, find_degrees, normalize_classes
+from tab_store import create_tab_store, current_user_id
+from jobs import JobQueue, RedisJobStatus
+from agreement_index import agreement_index
 import json
 import os
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
-from models import add_verified_schedule_to_db, find_verified_schedule, schedule_to_dict, print_verified_schedules, db
+from models import add_verified_schedule_to_db, find_verified_schedule, schedule_to_dict, print_verified_schedules, find_precomputed_schedule, init_db
 import uuid
 import collections
 from decouple import config
@@ -23,13 +29,24 @@ from datetime import timedelta
 
 # initialize the s3 client
 s3 = boto3.client('s3')
-# Initialize univ_map & class_dict as global vars
-with open('u_map.pkl', 'rb') as f:
-    u_map_unpickled = pickle.load(f)
-with open('file_dictionaries/class_dict.pkl', 'rb') as f:
-    class_dict = pickle.load(f)
-
-load_dotenv() # Load Env Vars
+load_dotenv() # Load Env Vars (before the indexes below read their settings)
+# Load every catalog dictionary once, before gunicorn forks the workers (preload_app), so all the workers share the same pages
+catalog.preload()
+# The IGETC & CSU-GE area indexes (w/ the rules of GE_RULES_FILE) are compiled from the catalog, so they are built before the fork as well
+preload_area_indexes()
+# The SEP form is parsed once as well, /modify-pdf only fills copies of it
+get_sep_template()
+# Initialize univ_map & class_dict as global vars (shared w/ Schedule.py & pdfoutput.py through the catalog registry)
+u_map_unpickled = catalog.view('u_map')
+class_dict = catalog.get('class_dict')
+UNIVERSITY_MAP_VERSION = catalog.version('u_map')
+# Inverted class -> degree index of degree_dict, built once so /calculate-degrees only evaluates the degrees the user's classes count towards (its schema is set w/ the DEGREE_* env vars)
+degree_index = get_degree_index()
+# Rebuild the local index of the ASSIST major reports every AGREEMENT_INDEX_REFRESH_HOURS (not set: the index is only rebuilt by running agreement_index.py)
+if os.getenv('AGREEMENT_INDEX_REFRESH_HOURS'):
+    agreement_index.start_background_refresh(float(os.getenv('AGREEMENT_INDEX_REFRESH_HOURS')) * 60 * 60)
+# Budget (in search nodes, ~250 per millisecond) for improving unverified schedules in /generate_schedule. A node count keeps the cached schedules deterministic
+SCHEDULE_SOLVER_NODES = int(os.getenv('SCHEDULE_SOLVER_NODES', 50000))
 def create_app():
     app = Flask(__name__) # Initialize our Flask Application
     
@@ -51,16 +68,23 @@ def create_app():
     app.config['SESSION_REDIS'] = redis.from_url(os.getenv('REDISCLOUD_URL'))
     Session(app)
 
-# Initialzie our PostgreSQL database that stores our verified schedules
-    database_url = os.getenv('DATABASE_URL')
-    if database_url.startswith("postgres://"):
-        database_url = database_url.replace("postgres://", "postgresql+psycopg2://", 1)
+# Where the data of every tab lives: 'session' (default) keeps every tab inside the Flask session, 'redis' stores each tab as its own compressed Redis hash w/ its own TTL
+    app.config['TAB_STORE'] = os.getenv('TAB_STORE', 'session')
+    app.config['MAX_TABS_PER_USER'] = int(os.getenv('MAX_TABS_PER_USER', 20))
+# Run the extraction of "get-schedule" in background jobs (EXTRACTION_JOBS=1): POST / answers w/ the tab_id & a job_id right away, and the page polls /jobs/<job_id>
+# Jobs fill in the tab outside of the request, so they need the 'redis' tab store
+    app.config['EXTRACTION_JOBS'] = os.getenv('EXTRACTION_JOBS') == '1' and app.config['TAB_STORE'] == 'redis'
+    app.config['EXTRACTION_WORKERS'] = int(os.getenv('EXTRACTION_WORKERS', 4))
+
+# Share cached schedules between workers through the same Redis instance
+    schedule_cache.configure(
+        redis_client=app.config['SESSION_REDIS'],
+        max_entries=int(os.getenv('SCHEDULE_CACHE_SIZE', 1024)),
+        ttl_seconds=int(os.getenv('SCHEDULE_CACHE_TTL', 24 * 60 * 60))
+    )
 
-    app.config['SQLALCHEMY_DATABASE_URI'] = database_url    
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    db.init_app(app)
-    with app.app_context():
-        db.create_all()
+# Initialzie our PostgreSQL database that stores our verified schedules
+    init_db(app, os.getenv('DATABASE_URL'))
 
 # After App is Created, we Return it
     return app
@@ -72,6 +96,17 @@ def create_app():
     # Initialize our PostgreSQL Database w/ necessary tables
 app = create_app()
 
+# Storage for the data of every tab (see tab_store.py)
+tabs = create_tab_store(
+    app.config['TAB_STORE'],
+    redis_client=app.config['SESSION_REDIS'],
+    ttl_seconds=int(app.config['PERMANENT_SESSION_LIFETIME'].total_seconds()),
+    max_tabs=app.config['MAX_TABS_PER_USER'],
+    catalog_version=CATALOG_VERSION
+)
+# Background extraction jobs, w/ their status in Redis so any worker can report it
+jobs = JobQueue(RedisJobStatus(app.config['SESSION_REDIS']), workers=app.config['EXTRACTION_WORKERS'])
+
 
 # Main Purpose of index(): The start of our Flask Application where we use the user's input and backend Python Functions to find what data they need for their corresponding major and university. 
 @app.route('/', methods=['GET', 'POST'])
@@ -108,16 +143,14 @@ def index():
 
         # Create a mapping of university IDs to their respective names
         u_map = createUniversityMap()
-        # Initialize session data for the current tab_id & Save content to our unique Session ID and store info in our Session: Redis
-        session[tab_id] = {
+        # Initialize session data for the current tab_id (saved to our tab store: Redis)
+        tab_data = {
             'university_name': u_map[str(university_id)], 
             'major': major, 
             'classList': [],
             'subject': collections.defaultdict(),
-            'ged': createCSU_GE(),
-            'igetc': createIGETC(),
             'year': years_list,
-            'class_dict': class_dict,
+            'catalog_version': CATALOG_VERSION, # The catalog dictionaries (class_dict, CSU-GE, IGETC) are not copied into the session, schedule() gets them from the catalog
             'pdf_data': {}
             # Dictionary 4 {textbox location: textbox values} ?
         }
@@ -126,12 +159,12 @@ def index():
         if pdf_url:
             #  Get Schedule: Insert necessary information to our session
             if button_clicked == 'get-schedule':
-                classList = process_pdf(pdf_url, university_id, major)
-                subjects = createSchedule(classList)
-                session[tab_id]['major'] = major
-                session[tab_id]['subject'] = subjects
-                session[tab_id]['classList'] = classList
-                session[tab_id]['class_dict'] = class_dict
+                if app.config['EXTRACTION_JOBS']:
+                    # The extraction runs in the background, the tab is saved once the job is done
+                    user_id = current_user_id()
+                    job_id = jobs.submit(extract_schedule, tab_id, tab_data, pdf_url, university_id, major, user_id, owner=user_id)
+                    return jsonify(tab_id=tab_id, job_id=job_id)
+                extract_schedule(None, tab_id, tab_data, pdf_url, university_id, major)
                 return jsonify(tab_id=tab_id)
             # If the 'get-pdf-button' was clicked, return the PDF URL.
             elif button_clicked == 'get-pdf-button': 
@@ -139,13 +172,45 @@ def index():
         else: # If no PDF was found, return an error message
             return "No PDF found"
     else: 
-        # If it's a GET request, generate a list of universities and sort them by name
+        # If it's a GET request, serve the page rendered w/ the list of universities sorted by name
         #  EX: When the page initially loads in
-        universities = generate_universities()
-        universities.sort(key=lambda x: x['name'])
-
-    # Render the index.html template with the list of universities
-    return render_template('index.html', universities=universities)
+        # The page only depends on the university map, so it's rendered & compressed once (see static_responses.py)
+        return precomputed_response('index', UNIVERSITY_MAP_VERSION, lambda: render_template('index.html', universities=sorted_universities()), mimetype='text/html')
+
+# Fill in the class list & subjects of a new tab & save it. Runs in the request or in a background job (progress reports the step of the job)
+def extract_schedule(progress, tab_id, tab_data, pdf_url, university_id, major, user_id=None):
+    # The class list is memoized by report key, so a repeat major skips the download & the PDF parse
+    if progress:
+        progress('extracting')
+    classList = extract_class_list(pdf_url, university_id, major)
+    if progress:
+        progress('scheduling')
+    subjects = createSchedule(classList)
+    tab_data['major'] = major
+    tab_data['subject'] = subjects
+    tab_data['classList'] = classList
+    # The tab is only saved once it has all of its data (1 write)
+    tabs.create(tab_id, tab_data, user_id)
+    return {'tab_id': tab_id}
+
+# Status of a background extraction job: the schedule page is ready once the status is 'done'
+# Only the user that submitted the job can read it, a job of another user is reported as unknown
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    status = jobs.status(job_id, owner=current_user_id())
+    if status is None:
+        return jsonify({'status': 'unknown', 'message': 'No job with this id'}), 404
+    return jsonify(status)
+
+# The list of universities sorted by name, only built once
+def sorted_universities():
+    return sorted(generate_universities(), key=lambda x: x['name'])
+
+# Return the session data of a tab (or None if the tab_id is unknown)
+# Migration: tabs created before sessions only stored the catalog version still carry copies of class_dict/CSU-GE/IGETC, and tabs created before the tab store still live in the Flask session. The tab store cleans both up the first time the tab is read
+# fields: only load these keys of the tab (EX: not the class list & PDF data when only the major is needed)
+def get_tab(tab_id, fields=None):
+    return tabs.get(tab_id, fields=fields)
 
 # Main Purpose of schedule(): Retrieve the stored session data with the key value of our tab_id and render our HTML temlate to display this data 
 @app.route('/schedule', methods=['GET'])
@@ -153,17 +218,20 @@ def schedule():
     # Retrieve the 'tab_id' parameter from the request's query parameters
     tab_id = request.args.get('tab_id')
      # Check if the requested 'tab_id' exists in the session
-    if tab_id in session:
+    tab_data = get_tab(tab_id)
+    if tab_data is not None:
         # Fetch various pieces of data associated with the 'tab_id' from the session.
-        university_name = session[tab_id].get('university_name')
-        major = session[tab_id].get('major')
-        years_list = session[tab_id].get('year')
-        classList = session[tab_id].get('classList')
-        class_dict = session[tab_id].get('class_dict', {})
-        subjects = session[tab_id].get('subject', {})  
-        ged = session[tab_id].get('ged', {})
-        IGETC = session[tab_id].get('igetc', {})
-        pdf_data = session[tab_id].get('pdf_data', {})
+        university_name = tab_data.get('university_name')
+        major = tab_data.get('major')
+        years_list = tab_data.get('year')
+        classList = tab_data.get('classList')
+        subjects = tab_data.get('subject', {})  
+        pdf_data = tab_data.get('pdf_data', {})
+        # The catalog dictionaries are shared by every user, so they come from the in-process catalog instead of the session
+        # The template only reads them, but its tojson filter needs the dictionaries themselves (not the read-only views of createCourses / createCSU_GE / createIGETC)
+        class_dict = catalog.get('class_dict')
+        ged = catalog.get('CSU_GE')
+        IGETC = catalog.get('IGETC')
         # Store the university name in the session for potential future use
         session['university'] = university_name
     else:
@@ -179,16 +247,15 @@ def upload_file():
     # Generate a unique ID for the current session/tab using UUID
     tab_id = str(uuid.uuid4())  
      # Initialize session data for the current tab_id with default values
-    session[tab_id] = {
+    tab_data = {
     'university_name': 'Unknown University', 
     'major': 'Unknown Major', 
     'subject': collections.defaultdict(),
-    'ged': createCSU_GE(),
-    'igetc': createIGETC(),
-    'class_dict': class_dict,
+    'catalog_version': CATALOG_VERSION,
     'pdf_data': {}
     # Dictionary 4 {textbox location: textbox values}
     }
+    tabs.create(tab_id, tab_data)
     # Check if the 'pdf_file' is part of the uploaded files in the request
     if 'pdf_file' not in request.files:
         return 'No file part'
@@ -213,8 +280,8 @@ def upload_file():
         # Process the uploaded PDF and retrieve relevant data
         data_tuples = inputSEP(filename)
         
-        # Store Processed Data in the Redis Session
-        session[tab_id]['pdf_data'] = data_tuples
+        # Store Processed Data in the tab (only this field of the tab is written)
+        tabs.update(tab_id, pdf_data=data_tuples)
 
     # Return a JSON response containing the tab_id
     return jsonify({'tab_id': tab_id})
@@ -241,14 +308,20 @@ def generate_schedule():
     university = request.args.get('university')  # Get the university from the
 
     # Retrieve the session data associated with the given 'tab_id'.
-    session_data = session.get(tab_id, {})
+    session_data = get_tab(tab_id, fields=['classList']) or {}
     classList = session_data.get('classList', [])
 
     # Look for a previously verified schedule in the database that matches the provided major and university.
     schedule = find_verified_schedule(major, university)  # Look for the schedule in the Verified Schedule DataBase
     if schedule is None:
-        # If no verified schedule is found, generate a new unverified schedule
-        unverified_schedule = unverifiedScheduleGenerator(classList)
+        # If no verified schedule is found, use the unverified schedule computed ahead of time by precompute_schedules.py
+        # It was computed from the class list of the agreement, so it's only used if the tab has no class list or the same one
+        precomputed = find_precomputed_schedule(major, university, CATALOG_VERSION)
+        if precomputed is not None and (not classList or classList == precomputed.class_list):
+            return jsonify({'status': 'error', 'message': 'No verified schedule found.', 'data_dict': precomputed.data_dict}), 200
+        # If it was not precomputed either, generate a new unverified schedule
+        # The greedy schedule is improved by the schedule solver for at most SCHEDULE_SOLVER_NODES search nodes (0 turns it off) to keep the response time predictable
+        unverified_schedule = unverifiedScheduleGenerator(classList, optimize_nodes=SCHEDULE_SOLVER_NODES)
         return jsonify({'status': 'error', 'message': 'No verified schedule found.', 'data_dict': unverified_schedule}), 200  
     else:
         # If a verified schedule is found, return it
@@ -259,12 +332,12 @@ def generate_schedule():
 def calculate_degrees():
     # Retrieve the JSON payload from the incoming request
     data = request.get_json()
-     # Extract the user's classes from the data and store them in the session
-    user_classes = list(data.values())
+     # Extract the user's classes from the data (normalized like every other endpoint) and store them in the session
+    user_classes = normalize_classes(data.values())
     session['user_classes'] = user_classes
 
-    # Use Backend Python Function that determines which degrees the user has completed and which they've almost completed based on their classes
-    completed_degrees, almost_completed_degrees = get_complete_degrees(user_classes)
+    # Determine which degrees the user has completed and which they've almost completed based on their classes
+    completed_degrees, almost_completed_degrees = find_degrees(user_classes)
     session['completed_degrees'] = completed_degrees
 
     # Construct a result dictionary with the completed and almost completed degrees
@@ -276,14 +349,56 @@ def calculate_degrees():
     # Return the result as a JSON response
     return jsonify(result)
 
+# Number of degrees returned by the "closest degrees" endpoints when the request doesn't ask for a number
+DEFAULT_CLOSEST_DEGREES = 5
+
+# The k degrees w/ the fewest remaining units for the classes in the user's inputted Schedule
+# The ranking is kept in the tab of the schedule (tab_id query parameter), so /closest-degrees/add & /closest-degrees/remove only re-evaluate the degrees the clicked class counts towards, and 2 tabs never share a ranking
+@app.route('/closest-degrees', methods=['POST'])
+def closest_degrees():
+    if not degree_index.supported:
+        return jsonify({'error': 'Degree ranking is not available for this degree catalog'}), 501
+    tab_id = request.args.get('tab_id')
+    if get_tab(tab_id, fields=['major']) is None:
+        return jsonify({'error': 'No data for this tab id'}), 404
+    data = request.get_json()
+    ranker = DegreeRanker(degree_index, data.values())
+    return ranked_degrees_response(tab_id, ranker)
+
+# Update the ranking after 1 class is added to (or removed from) the Schedule. EX payload: {"class_id": "MATH1A"}
+@app.route('/closest-degrees/<action>', methods=['POST'])
+def update_closest_degrees(action):
+    if action not in ('add', 'remove'):
+        return jsonify({'error': f"Unknown action: {action}"}), 404
+    if not degree_index.supported:
+        return jsonify({'error': 'Degree ranking is not available for this degree catalog'}), 501
+    tab_id = request.args.get('tab_id')
+    tab_data = get_tab(tab_id, fields=['degree_ranker'])
+    if tab_data is None:
+        return jsonify({'error': 'No data for this tab id'}), 404
+    state = tab_data.get('degree_ranker')
+    ranker = DegreeRanker.from_state(degree_index, state) if state else DegreeRanker(degree_index)
+    class_id = request.get_json().get('class_id', '')
+    if action == 'add':
+        ranker.add(class_id)
+    else:
+        ranker.remove(class_id)
+    return ranked_degrees_response(tab_id, ranker)
+
+# Save the ranking in the tab & return its top k degrees (k from the query parameters)
+def ranked_degrees_response(tab_id, ranker):
+    k = request.args.get('k', DEFAULT_CLOSEST_DEGREES, type=int)
+    tabs.update(tab_id, degree_ranker=ranker.to_state())
+    return jsonify({'closest_degrees': ranker.top(k)})
+
 # Use a Back-End Python Function to find what areas have been completed for the IGETC Transfer Requirements based on the  user's inputted Schedule 
 @app.route('/complete_IGETC', methods=['POST'])
 def api_complete_IGETC():
     # Retrieve the JSON payload from the incoming request
     data = request.get_json()
 
-    # Extract the user's classes from the data and store them in the session.
-    user_classes = list(data.values())
+    # Extract the user's classes from the data (normalized like every other endpoint) and store them in the session.
+    user_classes = normalize_classes(data.values())
     session['user_classes'] = user_classes
 
     # Call a function to determine the user's IGETC completion status based on their classes
@@ -298,8 +413,8 @@ def api_complete_CSU_GE():
     # Retrieve the JSON payload from the incoming request
     data = request.get_json()
 
-    # Extract the user's classes from the data and store them in the session
-    user_classes = list(data.values())
+    # Extract the user's classes from the data (normalized like every other endpoint) and store them in the session
+    user_classes = normalize_classes(data.values())
     session['user_classes'] = user_classes
 
     # Call a function to determine the user's CSU GE completion status based on their classes
@@ -308,21 +423,44 @@ def api_complete_CSU_GE():
     # Flask's jsonify can handle the tuple to turn it into a JSON object
     return jsonify({'results': ret_tup})
 
+# Evaluate the degrees, IGETC & CSU-GE for the user's inputted Schedule in 1 request
+# The schedule page used to send the same classes to /calculate-degrees, /complete_IGETC & /complete_CSU_GE (which are kept for compatibility): here the classes are normalized once and the session is written once
+# The 3 separate endpoints normalize the classes the same way (normalize_classes), so the results are the same
+@app.route('/evaluate-requirements', methods=['POST'])
+def evaluate_requirements():
+    # Retrieve the JSON payload from the incoming request & normalize the user's classes once (no blanks, duplicates or stray spaces)
+    data = request.get_json()
+    user_classes = normalize_classes(data.values())
+
+    completed_degrees, almost_completed_degrees = find_degrees(user_classes)
+    IGETC_tup = complete_IGETC(user_classes)
+    ret_tup = complete_CSU_GE(user_classes)
+
+    # 1 session write for the 3 evaluations
+    session.update(user_classes=user_classes, completed_degrees=completed_degrees)
+
+    # Same results as the 3 separate endpoints ('results' of /complete_CSU_GE is 'CSU_GE_results' here)
+    # + the cheapest class left for every unmet area (null w/o the GE rules file)
+    return jsonify({
+        'completed_degrees': completed_degrees,
+        'almost_completed_degrees': almost_completed_degrees,
+        'IGETC_results': IGETC_tup,
+        'CSU_GE_results': ret_tup,
+        'IGETC_cheapest_remaining': cheapest_remaining_IGETC(user_classes),
+        'CSU_GE_cheapest_remaining': cheapest_remaining_CSU_GE(user_classes)
+    })
+
 # Use the user's inputted Schedule and store the class data into a formal PDF the College uses in the correct format based on the textbox locations:
 @app.route('/modify-pdf', methods=['POST'])
 def modify_pdf():
     # Retrieve the JSON payload from the incoming request, which contains data to be written to the PDF
     data = request.get_json()
 
-    # Define a path where the modified PDF will be saved
-    output_pdf_path = 'output.pdf'
-
-    # Call the function to modify a fillable input PDF ('SEP.pdf') by writing the provided data to it
-    # The modified PDF is saved to the specified output path
-    write_fillable_pdf('SEP.pdf', output_pdf_path, data)
+    # Fill the SEP form ('SEP.pdf', parsed once at startup) w/ the provided data. The PDF is built in memory, so concurrent exports don't share an output file
+    pdf = fill_sep_pdf(data)
 
     # Send the modified PDF as a response to the client, setting its MIME type to 'application/pdf'
-    return send_file(output_pdf_path, mimetype='application/pdf')
+    return send_file(pdf, mimetype='application/pdf', download_name='SEP.pdf')
 
 # Allow the user to view the content of the PDF created in the browser. 
 @app.route('/display_pdf', methods=['GET'])
@@ -341,22 +479,22 @@ def get_majors():
     
     # Fetch the list of majors associated with the given university ID from the unpickled university map
     # Then sort the list of majors by alphabetical order
-    majors = sorted(u_map_unpickled[university_id]['majors'])
+    majors = u_map_unpickled[university_id]['majors']
 
-    # Return the sorted list of majors as a JSON response
-    return jsonify(majors)  
+    # Return the sorted list of majors as a JSON response (sorted & serialized only once per university)
+    return precomputed_response(f'majors-{university_id}', UNIVERSITY_MAP_VERSION, lambda: json.dumps(sorted(majors)))
 
 # Using our class_dict, we want to remove any NaN values and return it as a JSON response
 @app.route('/class_dict', methods=['GET'])
 def get_class_dict():
-    # Replace any NaN values in the 'class_dict' with appropriate values
-    class_dict_no_nan = replace_nan(class_dict)
-
-    # Convert the updated dictionary into a JSON string
-    json_class_dict_no_nan = json.dumps(class_dict_no_nan)  
+    # Replace any NaN values in the 'class_dict' with appropriate values & convert the updated dictionary into a JSON string
+    # This is only done once per catalog version, afterwards the pre-compressed JSON is returned (or a 304 if the browser already has it)
+    return precomputed_response('class_dict', CATALOG_VERSION, lambda: json.dumps(replace_nan(class_dict)))
 
-    # Return the JSON string as the response
-    return json_class_dict_no_nan
+# Hit/miss counters of the schedule cache for this worker
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    return jsonify(schedule_cache.get_stats())
 
 @app.route('/favicon.ico')
 def favicon():
@@ -374,10 +512,11 @@ def report_error():
     tab_id = request.form.get('tab_id')
 
     # Check if the provided 'tab_id' exists in the session.
-    if tab_id in session:
+    tab_data = get_tab(tab_id, fields=['university_name', 'major'])
+    if tab_data is not None:
         # Fetch the university name and major associated with the 'tab_id' from the session
-        university_name = session[tab_id].get('university_name')
-        major = session[tab_id].get('major')
+        university_name = tab_data.get('university_name')
+        major = tab_data.get('major')
         
         # Compose the content of the email using the fetched university name, major, and error description
         email_content = f"University: {university_name}\nMajor: {major}\nDescription: {error_description}"
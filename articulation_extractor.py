@@ -0,0 +1,116 @@
+import json
+
+# Extractor that builds the requirement list of an agreement from the articulation JSON ASSIST publishes for every report key, instead of recovering the AND/OR structure from the PDF layout (pdfExtract.process_pdf).
+# It returns the same requirement strings as process_pdf, so the list goes through clean_class_list / createSchedule / unverifiedScheduleGenerator unchanged:
+    # EX: ['BIOL11A(5.00)', 'CHEM1A(5.00) & CHEM1B(5.00) OR ', 'CHEM28A(3.00) & CHEM28B(3.00)', 'ENGL1B(3.00) / ENGL1BH(3.00)', 'MATH17(5.00) OR ', 'PHYS4A(4.00) & PHYS4B(4.00) & PHYS4C(4.00)']
+# Articulation JSON of a receiving course (only the fields used here):
+    # {"templateCellId": "c1", "articulation": {"sendingArticulation": {
+    #     "noArticulationReason": null,
+    #     "items": [{"courseConjunction": "And", "items": [{"prefix": "CHEM", "courseNumber": "1A", "maxUnits": 5.0}, ...]}, ...],
+    #     "courseGroupConjunctions": [{"groupConjunction": "Or", "sendingCourseGroupBeginPosition": 0, "sendingCourseGroupEndPosition": 1}]}}}
+# The courses of a sending group are joined w/ '&' (And) or '/' (Or). Like the PDF, every sending group is its own line, & a group followed by another one ends w/ its conjunction ('OR ' when ASSIST doesn't list one).
+# Receiving courses the student picks from ("complete 1 of the following") come from the requirement groups of the template assets:
+    # {"type": "RequirementGroup", "instruction": {"conjunction": "Or", "amount": 1}, "sections": [{"rows": [{"cells": [{"id": "c9"}]}, ...]}]}
+    # Choose 1: the last line of every receiving course but the last ends w/ 'OR ', like the PDF. Choose N > 1 can't be written as lines, so the 1st N articulated courses are required
+    # Courses outside a "choose" group are all required
+# tests/fixtures/ has the JSON of an agreement & its PDF class list, served by assist_stub.py in tests/test_articulation_extractor.py. Record new fixtures w/ assist_stub.py --record.
+
+# Bump when the extractor changes the requirement lists it returns
+EXTRACTOR_VERSION = 'json-2'
+
+# Requirement string of 1 sending course. EX: {'prefix': 'MATH', 'courseNumber': '5A', 'maxUnits': 5.0} -> 'MATH5A(5.00)'
+def format_course(course):
+    class_id = f"{course.get('prefix', '')}{course.get('courseNumber', '')}".replace(' ', '')
+    units = course.get('maxUnits', course.get('minUnits'))
+    return f"{class_id}({float(units):.2f})" if units is not None else class_id
+
+def _ordered(items):
+    return sorted(items, key=lambda item: item.get('position', 0))
+
+# Requirement string of 1 course group: its courses joined w/ '&' (And) or '/' (Or)
+def format_group(group):
+    separator = ' / ' if group.get('courseConjunction') == 'Or' else ' & '
+    return separator.join(format_course(course) for course in _ordered(group.get('items', [])) if course.get('prefix'))
+
+# Conjunction between group i & group i + 1
+def _group_conjunction(conjunctions, i):
+    for conjunction in conjunctions:
+        if conjunction.get('sendingCourseGroupBeginPosition', 0) <= i < conjunction.get('sendingCourseGroupEndPosition', 0):
+            return conjunction.get('groupConjunction', 'Or').upper()
+    return 'OR'
+
+# Requirement lines of 1 receiving course ([] if no CCC course articulates to it)
+def format_articulation(articulation):
+    sending = articulation.get('sendingArticulation') or {}
+    if sending.get('noArticulationReason'):
+        return []
+    groups = [(i, format_group(group)) for i, group in enumerate(_ordered(sending.get('items') or []))]
+    groups = [(i, group) for i, group in groups if group]
+    conjunctions = sending.get('courseGroupConjunctions') or []
+    lines = []
+    for n, (i, group) in enumerate(groups):
+        if n + 1 < len(groups):
+            group += f" {_group_conjunction(conjunctions, i)} "
+        lines.append(group)
+    return lines
+
+# Cell ID of a receiving course -> (requirement group, # of its receiving courses to complete) for the "choose" groups of the template assets
+def requirement_groups(template_assets):
+    if isinstance(template_assets, str):
+        template_assets = json.loads(template_assets)
+    groups = {}
+    for n, asset in enumerate(template_assets or []):
+        instruction = asset.get('instruction') or {}
+        if asset.get('type') != 'RequirementGroup' or instruction.get('conjunction') != 'Or':
+            continue
+        amount = int(instruction.get('amount') or 1)
+        for section in asset.get('sections') or []:
+            for row in section.get('rows') or []:
+                for cell in row.get('cells') or []:
+                    groups[cell.get('id')] = (asset.get('groupId', n), amount)
+    return groups
+
+# Lines of a "choose amount" group, from the lines of its receiving courses
+def _choose(courses, amount):
+    courses = [lines for lines in courses if lines]
+    if amount >= len(courses):
+        return [line for lines in courses for line in lines]
+    if amount > 1:
+        return [line for lines in courses[:amount] for line in lines]
+    chosen = []
+    for n, lines in enumerate(courses):
+        chosen.extend(lines[:-1])
+        chosen.append(lines[-1] + ' OR ' if n + 1 < len(courses) else lines[-1])
+    return chosen
+
+# Requirement strings of an agreement, in the order of the articulation JSON
+# articulations / template_assets: the 'articulations' & 'templateAssets' of the ASSIST response (JSON strings or the parsed lists)
+def extract_requirements(articulations, template_assets=None):
+    if isinstance(articulations, str):
+        articulations = json.loads(articulations)
+    groups = requirement_groups(template_assets)
+    # The receiving courses of a "choose" group are written together, where the 1st one of the group is
+    courses_of = {}
+    order = []
+    for item in articulations:
+        lines = format_articulation(item.get('articulation', item))
+        group = groups.get(item.get('templateCellId'))
+        if group is None:
+            order.append((None, lines))
+            continue
+        if group[0] not in courses_of:
+            courses_of[group[0]] = []
+            order.append((group, courses_of[group[0]]))
+        courses_of[group[0]].append(lines)
+    requirements = []
+    for group, lines in order:
+        requirements.extend(lines if group is None else _choose(lines, group[1]))
+    return requirements
+
+# Requirement list of a report key, same result format as pdfExtract.process_pdf
+def process_articulation(report_key, client=None):
+    if client is None:
+        from assist_client import get_assist_client
+        client = get_assist_client()
+    response = client.get_json('/api/articulation/Agreements', params={'Key': report_key})
+    return extract_requirements(response['result']['articulations'], response['result'].get('templateAssets'))
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+# Content-addressed store of the ASSIST artifacts (agreement PDFs) + memo of the class lists extracted from them.
+# A report key always points to the same PDF, so:
+    # 1.) The raw bytes are stored once under their SHA-256 (blobs/<sha256>), and every report key points to its blob (keys/<report key>)
+    # 2.) The class list extracted from a report is memoized by (report key, extractor version) (memo/<report key>-<version>.json), so a repeat major skips the download & the PDF parse. A new extractor version never reads the class lists of an older one
+# The blobs on disk are bounded to max_bytes: the least recently used blobs are evicted first. W/ an S3 bucket, every blob & memo is also uploaded, so evicted blobs (or other servers) can get them back w/o ASSIST.
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_DIRECTORY = 'artifact_store'
+# Characters that can't be part of a file name made from a report key
+UNSAFE_PATTERN = re.compile(r'[^A-Za-z0-9_.-]')
+
+def safe_name(report_key):
+    return UNSAFE_PATTERN.sub('_', str(report_key))
+
+class ArtifactStore:
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES, s3_client=None, s3_bucket=None, s3_prefix='artifacts/'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.s3 = s3_client if s3_bucket else None
+        self.s3_bucket = s3_bucket
+        self.s3_prefix = s3_prefix
+        self._lock = threading.Lock()
+        for sub in ('blobs', 'keys', 'memo'):
+            os.makedirs(os.path.join(directory, sub), exist_ok=True)
+
+    def _path(self, sub, name):
+        return os.path.join(self.directory, sub, name)
+
+    # Write a file atomically, so concurrent readers never see a partial file
+    def _write(self, path, data):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    # Store bytes, returns their SHA-256
+    def put(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path('blobs', digest)
+        if not os.path.exists(path):
+            self._write(path, data)
+            self._upload(f"blobs/{digest}", data)
+            self.evict()
+        return digest
+
+    # Bytes of a SHA-256 (None if unknown). Reading a blob marks it as recently used
+    def get(self, digest):
+        path = self._path('blobs', digest)
+        data = self._read(path)
+        if data is not None:
+            try:
+                os.utime(path)
+            except OSError: # Evicted in the meantime, the bytes are still good
+                pass
+            return data
+        data = self._download(f"blobs/{digest}")
+        if data is not None and hashlib.sha256(data).hexdigest() == digest:
+            self._write(path, data)
+            self.evict()
+            return data
+        return None
+
+    # Artifact of a report key: from the store, else from fetch() (EX: downloading it from ASSIST), which is then stored
+    def get_artifact(self, report_key, fetch=None):
+        report_key = safe_name(report_key)
+        digest = self._read(self._path('keys', report_key))
+        if digest is None:
+            digest = self._download(f"keys/{report_key}")
+        if digest is not None:
+            data = self.get(digest.decode())
+            if data is not None:
+                return data
+        if fetch is None:
+            return None
+        data = fetch()
+        digest = self.put(data)
+        self._write(self._path('keys', report_key), digest.encode())
+        self._upload(f"keys/{report_key}", digest.encode())
+        return data
+
+    # Class list extracted from a report by an extractor version (None if it was never extracted)
+    def get_class_list(self, report_key, extractor_version):
+        name = f"{safe_name(report_key)}-{safe_name(extractor_version)}.json"
+        data = self._read(self._path('memo', name))
+        if data is None:
+            data = self._download(f"memo/{name}")
+            if data is not None:
+                self._write(self._path('memo', name), data)
+        return json.loads(data) if data is not None else None
+
+    def set_class_list(self, report_key, extractor_version, class_list):
+        name = f"{safe_name(report_key)}-{safe_name(extractor_version)}.json"
+        data = json.dumps(class_list).encode('utf-8')
+        self._write(self._path('memo', name), data)
+        self._upload(f"memo/{name}", data)
+
+    # Delete the least recently used blobs until the blobs fit in max_bytes
+    def evict(self):
+        with self._lock:
+            blobs = []
+            total = 0
+            with os.scandir(os.path.join(self.directory, 'blobs')) as entries:
+                for entry in entries:
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        stat = entry.stat()
+                        blobs.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(blobs):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def _upload(self, name, data):
+        if self.s3 is None:
+            return
+        try:
+            self.s3.put_object(Bucket=self.s3_bucket, Key=self.s3_prefix + name, Body=data)
+        except Exception as e: # S3 is only a backup, the local store keeps working w/o it
+            print(f"Error uploading {name} to S3: {e}")
+
+    def _download(self, name):
+        if self.s3 is None:
+            return None
+        try:
+            return self.s3.get_object(Bucket=self.s3_bucket, Key=self.s3_prefix + name)['Body'].read()
+        except Exception:
+            return None
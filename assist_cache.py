@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+
+# Response cache of the ASSIST client (see assist_client.py). The agreements & major reports change about once a year, so they are cached for DEFAULT_TTL_SECONDS:
+    # fresh (age < ttl):                           served from the cache w/o any request
+    # stale (ttl <= age < ttl + stale_ttl):        served from the cache immediately, and revalidated in the background (stale-while-revalidate)
+    # expired:                                     revalidated before answering, w/ If-None-Match / If-Modified-Since so an unchanged response is a cheap 304
+    # ASSIST is down or slow (request failed):     the cached response is served whatever its age (stale-if-error)
+# Entries are stored on disk (1 file per URL) or in Redis (shared by every worker & server).
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_STALE_SECONDS = 30 * 24 * 60 * 60
+
+class CacheEntry:
+    def __init__(self, body, etag=None, last_modified=None, stored_at=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    def age(self):
+        return time.time() - self.stored_at
+
+    def json(self):
+        return json.loads(self.body)
+
+    # Headers of a conditional request for this entry
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+# 1 pickle file per entry, written atomically
+class DiskCacheBackend:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+
+    def set(self, key, entry, ttl_seconds):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f)
+        os.replace(tmp_path, path)
+
+# 1 Redis key per entry, expiring once it's too old to be served even as stale
+class RedisCacheBackend:
+    def __init__(self, redis_client, prefix='assist-cache:'):
+        self.redis = redis_client
+        self.prefix = prefix
+
+    def get(self, key):
+        data = self.redis.get(self.prefix + key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key, entry, ttl_seconds):
+        self.redis.set(self.prefix + key, pickle.dumps(entry), ex=int(ttl_seconds))
+
+class ResponseCache:
+    def __init__(self, backend, ttl_seconds=DEFAULT_TTL_SECONDS, stale_seconds=DEFAULT_STALE_SECONDS):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+
+    # Key of a request: hash of the full URL (so the stub & ASSIST never share entries) & the sorted query parameters
+    def make_key(self, url, params=None):
+        canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        try:
+            return self.backend.get(key)
+        except Exception as e: # A broken cache must never break the request
+            print(f"Error reading the ASSIST cache: {e}")
+            return None
+
+    def set(self, key, entry):
+        try:
+            # Entries outlive the stale window, so they can still be served if ASSIST fails (stale-if-error)
+            self.backend.set(key, entry, 2 * (self.ttl_seconds + self.stale_seconds))
+        except Exception as e:
+            print(f"Error writing the ASSIST cache: {e}")
+
+    def is_fresh(self, entry):
+        return entry.age() < self.ttl_seconds
+
+    def is_stale(self, entry):
+        return self.ttl_seconds <= entry.age() < self.ttl_seconds + self.stale_seconds
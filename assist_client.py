@@ -0,0 +1,220 @@
+import copy
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from assist_cache import CacheEntry, DiskCacheBackend, RedisCacheBackend, ResponseCache, DEFAULT_TTL_SECONDS, DEFAULT_STALE_SECONDS
+
+# Shared HTTP client for the ASSIST API, used by PDFOutput & the agreement index.
+# Every call used to open a new connection (requests.get / urllib.request.urlopen) and was paced w/ a fixed time.sleep. The client instead:
+    # 1.) Keeps a pool of persistent connections (1 requests.Session for the whole process)
+    # 2.) Paces the requests w/ a token bucket shared by every thread: bursts go out immediately, the average rate stays under 'rate' requests per second
+    # 3.) Sets a timeout on every call & retries connection errors, timeouts, 429 & 5xx responses w/ exponential backoff (honoring Retry-After up to max_backoff), giving up once the next wait would go past the deadline of the call
+    # 4.) Runs several lookups concurrently w/ map()
+    # 5.) Caches the JSON responses (disk or Redis) w/ a TTL, conditional revalidation & stale-while-revalidate (see assist_cache.py)
+# The base URL is configurable (ASSIST_BASE_URL), so the client can run against a local stub server (see assist_stub.py).
+
+DEFAULT_BASE_URL = 'https://assist.org'
+DEFAULT_RATE = 5.0 # Requests per second
+DEFAULT_BURST = 5
+DEFAULT_TIMEOUT = 10.0 # Seconds
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5 # Seconds before the 1st retry, doubled after every retry
+DEFAULT_MAX_BACKOFF = 10.0 # Longest wait between 2 attempts, whatever Retry-After says
+DEFAULT_DEADLINE = 30.0 # Seconds a call (every attempt & wait) can take before the client gives up
+DEFAULT_CONCURRENCY = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    # Take 1 token, waiting until one is available
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class AssistClient:
+    def __init__(self, base_url=DEFAULT_BASE_URL, rate=DEFAULT_RATE, burst=DEFAULT_BURST, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF, deadline=DEFAULT_DEADLINE, concurrency=DEFAULT_CONCURRENCY, cache=None, revalidate=False):
+        self.base_url = base_url.rstrip('/')
+        self.cache = cache
+        # True: every JSON request goes to ASSIST, a cached entry is only used for a conditional request (no fresh/stale answers from the cache, no stale-if-error)
+        self.revalidate = revalidate
+        # Keys being revalidated in the background, so a key is only revalidated once at a time
+        self._revalidating = set()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        # Enough pooled connections for every concurrent lookup
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    # Absolute URL of an ASSIST path. EX: url('/api/artifacts/123') -> 'https://assist.org/api/artifacts/123'
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    # GET w/ rate limiting, timeout & retries. Raises requests.RequestException once the retries are exhausted or the next wait would go past the deadline
+    def get(self, path, params=None, headers=None):
+        give_up_at = time.monotonic() + self.deadline
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.get(self.url(path), params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                wait = self._wait(attempt)
+                if attempt == self.retries or time.monotonic() + wait > give_up_at:
+                    raise
+                time.sleep(wait)
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                wait = self._wait(attempt, response)
+                if time.monotonic() + wait <= give_up_at:
+                    time.sleep(wait)
+                    continue
+            response.raise_for_status() # Check if response contains a 4xx or 5xx status code
+            return response
+
+    # Seconds to wait before the next attempt: Retry-After if the response has one, else exponential backoff, at most max_backoff
+    def _wait(self, attempt, response=None):
+        retry_after = self._retry_after(response) if response is not None else None
+        wait = retry_after if retry_after is not None else self.backoff * 2 ** attempt
+        return max(0.0, min(wait, self.max_backoff))
+
+    # Same client (connections, rate limiting & response cache) w/ revalidate=True. EX: to rebuild the agreement index from up-to-date responses
+    def revalidating(self):
+        client = copy.copy(self)
+        client.revalidate = True
+        return client
+
+    # GET a JSON response, through the response cache if the client has one
+    def get_json(self, path, params=None):
+        if self.cache is None:
+            return self.get(path, params=params).json()
+        key = self.cache.make_key(self.url(path), params)
+        entry = self.cache.get(key)
+        if self.revalidate:
+            return self._fetch(key, path, params, entry).json()
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                return entry.json()
+            if self.cache.is_stale(entry):
+                # Answer now, refresh the entry in the background
+                self._revalidate_in_background(key, path, params, entry)
+                return entry.json()
+        try:
+            return self._fetch(key, path, params, entry).json()
+        except requests.RequestException:
+            if entry is None:
+                raise
+            # ASSIST is down: serve the cached answer whatever its age
+            print(f"ASSIST request failed, serving a cached response of {path}")
+            return entry.json()
+
+    # Request (conditionally if there's a cached entry) & store the response. Returns the up-to-date entry
+    def _fetch(self, key, path, params, entry):
+        response = self.get(path, params=params, headers=entry.validators() if entry is not None else None)
+        if response.status_code == 304 and entry is not None:
+            # Unchanged: the cached body is fresh again
+            entry = CacheEntry(entry.body, entry.etag, entry.last_modified)
+        else:
+            entry = CacheEntry(response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        self.cache.set(key, entry)
+        return entry
+
+    def _revalidate_in_background(self, key, path, params, entry):
+        with self._executor_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        def revalidate():
+            try:
+                self._fetch(key, path, params, entry)
+            except requests.RequestException as e:
+                print(f"Error revalidating {path}: {e}")
+            finally:
+                with self._executor_lock:
+                    self._revalidating.discard(key)
+        threading.Thread(target=revalidate, name='assist-revalidate', daemon=True).start()
+
+    # Seconds to wait from the Retry-After header (None if missing or not a number of seconds)
+    def _retry_after(self, response):
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    # Run func over the items concurrently (still rate-limited by the bucket), results in the order of the items
+    def map(self, func, items):
+        return list(self.imap(func, items))
+
+    # Same as map, but the results are yielded as they come (in the order of the items). Closing the generator early (EX: a break) cancels the calls that haven't started
+    def imap(self, func, items):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='assist')
+        return self._executor.map(func, items)
+
+    # Every agreement of a community college
+    def get_agreements(self, community_college_id):
+        return self.get_json(f'/api/institutions/{community_college_id}/agreements')
+
+    # The major reports of the agreement between a university & a community college for a school year
+    def get_reports(self, university_id, community_college_id, school_year_id):
+        params = {'receivingInstitutionId': university_id, 'sendingInstitutionId': community_college_id, 'academicYearId': school_year_id, 'categoryCode': 'major'}
+        return self.get_json('/api/agreements', params=params)['reports']
+
+# Shared client for the whole process
+_client = None
+_client_lock = threading.Lock()
+
+# Response cache from the env vars: ASSIST_CACHE = 'disk' (default, in ASSIST_CACHE_DIR), 'redis' (ASSIST_CACHE_REDIS_URL or REDISCLOUD_URL) or 'off'
+def create_response_cache():
+    mode = os.getenv('ASSIST_CACHE', 'disk')
+    if mode == 'off':
+        return None
+    if mode == 'redis':
+        import redis
+        backend = RedisCacheBackend(redis.from_url(os.getenv('ASSIST_CACHE_REDIS_URL') or os.getenv('REDISCLOUD_URL')))
+    else:
+        backend = DiskCacheBackend(os.getenv('ASSIST_CACHE_DIR', 'assist_cache'))
+    return ResponseCache(
+        backend,
+        ttl_seconds=int(os.getenv('ASSIST_CACHE_TTL', DEFAULT_TTL_SECONDS)),
+        stale_seconds=int(os.getenv('ASSIST_CACHE_STALE', DEFAULT_STALE_SECONDS))
+    )
+
+def get_assist_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AssistClient(
+                    base_url=os.getenv('ASSIST_BASE_URL', DEFAULT_BASE_URL),
+                    rate=float(os.getenv('ASSIST_RATE', DEFAULT_RATE)),
+                    timeout=float(os.getenv('ASSIST_TIMEOUT', DEFAULT_TIMEOUT)),
+                    deadline=float(os.getenv('ASSIST_DEADLINE', DEFAULT_DEADLINE)),
+                    cache=create_response_cache()
+                )
+    return _client
@@ -0,0 +1,136 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stub of the ASSIST endpoints used by the app, to run the ASSIST client, PDFOutput & the agreement index w/o hitting assist.org.
+# Fixtures (JSON file):
+    # {"agreements": {"150": [{"institutionParentId": 11, "receivingYearIds": [72, 73]}, ...]},
+    #  "reports": {"11:73": [{"label": "Computer Science, B.S.", "key": "26539871"}, ...]},
+    #  "articulations": {"26539871": [{"templateCellId": "c1", "articulation": {"sendingArticulation": {...}}}, ...]},
+    #  "template_assets": {"26539871": [{"type": "RequirementGroup", ...}, ...]},
+    #  "artifacts": {"26539871": "path/to/agreement.pdf"}}
+# EX: python assist_stub.py fixtures.json --port 8001 --latency 0.2 --fail-rate 0.1
+#     ASSIST_BASE_URL=http://localhost:8001 python agreement_index.py
+# Record the articulation JSON of report keys from ASSIST (ASSIST_BASE_URL) into a fixtures file:
+#     python assist_stub.py tests/fixtures/agreement.json --record 26298705
+
+class AssistStub:
+    def __init__(self, fixtures, latency=0.0, fail_rate=0.0, retry_after=None):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.fail_rate = fail_rate
+        # Retry-After header (seconds) of the 503 responses
+        self.retry_after = retry_after
+        # Number of requests per path, to check what the client actually sent
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    # Returns (status, content type, body) for a GET
+    def respond(self, path, query):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            return 503, 'application/json', b'{"error": "unavailable"}'
+
+        parts = path.strip('/').split('/')
+        if parts[:2] == ['api', 'institutions'] and len(parts) == 4 and parts[3] == 'agreements':
+            return self._json(self.fixtures.get('agreements', {}).get(parts[2], []))
+        if parts == ['api', 'agreements']:
+            key = f"{query.get('receivingInstitutionId', [''])[0]}:{query.get('academicYearId', [''])[0]}"
+            return self._json({'reports': self.fixtures.get('reports', {}).get(key, [])})
+        if parts == ['api', 'articulation', 'Agreements']:
+            report_key = query.get('Key', [''])[0]
+            articulations = self.fixtures.get('articulations', {}).get(report_key)
+            if articulations is not None:
+                # ASSIST sends the articulations & the template assets as JSON strings inside the JSON response
+                template_assets = self.fixtures.get('template_assets', {}).get(report_key, [])
+                return self._json({'result': {'articulations': json.dumps(articulations), 'templateAssets': json.dumps(template_assets)}, 'isSuccessful': True})
+        if parts[:2] == ['api', 'artifacts'] and len(parts) == 3:
+            artifact = self.fixtures.get('artifacts', {}).get(parts[2])
+            if artifact is not None:
+                with open(artifact, 'rb') as f:
+                    return 200, 'application/pdf', f.read()
+        return 404, 'application/json', b'{"error": "not found"}'
+
+    def _json(self, data):
+        return 200, 'application/json', json.dumps(data).encode('utf-8')
+
+    # Start the server in a daemon thread. Returns (server, base URL); port=0 picks a free port
+    def serve(self, port=0):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, content_type, body = stub.respond(url.path, parse_qs(url.query))
+                # ETag of the body, so the client's response cache can revalidate w/ If-None-Match
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    status, body = 304, b''
+                self.send_response(status)
+                if status in (200, 304):
+                    self.send_header('ETag', etag)
+                if status == 503 and stub.retry_after is not None:
+                    self.send_header('Retry-After', str(stub.retry_after))
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        threading.Thread(target=server.serve_forever, name='assist-stub', daemon=True).start()
+        return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+# Add the articulation JSON of report keys to a fixtures dictionary, fetched w/ an ASSIST client
+def record_fixtures(fixtures, report_keys, client):
+    for report_key in report_keys:
+        result = client.get_json('/api/articulation/Agreements', params={'Key': report_key})['result']
+        fixtures.setdefault('articulations', {})[report_key] = json.loads(result['articulations'])
+        fixtures.setdefault('template_assets', {})[report_key] = json.loads(result.get('templateAssets') or '[]')
+    return fixtures
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve stub ASSIST endpoints from a fixtures file.')
+    parser.add_argument('fixtures', help='JSON file w/ the agreements, reports & artifacts to serve')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered w/ a 503')
+    parser.add_argument('--retry-after', type=int, help='Retry-After header (seconds) of the 503 responses')
+    parser.add_argument('--record', nargs='+', metavar='REPORT_KEY', help='Record the articulation JSON of these report keys into the fixtures file instead of serving it')
+    args = parser.parse_args()
+
+    if args.record:
+        from assist_client import AssistClient, DEFAULT_BASE_URL
+        fixtures = {}
+        if os.path.exists(args.fixtures):
+            with open(args.fixtures) as f:
+                fixtures = json.load(f)
+        record_fixtures(fixtures, args.record, AssistClient(os.getenv('ASSIST_BASE_URL', DEFAULT_BASE_URL)))
+        with open(args.fixtures, 'w') as f:
+            json.dump(fixtures, f, indent=2)
+        print(f"Recorded {len(args.record)} report(s) into {args.fixtures}")
+        return
+
+    with open(args.fixtures) as f:
+        fixtures = json.load(f)
+    server, base_url = AssistStub(fixtures, args.latency, args.fail_rate, args.retry_after).serve(args.port)
+    print(f"Stub ASSIST server on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
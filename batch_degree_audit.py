@@ -0,0 +1,131 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Batch degree audit: runs the degree finder, IGETC & CSU-GE evaluation (same results as /evaluate-requirements) for a whole cohort of students, w/o any HTTP calls.
+# Input: a CSV or JSONL file of student class lists:
+    # CSV: a 'student_id' column + either a 'classes' column (classes separated by ';', '|' or ',') or 1 class per other column
+    # JSONL: 1 object per line: {"student_id": "123", "classes": ["MATH1A", ...]} ("classes" can also be the {textbox: class} payload of the schedule page)
+# Students are read & sent to the worker processes in chunks, and the results are written as JSONL as soon as each chunk finishes (in input order), so memory stays flat for any cohort size.
+# EX: python batch_degree_audit.py students.csv --output audit.jsonl --workers 8
+# EX: cat students.jsonl | python batch_degree_audit.py - --format jsonl > audit.jsonl
+
+DEFAULT_CHUNK_SIZE = 200
+CLASS_SEPARATORS = (';', '|', ',')
+
+# Read the student records of a CSV file lazily: (student ID, class list)
+# The classes are stripped & empty cells/tokens are dropped (EX: "MATH1A; MATH1B;" -> ['MATH1A', 'MATH1B'])
+def read_csv(f):
+    for n, row in enumerate(csv.DictReader(f), start=1):
+        student_id = row.pop('student_id', None) or str(n)
+        if 'classes' in row:
+            classes = row['classes'] or ''
+            for separator in CLASS_SEPARATORS:
+                if separator in classes:
+                    classes = classes.split(separator)
+                    break
+            else:
+                classes = [classes]
+        else:
+            classes = list(row.values())
+        yield student_id, [class_id.strip() for class_id in classes if isinstance(class_id, str) and class_id.strip()]
+
+# Read the student records of a JSONL file lazily: (student ID, class list)
+# A malformed line is reported on stderr w/ its line number & skipped, so it doesn't stop the rest of the cohort
+def read_jsonl(f):
+    for n, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Skipping line {n}: invalid JSON ({e})", file=sys.stderr)
+            continue
+        if not isinstance(record, dict):
+            print(f"Skipping line {n}: expected a JSON object", file=sys.stderr)
+            continue
+        classes = record.get('classes', [])
+        if isinstance(classes, dict):
+            classes = list(classes.values())
+        yield str(record.get('student_id', n)), classes
+
+# Runs in a worker process: audit 1 chunk of students. The indexes are built once per process & reused by every chunk
+def audit_students(students):
+    from degree_index import find_degrees, normalize_classes
+    from ge_index import complete_IGETC, complete_CSU_GE
+
+    results = []
+    for student_id, classes in students:
+        user_classes = normalize_classes(classes)
+        completed_degrees, almost_completed_degrees = find_degrees(user_classes)
+        results.append({
+            'student_id': student_id,
+            'completed_degrees': completed_degrees,
+            'almost_completed_degrees': almost_completed_degrees,
+            'IGETC_results': complete_IGETC(user_classes),
+            'CSU_GE_results': complete_CSU_GE(user_classes)
+        })
+    return results
+
+def chunked(records, chunk_size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+# Batch API: audit every student record & yield the results in input order
+# At most 2 chunks per worker are in flight, so the input is never read much further ahead than the output
+def audit_stream(records, workers=4, chunk_size=DEFAULT_CHUNK_SIZE):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for chunk in chunked(records, chunk_size):
+            pending.append(executor.submit(audit_students, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the degree finder, IGETC & CSU-GE evaluation over a cohort of student class lists.')
+    parser.add_argument('input', help="CSV or JSONL file of student class lists ('-' for stdin)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: from the file extension)')
+    parser.add_argument('--output', help='JSONL file for the results (default: stdout)')
+    parser.add_argument('--workers', type=int, default=4, help='Number of worker processes')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Students sent to a worker at a time')
+    args = parser.parse_args()
+
+    input_format = args.format or ('jsonl' if args.input.endswith(('.jsonl', '.json')) else 'csv')
+    # Build the indexes in the parent, so forked workers inherit them instead of building their own
+    from degree_index import get_degree_index
+    from ge_index import preload
+    get_degree_index()
+    preload()
+
+    infile = sys.stdin if args.input == '-' else open(args.input, newline='')
+    outfile = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        records = read_jsonl(infile) if input_format == 'jsonl' else read_csv(infile)
+        start = time.perf_counter()
+        n = 0
+        for n, result in enumerate(audit_stream(records, args.workers, args.chunk_size), start=1):
+            outfile.write(json.dumps(result) + '\n')
+            if n % (args.chunk_size * args.workers) == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{n} students in {elapsed:.1f}s ({n / elapsed:.0f} students/s)", file=sys.stderr)
+        elapsed = time.perf_counter() - start
+        print(f"Done: {n} students in {elapsed:.1f}s ({n / elapsed if elapsed else 0:.0f} students/s)", file=sys.stderr)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import contextlib
+import io
+import random
+import sys
+import time
+from prereq_graph import PrereqGraph
+from schedule_engine import schedule_classes
+
+# Benchmark for the two prerequisite modes of unverifiedScheduleGenerator: completed classes kept as a list & checked w/ `in` scans like the original check_prereq_completion (use_bitsets=False) vs. kept as a bitmask (use_bitsets=True).
+# The timed code is the shipped code path:
+    # 1.) W/ the real catalog (needs pdfExtract & the file_dictionaries pickles): Schedule.unverifiedScheduleGenerator itself
+    # 2.) W/ a synthetic catalog (runs anywhere): the steps unverifiedScheduleGenerator runs on a class list, w/ the same functions: PrereqGraph.all_prerequisites, the prereq depths, then schedule_engine.schedule_classes
+# The schedule cache is bypassed, so every run does the work. Run: python benchmark_prereqs.py [course counts...]
+# EX: python benchmark_prereqs.py 500 2000 5000
+
+# Class lists per run & requirements per class list (the prerequisites are added to them, like for an ASSIST agreement)
+N_CLASS_LISTS = 200
+N_REQUIREMENTS = 8
+
+SUBJECTS = ['MATH', 'CHEM', 'PHYS', 'ENGL', 'BIOL', 'CSCI', 'HIST', 'ECON']
+
+# Create a class_dict w/ the same prerequisite shapes as the real catalog: NaN, str, tuple (AND), list (OR) and the nested combinations
+def synthetic_class_dict(n_courses, seed=0):
+    rand = random.Random(seed)
+    class_dict = {}
+    names = []
+    for i in range(n_courses):
+        name = f"{SUBJECTS[i % len(SUBJECTS)]}{i}"
+        # Prerequisites are picked from the previous 50 classes so the prerequisite chains stay realistic
+        pool = names[-50:]
+        pick = lambda: rand.choice(pool)
+        shape = rand.randrange(7) if pool else 0
+        if shape == 0:
+            prereqs = float('nan')
+        elif shape == 1:
+            prereqs = pick()
+        elif shape == 2:
+            prereqs = [pick() for _ in range(rand.randint(2, 3))]
+        elif shape == 3:
+            prereqs = [pick(), (pick(), pick())]
+        elif shape == 4:
+            prereqs = tuple(pick() for _ in range(rand.randint(2, 3)))
+        elif shape == 5:
+            prereqs = ([pick(), pick()], [pick(), pick()])
+        else:
+            prereqs = (pick(), [pick(), pick()])
+        class_dict[name] = {'Subject': name.rstrip('0123456789'), 'Units': '3.00', 'PREREQUISITES': prereqs, 'prereq_depth': 0}
+        names.append(name)
+    return class_dict
+
+# Prereq depth of every class of a synthetic catalog: 0 w/o prerequisites, else 1 + the deepest class its prerequisites reference
+# The prerequisites of a class always come before it in the synthetic catalog, so 1 pass in catalog order is enough
+def set_prereq_depths(class_dict, graph):
+    for name in class_dict:
+        referenced = graph.referenced(graph.ids[name])
+        class_dict[name]['prereq_depth'] = 1 + max((class_dict[graph.names[cid]]['prereq_depth'] for cid in referenced), default=-1)
+
+def random_class_lists(names, seed=1):
+    rand = random.Random(seed)
+    return [rand.sample(names, N_REQUIREMENTS) for _ in range(N_CLASS_LISTS)]
+
+# What unverifiedScheduleGenerator does w/ a class list, called on a synthetic catalog
+def synthetic_generator(class_dict, graph):
+    def generate(class_list, use_bitsets):
+        class_list = graph.all_prerequisites(class_list)
+        depths = {classID: class_dict[classID]['prereq_depth'] for classID in class_list}
+        return schedule_classes(depths, class_dict, graph, use_bitsets=use_bitsets)
+    return generate
+
+# Schedule.unverifiedScheduleGenerator w/o its cache (and w/o its debug prints), or None if the real catalog can't be loaded
+def real_generator():
+    try:
+        import Schedule
+    except (ImportError, OSError) as e:
+        print(f"Real catalog not available ({e}), only the synthetic catalog is benchmarked")
+        return None, None
+    def generate(class_list, use_bitsets):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return Schedule.unverifiedScheduleGenerator.__wrapped__(class_list, use_bitsets=use_bitsets)
+    return generate, list(Schedule.class_dict.keys())
+
+# Time both modes on the same class lists & check they give the same schedules
+def time_modes(label, generate, class_lists, repeat=3):
+    timings = {}
+    results = {}
+    for use_bitsets in (False, True):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results[use_bitsets] = [generate(class_list, use_bitsets) for class_list in class_lists]
+            best = min(best, time.perf_counter() - start)
+        timings[use_bitsets] = best
+
+    assert results[False] == results[True]
+    print(f"{label:>24} | list: {timings[False] * 1000:9.2f} ms | bitset: {timings[True] * 1000:8.2f} ms | speedup: {timings[False] / timings[True]:6.1f}x")
+
+def benchmark(n_courses, repeat=3):
+    class_dict = synthetic_class_dict(n_courses)
+    graph = PrereqGraph(class_dict)
+    set_prereq_depths(class_dict, graph)
+    time_modes(f"{n_courses} synthetic classes", synthetic_generator(class_dict, graph), random_class_lists(list(class_dict.keys())), repeat)
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [250, 1000, 4000]
+    generate, names = real_generator()
+    if generate is not None:
+        time_modes('real catalog', generate, random_class_lists(names))
+    for n_courses in sizes:
+        benchmark(n_courses)
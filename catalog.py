@@ -0,0 +1,72 @@
+import copy
+import gc
+import hashlib
+import pickle
+import threading
+from types import MappingProxyType
+
+# Registry of the static catalog dictionaries (the .pkl files). Every artifact is read & unpickled exactly once per process and then shared by every module & request.
+# The objects are shared, so they must be treated as read-only: view() wraps them in a read-only mapping for code that only reads them, copy() returns a private deep copy for code that modifies them.
+# To share the memory between gunicorn workers, the app preloads the catalog before the workers are forked (see gunicorn.conf.py). freeze() moves the loaded objects to the GC's permanent generation, so the garbage collector never writes to their pages and they stay shared through copy-on-write.
+
+CATALOG_FILES = {
+    'class_dict': 'file_dictionaries/class_dict.pkl', # Class ID -> subject, units, prereq depth & prerequisites
+    'CSU_GE': 'file_dictionaries/CSU_GE.pkl', # CSU-GE area -> subject -> classes
+    'IGETC': 'file_dictionaries/IGETC.pkl', # IGETC area -> subject -> classes
+    'degree_dict': 'file_dictionaries/degree_dict.pkl', # Degree -> required/optional classes
+    'u_map': 'u_map.pkl', # ASSIST university ID -> code, institution name & majors
+}
+
+class CatalogRegistry:
+    def __init__(self, files=CATALOG_FILES):
+        self.files = dict(files)
+        self._objects = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.frozen = False
+
+    # Load an artifact the first time it's needed (thread-safe), afterwards it's a dictionary lookup
+    def _load(self, name):
+        with self._lock:
+            if name not in self._objects:
+                with open(self.files[name], 'rb') as f:
+                    data = f.read()
+                self._objects[name] = pickle.loads(data)
+                # The version of an artifact is the hash of its file, so caches can tell when the data changed
+                self._versions[name] = hashlib.sha256(data).hexdigest()[:16]
+        return self._objects[name]
+
+    # The shared object itself. Never modify it
+    def get(self, name):
+        obj = self._objects.get(name)
+        if obj is None:
+            obj = self._load(name)
+        return obj
+
+    # Read-only view of a dictionary artifact
+    def view(self, name):
+        return MappingProxyType(self.get(name))
+
+    # Private deep copy of an artifact, for code that modifies it
+    def copy(self, name):
+        return copy.deepcopy(self.get(name))
+
+    # Hash of the file an artifact was loaded from
+    def version(self, name):
+        self.get(name)
+        return self._versions[name]
+
+    # Load every artifact now (EX: in the gunicorn master before forking the workers)
+    def preload(self):
+        for name in self.files:
+            self.get(name)
+
+    # Collect once, then freeze everything that is alive so the GC of the forked workers never touches (and copies) these pages
+    def freeze(self):
+        if not self.frozen:
+            gc.collect()
+            gc.freeze()
+            self.frozen = True
+
+# Shared registry for the whole process
+catalog = CatalogRegistry()
@@ -0,0 +1,302 @@
+import heapq
+import os
+import sys
+import threading
+from itertools import islice
+from catalog import catalog
+
+# Compiled form of degree_dict.pkl for the degree finder (/calculate-degrees).
+# Checking a class list used to walk the requirements of every degree. DegreeIndex does the work once when the catalog loads:
+    # 1.) Every class that shows up in a degree is interned to a bit position
+    # 2.) Each degree is stored as a bitmask of its required classes + a list of "pick" groups (bitmask of the options, min number of classes, min units)
+    # 3.) An inverted index maps every class to the degrees it counts towards, so only the degrees that share at least 1 class w/ the user are evaluated
+# Completion & leftovers are then computed w/ mask intersections and popcounts.
+# Supported shapes of a degree_dict value:
+    # EX: ['MATH1A', 'MATH1B']                                             -> every class is required
+    # EX: {'required': ['MATH1A'], 'optional': [['PHYS4A', 'CHEM1A'], {'classes': ['ART1', 'ART2', 'ART3'], 'count': 2}, {'classes': [...], 'units': 6}]}
+    #     A plain list in 'optional' means 1 class of the list is needed
+# A degree w/ any other shape (EX: a dict w/ a key that isn't listed below) makes the index unsupported (see DegreeIndex.supported), the app then uses degree.get_complete_degrees instead.
+# The threshold & the key names have to match what degree.get_complete_degrees does w/ degree_dict.pkl, so they're set w/ env vars (tests/test_degree_index.py compares both when degree.py & the pickles are available):
+    # DEGREE_ALMOST_COMPLETED_MAX: a degree w/ at most this many classes left counts as "almost completed"
+    # DEGREE_REQUIRED_KEYS / DEGREE_OPTIONAL_KEYS: comma separated keys of a degree entry that hold its required classes & its pick groups
+
+# Defaults when the env vars aren't set
+ALMOST_COMPLETED_MAX = 3
+REQUIRED_KEYS = ('required',)
+OPTIONAL_KEYS = ('optional',)
+
+def _env_keys(name, default):
+    value = os.getenv(name)
+    if not value:
+        return default
+    return tuple(key.strip() for key in value.split(',') if key.strip())
+
+class DegreeIndex:
+    def __init__(self, degree_dict, class_dict=None, almost_completed_max=None, required_keys=None, optional_keys=None):
+        self.almost_completed_max = int(os.getenv('DEGREE_ALMOST_COMPLETED_MAX', ALMOST_COMPLETED_MAX)) if almost_completed_max is None else almost_completed_max
+        self.required_keys = tuple(required_keys or _env_keys('DEGREE_REQUIRED_KEYS', REQUIRED_KEYS))
+        self.optional_keys = tuple(optional_keys or _env_keys('DEGREE_OPTIONAL_KEYS', OPTIONAL_KEYS))
+        self.units = {}
+        if class_dict is not None:
+            for class_id, info in class_dict.items():
+                try:
+                    self.units[class_id] = float(info['Units'])
+                except (KeyError, TypeError, ValueError):
+                    pass
+
+        # Classes interned to bit positions
+        self.classes = []
+        self.bits = {}
+        # Degrees in the order of degree_dict
+        self.names = []
+        self.required_masks = []
+        self.required_bits = []
+        # Pick groups of every degree: tuple of (options mask, min classes, min units, options in order)
+        self.groups = []
+        # Class -> IDs of the degrees it counts towards
+        self.degrees_of = {}
+        # Degrees whose entry has an unknown shape & why (degree -> error)
+        self.unsupported = []
+        self.unsupported_errors = {}
+
+        for name, entry in degree_dict.items():
+            try:
+                required, groups = _normalize_degree(entry, self.required_keys, self.optional_keys)
+            except ValueError as e:
+                self.unsupported.append(name)
+                self.unsupported_errors[name] = str(e)
+                continue
+            degree_id = len(self.names)
+            self.names.append(name)
+            self.required_masks.append(self.mask(required, intern=True))
+            self.required_bits.append(tuple(self.bits[class_id] for class_id in required))
+            compiled = []
+            for classes, count, units in groups:
+                compiled.append((self.mask(classes, intern=True), count, units, tuple(self.bits[class_id] for class_id in classes)))
+            self.groups.append(tuple(compiled))
+            for class_id in required + [class_id for classes, _, _ in groups for class_id in classes]:
+                degrees = self.degrees_of.setdefault(class_id, [])
+                if not degrees or degrees[-1] != degree_id:
+                    degrees.append(degree_id)
+        # Units of every degree when none of its classes are taken
+        self.full_units = [self.remaining_units(degree_id, 0) for degree_id in range(len(self.names))]
+        # Degrees sorted by full units (ties in degree_dict order), so a ranking only has to sort the degrees whose units changed
+        self.by_full_units = sorted(range(len(self.names)), key=lambda degree_id: (self.full_units[degree_id], degree_id))
+
+    @property
+    def supported(self):
+        return not self.unsupported
+
+    # Bitmask of a list of classes. Classes that are not part of any degree (& values that aren't class IDs) are ignored unless intern=True
+    # The classes are used as given: the callers normalize them w/ normalize_classes first
+    def mask(self, class_list, intern=False):
+        mask = 0
+        for class_id in class_list:
+            if not isinstance(class_id, str):
+                continue
+            bit = self.bits.get(class_id)
+            if bit is None:
+                if not intern:
+                    continue
+                bit = self.bits[class_id] = len(self.classes)
+                self.classes.append(class_id)
+            mask |= 1 << bit
+        return mask
+
+    # IDs of the degrees that share at least 1 class w/ the class list, in degree_dict order
+    def candidates(self, class_list):
+        degree_ids = set()
+        for class_id in class_list:
+            if isinstance(class_id, str):
+                degree_ids.update(self.degrees_of.get(class_id, ()))
+        return sorted(degree_ids)
+
+    # Classes still needed to complete a degree, given the bitmask of the completed classes:
+    # the missing required classes, then for every unmet pick group, the first options not taken yet until the group is met
+    def leftover(self, degree_id, completed_mask):
+        leftover = []
+        # Missing required classes in the order the degree lists them
+        if self.required_masks[degree_id] & ~completed_mask:
+            leftover.extend(self.classes[bit] for bit in self.required_bits[degree_id] if not completed_mask >> bit & 1)
+        for options_mask, count, units, options in self.groups[degree_id]:
+            taken = options_mask & completed_mask
+            needed_count = count - taken.bit_count()
+            needed_units = units - self._units_of(taken) if units else 0
+            for bit in options:
+                if needed_count <= 0 and needed_units <= 0:
+                    break
+                if not completed_mask >> bit & 1:
+                    class_id = self.classes[bit]
+                    leftover.append(class_id)
+                    needed_count -= 1
+                    needed_units -= self.units.get(class_id, 0)
+        return leftover
+
+    # Units still needed to complete a degree (the units of its leftover classes)
+    def remaining_units(self, degree_id, completed_mask):
+        return sum(self.units.get(class_id, 0) for class_id in self.leftover(degree_id, completed_mask))
+
+    def _units_of(self, mask):
+        total = 0
+        while mask:
+            low = mask & -mask
+            total += self.units.get(self.classes[low.bit_length() - 1], 0)
+            mask ^= low
+        return total
+
+    # Same contract as degree.get_complete_degrees: the completed degrees & the almost completed degrees w/ their leftover classes
+    # Only the candidate degrees are evaluated: a degree that shares no class w/ the user can't be completed nor almost completed
+    def get_complete_degrees(self, user_classes):
+        user_classes = list(user_classes)
+        completed_mask = self.mask(user_classes)
+        completed_degrees = []
+        almost_completed_degrees = {}
+        for degree_id in self.candidates(user_classes):
+            # Popcount of the missing required classes: too many -> no need to build the leftover list
+            if (self.required_masks[degree_id] & ~completed_mask).bit_count() > self.almost_completed_max:
+                continue
+            leftover = self.leftover(degree_id, completed_mask)
+            if not leftover:
+                completed_degrees.append(self.names[degree_id])
+            elif len(leftover) <= self.almost_completed_max:
+                almost_completed_degrees[self.names[degree_id]] = leftover
+        return completed_degrees, almost_completed_degrees
+
+# Class IDs of the values of the schedule grid: stripped, upper case, w/o blanks & duplicates (EX: [' math1a', 'MATH1A', ''] -> ['MATH1A'])
+# Every endpoint that evaluates the user's classes (& the batch audit) reads them through this, so the same grid gives the same results everywhere
+def normalize_classes(user_classes):
+    classes = []
+    seen = set()
+    for value in user_classes:
+        if not isinstance(value, str):
+            continue
+        class_id = value.strip().upper()
+        if class_id and class_id not in seen:
+            seen.add(class_id)
+            classes.append(class_id)
+    return classes
+
+# Return (required classes, pick groups) of a degree_dict value, where a pick group is (classes, min classes, min units)
+# A dict entry must only have recognized keys (at least 1), else the entry would compile to a degree w/ missing (or no) requirements
+def _normalize_degree(entry, required_keys=REQUIRED_KEYS, optional_keys=OPTIONAL_KEYS):
+    if isinstance(entry, (list, tuple, set)):
+        return _class_list(entry), []
+    if not isinstance(entry, dict):
+        raise ValueError(f"Unknown degree entry: {entry!r}")
+    unknown = [key for key in entry if key not in required_keys and key not in optional_keys]
+    if unknown or not entry:
+        raise ValueError(f"Unknown degree keys: {unknown or list(entry)!r}")
+    required = _class_list(next((entry[key] for key in required_keys if key in entry), []))
+    groups = []
+    for group in next((entry[key] for key in optional_keys if key in entry), []):
+        if isinstance(group, (list, tuple, set)):
+            groups.append((_class_list(group), 1, 0))
+        elif isinstance(group, dict) and 'classes' in group:
+            units = float(group.get('units') or 0)
+            count = int(group.get('count') or (0 if units else 1))
+            groups.append((_class_list(group['classes']), count, units))
+        else:
+            raise ValueError(f"Unknown degree group: {group!r}")
+    return required, groups
+
+def _class_list(classes):
+    if isinstance(classes, str) or not all(isinstance(class_id, str) for class_id in classes):
+        raise ValueError(f"Unknown class list: {classes!r}")
+    return list(dict.fromkeys(classes))
+
+# Ranking of the degrees w/ the fewest remaining units for a class set that changes 1 class at a time (EX: a counselor clicking "add class").
+# Only the remaining units that differ from DegreeIndex.full_units are kept, and adding/removing a class only re-evaluates the degrees that class counts towards.
+class DegreeRanker:
+    def __init__(self, index, classes=(), remaining=None):
+        self.index = index
+        self.classes = normalize_classes(classes)
+        self.completed_mask = index.mask(self.classes)
+        if remaining is None:
+            # Initial ranking: only the candidate degrees can differ from their full units
+            self.remaining = {}
+            for degree_id in index.candidates(self.classes):
+                self._update(degree_id)
+        else:
+            self.remaining = {int(degree_id): units for degree_id, units in remaining.items()}
+
+    def _update(self, degree_id):
+        units = self.index.remaining_units(degree_id, self.completed_mask)
+        if units == self.index.full_units[degree_id]:
+            self.remaining.pop(degree_id, None)
+        else:
+            self.remaining[degree_id] = units
+
+    def _changed(self, class_id):
+        for degree_id in self.index.degrees_of.get(class_id, ()):
+            self._update(degree_id)
+
+    def add(self, class_id):
+        classes = normalize_classes([class_id])
+        if not classes or classes[0] in self.classes:
+            return
+        class_id = classes[0]
+        self.classes.append(class_id)
+        self.completed_mask |= self.index.mask([class_id])
+        self._changed(class_id)
+
+    def remove(self, class_id):
+        classes = normalize_classes([class_id])
+        if not classes or classes[0] not in self.classes:
+            return
+        class_id = classes[0]
+        self.classes.remove(class_id)
+        self.completed_mask &= ~self.index.mask([class_id])
+        self._changed(class_id)
+
+    def remaining_units(self, degree_id):
+        return self.remaining.get(degree_id, self.index.full_units[degree_id])
+
+    # The k degrees w/ the fewest remaining units (ties in degree_dict order), w/ their leftover classes
+    # The degrees whose units changed are merged w/ the presorted full units of the others, so only the changed degrees are sorted
+    def top(self, k):
+        changed = heapq.nsmallest(k, ((units, degree_id) for degree_id, units in self.remaining.items()))
+        unchanged = ((self.index.full_units[degree_id], degree_id) for degree_id in self.index.by_full_units if degree_id not in self.remaining)
+        return [{
+            'degree': self.index.names[degree_id],
+            'remaining_units': units,
+            'leftover': self.index.leftover(degree_id, self.completed_mask)
+        } for units, degree_id in islice(heapq.merge(changed, unchanged), max(k, 0))]
+
+    # State to keep between requests (EX: in the tab of the schedule)
+    def to_state(self):
+        return {'classes': self.classes, 'remaining': self.remaining}
+
+    @classmethod
+    def from_state(cls, index, state):
+        return cls(index, state['classes'], state['remaining'])
+
+# Degree index of the catalog, built the first time it's needed
+_index = None
+_lock = threading.Lock()
+
+def get_degree_index():
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = DegreeIndex(catalog.get('degree_dict'), catalog.get('class_dict'))
+                warn_if_unsupported(_index)
+    return _index
+
+# The schema of degree_dict.pkl can't be read from degree.py here, so a degree_dict the index doesn't understand is reported loudly (the app builds the index at startup)
+# instead of silently using degree.get_complete_degrees & answering 501 on /closest-degrees
+def warn_if_unsupported(index):
+    if index.supported:
+        return
+    examples = '; '.join(f"{name!r}: {index.unsupported_errors[name]}" for name in index.unsupported[:3])
+    print(f"WARNING: the degree index doesn't support {len(index.unsupported)} of {len(index.unsupported) + len(index.names)} degree_dict entries (EX: {examples}). "
+          f"/calculate-degrees uses degree.get_complete_degrees & /closest-degrees is disabled. Set DEGREE_REQUIRED_KEYS / DEGREE_OPTIONAL_KEYS to the keys of the degree entries", file=sys.stderr)
+
+# Find the degrees completed & almost completed w/ the degree index, which only evaluates the candidate degrees
+# If degree_dict has entries the index doesn't understand, use the Backend Python Function instead
+def find_degrees(user_classes):
+    index = get_degree_index()
+    if index.supported:
+        return index.get_complete_degrees(user_classes)
+    from degree import get_complete_degrees
+    return get_complete_degrees(user_classes)
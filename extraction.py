@@ -0,0 +1,138 @@
+import os
+import sys
+import tempfile
+import threading
+import requests
+from artifact_store import ArtifactStore, DEFAULT_DIRECTORY, DEFAULT_MAX_BYTES
+import articulation_extractor
+import pdfExtract
+from parallel_extract import parallel_supported, process_pdf_bytes_parallel
+
+# Class list of an ASSIST agreement for index(): the extractor w/ the memo of the artifact store in front of it.
+# The memo is keyed by the report key of the PDF URL & the extractor version, so a repeat major skips the download & the PDF parse, and changing the extractor invalidates every memoized class list.
+# Extractors (AGREEMENT_EXTRACTOR):
+    # 'pdf' (default): pdfExtract.process_pdf, recovers the requirements from the layout of the agreement PDF
+    #     process_pdf gets a local copy of the PDF from the artifact store (downloaded through the ASSIST client only the 1st time), so a new extractor version re-parses w/o downloading again
+    #     If process_pdf can't read a local file, it gets the URL like before (w/ a warning on stderr, once per process)
+    # 'pdf-parallel': the pages of the PDF (from the artifact store) extracted in parallel by parallel_extract.py. Needs the 2 steps of process_pdf in pdfExtract (see parallel_extract.parallel_supported), else it's the same as 'pdf' (w/ a warning on stderr)
+    #     Its class lists are memoized under their own version. W/ PARALLEL_EXTRACT_VERIFY=1, process_pdf runs too & the sequential class list is used (& memoized) whenever they differ
+    # 'json': articulation_extractor.process_articulation, builds them from the articulation JSON of the report. Falls back to the PDF if the JSON can't be fetched or is empty
+
+# Bump when the PDF extraction changes the class lists it returns
+EXTRACTOR_VERSION = 'pdf-1'
+# The parallel extraction has its own version, so its class lists never replace the ones of process_pdf
+PARALLEL_EXTRACTOR_VERSION = 'pdf-parallel-1'
+
+_store = None
+_lock = threading.Lock()
+_parallel_fallback_warned = False
+# None until the 1st extraction, then whether process_pdf reads the local copy of a PDF
+_process_pdf_reads_files = None
+
+# Shared artifact store configured from the env vars (ARTIFACT_STORE_DIR, ARTIFACT_STORE_MAX_MB & ARTIFACT_S3_BUCKET to back it w/ S3)
+def get_artifact_store():
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                s3_bucket = os.getenv('ARTIFACT_S3_BUCKET')
+                s3_client = None
+                if s3_bucket:
+                    import boto3
+                    s3_client = boto3.client('s3')
+                max_mb = os.getenv('ARTIFACT_STORE_MAX_MB')
+                _store = ArtifactStore(
+                    os.getenv('ARTIFACT_STORE_DIR', DEFAULT_DIRECTORY),
+                    max_bytes=int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES,
+                    s3_client=s3_client,
+                    s3_bucket=s3_bucket
+                )
+    return _store
+
+# Report key of an artifact URL. EX: 'https://assist.org/api/artifacts/26539871' -> '26539871'
+def report_key_of(pdf_url):
+    return pdf_url.rstrip('/').rsplit('/', 1)[-1]
+
+# Raw bytes of the agreement PDF: from the artifact store, downloaded through the ASSIST client only the first time
+def fetch_artifact(pdf_url):
+    from assist_client import get_assist_client
+    client = get_assist_client()
+    report_key = report_key_of(pdf_url)
+    return get_artifact_store().get_artifact(report_key, lambda: client.get(f"/api/artifacts/{report_key}").content)
+
+# True if the 'pdf-parallel' extractor can run. Warns (once per process) when it's configured but pdfExtract doesn't have the 2 steps, so the fallback to process_pdf isn't silent
+def parallel_extraction_available():
+    global _parallel_fallback_warned
+    if parallel_supported():
+        return True
+    if not _parallel_fallback_warned:
+        _parallel_fallback_warned = True
+        print("Warning: AGREEMENT_EXTRACTOR=pdf-parallel needs pdfExtract.extract_page_items & pdfExtract.finish_page_items, using pdfExtract.process_pdf instead", file=sys.stderr)
+    return False
+
+# pdfExtract.process_pdf on the stored bytes of the agreement (see the 'pdf' extractor)
+def process_stored_pdf(pdf_url, university_id, major):
+    global _process_pdf_reads_files
+    if _process_pdf_reads_files is False:
+        return pdfExtract.process_pdf(pdf_url, university_id, major)
+    pdf_bytes = fetch_artifact(pdf_url)
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as temp_pdf:
+        temp_pdf.write(pdf_bytes)
+        temp_pdf.flush()
+        try:
+            class_list = pdfExtract.process_pdf(temp_pdf.name, university_id, major)
+        except Exception as e:
+            if _process_pdf_reads_files:
+                raise
+            error = e
+        else:
+            _process_pdf_reads_files = True
+            return class_list
+    # 1st extraction & the local copy failed: if the URL works, process_pdf only reads URLs
+    class_list = pdfExtract.process_pdf(pdf_url, university_id, major)
+    _process_pdf_reads_files = False
+    print(f"Warning: pdfExtract.process_pdf can't read a local PDF ({error}), it downloads the agreements itself from now on", file=sys.stderr)
+    return class_list
+
+# Class list of the agreement at pdf_url, memoized by (report key, extractor version)
+def extract_class_list(pdf_url, university_id, major):
+    store = get_artifact_store()
+    report_key = report_key_of(pdf_url)
+    extractor = os.getenv('AGREEMENT_EXTRACTOR', 'pdf')
+    use_json = extractor == 'json'
+    use_parallel = extractor == 'pdf-parallel' and parallel_extraction_available()
+    # The class lists of process_pdf are good for every mode, the other modes also read their own
+    versions = (EXTRACTOR_VERSION,)
+    if use_json:
+        versions = (articulation_extractor.EXTRACTOR_VERSION, EXTRACTOR_VERSION)
+    elif use_parallel:
+        versions = (EXTRACTOR_VERSION, PARALLEL_EXTRACTOR_VERSION)
+    for version in versions:
+        class_list = store.get_class_list(report_key, version)
+        if class_list is not None:
+            return class_list
+
+    if use_json:
+        try:
+            class_list = articulation_extractor.process_articulation(report_key)
+        except (requests.RequestException, KeyError, TypeError, ValueError) as e:
+            print(f"Error extracting the articulation JSON of {report_key}, using the PDF: {e}")
+            class_list = None
+        if class_list:
+            store.set_class_list(report_key, articulation_extractor.EXTRACTOR_VERSION, class_list)
+            return class_list
+    if use_parallel:
+        class_list = process_pdf_bytes_parallel(fetch_artifact(pdf_url), university_id, major)
+        if os.getenv('PARALLEL_EXTRACT_VERIFY') != '1':
+            store.set_class_list(report_key, PARALLEL_EXTRACTOR_VERSION, class_list)
+            return class_list
+        sequential = process_stored_pdf(pdf_url, university_id, major)
+        if sequential == class_list:
+            store.set_class_list(report_key, PARALLEL_EXTRACTOR_VERSION, class_list)
+        else:
+            print(f"Parallel extraction of {report_key} differs from process_pdf: {class_list} != {sequential}")
+        class_list = sequential
+    else:
+        class_list = process_stored_pdf(pdf_url, university_id, major)
+    store.set_class_list(report_key, EXTRACTOR_VERSION, class_list)
+    return class_list
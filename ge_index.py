@@ -0,0 +1,226 @@
+import json
+import os
+import re
+import threading
+from catalog import catalog
+
+# Compiled form of the IGETC & CSU-GE dictionaries (area -> subject -> classes) for /complete_IGETC, /complete_CSU_GE & /evaluate-requirements.
+# Checking a schedule used to walk every area, subject & class list per request. AreaIndex does that walk once when the catalog loads:
+    # 1.) Every class of the dictionary is interned to a bit position
+    # 2.) Every area is stored as a bitmask of its classes + a bitmask per subject (discipline) + its rule
+    # 3.) The classes of every area are pre-sorted by cost (units, then prereq depth), so the cheapest class left for an unmet area is the first one not taken
+# Evaluating a schedule is then a few mask intersections + popcounts per area.
+# complete_IGETC & complete_CSU_GE return the same shape as degree.py: (completed areas, area -> subject -> the classes of the schedule that count towards it)
+# The cheapest class left per unmet area is extra data, so it has its own functions (cheapest_remaining_IGETC & cheapest_remaining_CSU_GE) & its own keys in /evaluate-requirements
+# The rules of the areas have to be the ones degree.complete_IGETC & degree.complete_CSU_GE apply, so they aren't hard-coded: they're read from the JSON file in GE_RULES_FILE
+    # EX: {"IGETC": {"3": {"classes": 3, "units": 9, "subjects": 2}, "5": {"classes": 2, "required_subjects": ["5C"]}}, "CSU_GE": {...}}
+    # classes / units: min # of classes & units of the area, subjects: min # of different subjects (disciplines), required_subjects: subjects of the area that need at least 1 class (EX: a lab)
+    # Areas not listed in the file need 1 class
+# W/o a rules file for a dictionary, complete_IGETC & complete_CSU_GE use the Backend Python Functions of degree.py & there's no cheapest class data.
+# tests/test_ge_index.py runs the index on a small rules file & compares it w/ degree.py when degree.py, the pickles & GE_RULES_FILE are available.
+
+DEFAULT_RULE = {'classes': 1, 'units': 0, 'subjects': 0, 'required_subjects': ()}
+# Words removed from an area name to get its code. EX: 'Area 1A' -> '1A', 'IGETC Area 3B' -> '3B', 'A1' -> 'A1'
+AREA_WORDS_PATTERN = re.compile(r'\b(AREA|IGETC|CSU[-_ ]?GE|CSU)\b|[\s:_-]')
+
+# Code of an area name used to look up its rule
+def area_code(area):
+    return AREA_WORDS_PATTERN.sub('', str(area).upper())
+
+# Rules of every dictionary in a rules file ({} if there's no file)
+def load_rules(path=None):
+    path = path or os.getenv('GE_RULES_FILE')
+    if not path:
+        return {}
+    with open(path) as f:
+        rules = json.load(f)
+    return {name: {area_code(area): _rule(rule) for area, rule in areas.items()} for name, areas in rules.items()}
+
+def _rule(rule):
+    compiled = dict(DEFAULT_RULE)
+    compiled.update(rule)
+    compiled['required_subjects'] = tuple(compiled['required_subjects'])
+    return compiled
+
+class AreaIndex:
+    def __init__(self, areas_dict, rules, class_dict):
+        # Classes interned to bit positions
+        self.classes = []
+        self.bits = {}
+        # Areas in the order of the dictionary
+        self.areas = list(areas_dict.keys())
+        self.area_masks = []
+        # Subjects of every area: tuple of (subject, bitmask of its classes)
+        self.subject_masks = []
+        self.rules = []
+        # Bits of the classes of every area: in dictionary order (for the results) & sorted by cost (for the cheapest class left)
+        self.area_bits = []
+        self.by_cost = []
+        self.units = []
+
+        for area in self.areas:
+            subjects = _area_subjects(areas_dict[area])
+            bits = []
+            seen = set()
+            subject_masks = []
+            for subject, subject_classes in subjects:
+                subject_mask = 0
+                for class_id in subject_classes:
+                    bit = self.bits.get(class_id)
+                    if bit is None:
+                        bit = self.bits[class_id] = len(self.classes)
+                        self.classes.append(class_id)
+                        self.units.append(_units(class_dict, class_id))
+                    subject_mask |= 1 << bit
+                    if bit not in seen:
+                        seen.add(bit)
+                        bits.append(bit)
+                subject_masks.append((subject, subject_mask))
+            mask = 0
+            for bit in bits:
+                mask |= 1 << bit
+            self.area_masks.append(mask)
+            self.subject_masks.append(tuple(subject_masks))
+            self.area_bits.append(tuple(bits))
+            self.by_cost.append(tuple(sorted(bits, key=lambda bit: (self.units[bit], _depth(class_dict, self.classes[bit]), self.classes[bit]))))
+            self.rules.append(rules.get(area_code(area), DEFAULT_RULE))
+
+    # Bitmask of a list of classes (classes that are not in any area & values that aren't class IDs are ignored)
+    def mask(self, class_list):
+        mask = 0
+        for class_id in class_list:
+            if not isinstance(class_id, str):
+                continue
+            bit = self.bits.get(class_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    # An area is met if the classes taken reach its min # of classes & units, cover its min # of subjects & every required subject
+    def _met(self, i, taken):
+        rule = self.rules[i]
+        if taken.bit_count() < rule['classes']:
+            return False
+        if rule['units'] and self._units_of(taken) < rule['units']:
+            return False
+        subjects_taken = {subject for subject, subject_mask in self.subject_masks[i] if subject_mask & taken}
+        if len(subjects_taken) < rule['subjects']:
+            return False
+        return all(subject in subjects_taken for subject in rule['required_subjects'])
+
+    # Same shape as degree.complete_IGETC / complete_CSU_GE: (completed areas in dictionary order, area -> subject -> the classes taken that count towards it)
+    # Areas & subjects w/o any class taken are left out of the 2nd dictionary
+    def evaluate(self, user_classes):
+        completed_mask = self.mask(user_classes)
+        completed_areas = []
+        area_classes = {}
+        for i, area in enumerate(self.areas):
+            taken = self.area_masks[i] & completed_mask
+            if not taken:
+                continue
+            if self._met(i, taken):
+                completed_areas.append(area)
+            area_classes[area] = {subject: self._classes_of(subject_mask & taken) for subject, subject_mask in self.subject_masks[i] if subject_mask & taken}
+        return completed_areas, area_classes
+
+    # Unmet areas -> the cheapest class not taken yet (None if no class is left)
+    def cheapest_remaining(self, user_classes):
+        completed_mask = self.mask(user_classes)
+        remaining = {}
+        for i, area in enumerate(self.areas):
+            taken = self.area_masks[i] & completed_mask
+            if not self._met(i, taken):
+                remaining[area] = next((self.classes[bit] for bit in self.by_cost[i] if not taken >> bit & 1), None)
+        return remaining
+
+    # Classes of a bitmask in bit (interning) order
+    def _classes_of(self, mask):
+        classes = []
+        while mask:
+            low = mask & -mask
+            classes.append(self.classes[low.bit_length() - 1])
+            mask ^= low
+        return classes
+
+    def _units_of(self, mask):
+        total = 0.0
+        while mask:
+            low = mask & -mask
+            total += self.units[low.bit_length() - 1]
+            mask ^= low
+        return total
+
+# (subject, classes) pairs of an area. An area that maps directly to a class list is 1 subject (None)
+def _area_subjects(value):
+    if isinstance(value, dict):
+        return [(subject, list(dict.fromkeys(_area_classes(classes)))) for subject, classes in value.items()]
+    return [(None, list(dict.fromkeys(_area_classes(value))))]
+
+# Every class of an area, whether the area maps subjects to class lists or directly to a class list
+def _area_classes(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for classes in value.values():
+            yield from _area_classes(classes)
+    elif isinstance(value, (list, tuple, set)):
+        for classes in value:
+            yield from _area_classes(classes)
+
+def _units(class_dict, class_id):
+    try:
+        return float(class_dict[class_id]['Units'])
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+def _depth(class_dict, class_id):
+    try:
+        return float(class_dict[class_id]['prereq_depth'])
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+# Area indexes by catalog name, built the first time they are needed (None for a dictionary w/o rules)
+CATALOG_NAMES = ('IGETC', 'CSU_GE')
+_indexes = {}
+_rules = None
+_lock = threading.Lock()
+
+def get_area_index(name):
+    global _rules
+    if name not in _indexes:
+        with _lock:
+            if name not in _indexes:
+                if _rules is None:
+                    _rules = load_rules()
+                rules = _rules.get(name)
+                _indexes[name] = AreaIndex(catalog.get(name), rules, catalog.get('class_dict')) if rules is not None else None
+    return _indexes[name]
+
+# Build both indexes now (EX: in the gunicorn master before forking the workers)
+def preload():
+    for name in CATALOG_NAMES:
+        get_area_index(name)
+
+# IGETC & CSU-GE completion of a schedule, in the response shape of degree.py. W/o a rules file, the Backend Python Functions are used instead
+def complete_IGETC(user_classes):
+    index = get_area_index('IGETC')
+    if index is None:
+        from degree import complete_IGETC as legacy_complete_IGETC
+        return legacy_complete_IGETC(user_classes)
+    return index.evaluate(user_classes)
+
+def complete_CSU_GE(user_classes):
+    index = get_area_index('CSU_GE')
+    if index is None:
+        from degree import complete_CSU_GE as legacy_complete_CSU_GE
+        return legacy_complete_CSU_GE(user_classes)
+    return index.evaluate(user_classes)
+
+# Unmet areas -> cheapest class left, or None w/o a rules file (degree.py has no equivalent)
+def cheapest_remaining_IGETC(user_classes):
+    index = get_area_index('IGETC')
+    return index.cheapest_remaining(user_classes) if index is not None else None
+
+def cheapest_remaining_CSU_GE(user_classes):
+    index = get_area_index('CSU_GE')
+    return index.cheapest_remaining(user_classes) if index is not None else None
@@ -0,0 +1,9 @@
+from catalog import catalog
+
+# Gunicorn settings that let the workers share the catalog dictionaries
+# Import the app (and load the catalog, see catalog.py) once in the master process instead of once per worker
+preload_app = True
+
+# Right before a worker is forked, freeze the GC generations so the workers never write to the pages of the preloaded catalog and keep sharing them through copy-on-write
+def pre_fork(server, worker):
+    catalog.freeze()
@@ -0,0 +1,128 @@
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Background job queue for the slow part of index() (PDF download, extraction & createSchedule), so the web worker answers right away w/ a job ID.
+# Jobs run on a pool of extraction threads in the process that received the request. Their status is kept in Redis (or in memory w/o Redis), so GET /jobs/<job_id> can be answered by any worker.
+# Status of a job: {'status': 'queued' | 'running' | 'done' | 'error', 'step': what it's doing, 'result': ..., 'error': ..., 'updated': timestamp,
+#                   'owner': user that submitted it, 'host' & 'pid': process running it, 'heartbeat': last time that process was seen alive}
+# The process running the jobs writes a heartbeat every HEARTBEAT_SECONDS. If it dies or is recycled (EX: gunicorn max_requests), its unfinished jobs stop getting heartbeats & are reported as 'error' after STALE_SECONDS.
+
+DEFAULT_WORKERS = 4
+DEFAULT_STATUS_TTL_SECONDS = 60 * 60
+HEARTBEAT_SECONDS = 10
+STALE_SECONDS = 3 * HEARTBEAT_SECONDS
+UNFINISHED = ('queued', 'running')
+class MemoryJobStatus:
+    def __init__(self):
+        self._statuses = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        with self._lock:
+            status = self._statuses.get(job_id)
+            return dict(status) if status is not None else None
+
+    def set(self, job_id, status):
+        with self._lock:
+            self._statuses[job_id] = status
+
+class RedisJobStatus:
+    def __init__(self, redis_client, ttl_seconds=DEFAULT_STATUS_TTL_SECONDS, prefix='job:'):
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def get(self, job_id):
+        data = self.redis.get(self.prefix + job_id)
+        return json.loads(data) if data is not None else None
+
+    def set(self, job_id, status):
+        self.redis.set(self.prefix + job_id, json.dumps(status), ex=self.ttl_seconds)
+
+class JobQueue:
+    def __init__(self, status_store=None, workers=DEFAULT_WORKERS, heartbeat_seconds=HEARTBEAT_SECONDS, stale_seconds=STALE_SECONDS):
+        self.status_store = status_store or MemoryJobStatus()
+        self.workers = workers
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        self.host = socket.gethostname()
+        # The pool & the heartbeat thread are created on the 1st job, so they're never created before gunicorn forks the workers
+        self._executor = None
+        self._heartbeat_thread = None
+        self._lock = threading.Lock()
+        # Unfinished jobs of this process. Only this process writes their status, under _status_lock, so a heartbeat never overwrites a newer status
+        self._active = set()
+        self._status_lock = threading.Lock()
+
+    def _update(self, job_id, **fields):
+        with self._status_lock:
+            status = self.status_store.get(job_id) or {}
+            now = time.time()
+            status.update(fields, updated=now, heartbeat=now)
+            self.status_store.set(job_id, status)
+
+    # Queue func(progress, *args) & return the job ID. func reports what it's doing w/ progress('step name'), its return value is the result of the job
+    # owner: user that can read the status of the job (see status())
+    def submit(self, func, *args, owner=None, **kwargs):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._active.add(job_id)
+        self._update(job_id, status='queued', step='queued', owner=owner, host=self.host, pid=os.getpid())
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='extraction')
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat, name='extraction-heartbeat', daemon=True)
+                self._heartbeat_thread.start()
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, func, args, kwargs):
+        self._update(job_id, status='running', step='started')
+        try:
+            result = func(lambda step: self._update(job_id, step=step), *args, **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self._finish(job_id, status='error', step='failed', error=str(e))
+        else:
+            self._finish(job_id, status='done', step='done', result=result)
+
+    def _finish(self, job_id, **fields):
+        with self._lock:
+            self._active.discard(job_id)
+        self._update(job_id, **fields)
+
+    # Refresh the heartbeat of the unfinished jobs of this process
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_seconds)
+            with self._lock:
+                active = list(self._active)
+            for job_id in active:
+                try:
+                    with self._status_lock:
+                        # Finished in the meantime: its final status must stay as is
+                        if job_id not in self._active:
+                            continue
+                        status = self.status_store.get(job_id)
+                        if status is not None:
+                            status['heartbeat'] = time.time()
+                            self.status_store.set(job_id, status)
+                except Exception as e: # Redis hiccup: try again at the next beat
+                    print(f"Error writing the heartbeat of job {job_id}: {e}")
+
+    # Status of a job (None if unknown, or if owner is given & didn't submit it). An unfinished job w/o a recent heartbeat lost its process & is reported as an error
+    def status(self, job_id, owner=None):
+        status = self.status_store.get(job_id)
+        if status is None or (owner is not None and status.get('owner') != owner):
+            return None
+        if status.get('status') in UNFINISHED and time.time() - status.get('heartbeat', status.get('updated', 0)) > self.stale_seconds:
+            status.update(status='error', step='failed', error=f"The worker running the job ({status.get('host')}:{status.get('pid')}) stopped")
+            self.status_store.set(job_id, status)
+        return status
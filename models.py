@@ -4,6 +4,18 @@ from datetime import datetime
 # Initialize an instance of SQLAlchemy
 db = SQLAlchemy()
 
+# Connect a Flask app to our PostgreSQL database & create the missing tables
+# Used by app.py & by the batch commands (precompute_schedules.py), which only need the database and not the rest of the app
+def init_db(app, database_url):
+    if database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql+psycopg2://", 1)
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+
 # Define the Course model representing a course in the database
 class Course(db.Model):
     __tablename__ = 'courses'  # Name of the table in the database
@@ -22,6 +34,20 @@ class VerifiedSchedule(db.Model):
     textbox_location = db.Column(db.PickleType)  # Locations of textboxes (serialized)
     completed_degrees = db.Column(db.PickleType)  # List of completed degrees (serialized)
 
+# Define the PrecomputedSchedule model: unverified schedules computed ahead of time for every (university, major) pair by precompute_schedules.py
+class PrecomputedSchedule(db.Model):
+    __tablename__ = 'precomputed_schedules'  # Name of the table in the database
+    major = db.Column(db.String, primary_key=True)  # Major of study
+    university = db.Column(db.String, primary_key=True)  # Name of the university
+    university_id = db.Column(db.Integer)  # ASSIST API ID of the university
+    catalog_version = db.Column(db.String)  # Version of class_dict the schedule was computed with
+    status = db.Column(db.String)  # 'ok', 'no-pdf' (no agreement found) or 'error'
+    class_list = db.Column(db.PickleType)  # Classes extracted from the ASSIST agreement (serialized)
+    subjects = db.Column(db.PickleType)  # Subject dictionary from createSchedule (serialized)
+    data_dict = db.Column(db.PickleType)  # Unverified schedule {textbox location: value} (serialized)
+    seconds = db.Column(db.Float)  # Time it took to compute the schedule
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)  # When the schedule was computed
+
 # Define the ReportedError model representing reported errors in the database
 class ReportedError(db.Model):
     id = db.Column(db.Integer, primary_key=True)  # Unique identifier for the reported error
@@ -50,6 +76,33 @@ def add_verified_schedule_to_db(major, university, data, degrees):
 def find_verified_schedule(major, university):
     return db.session.query(VerifiedSchedule).filter_by(major=major, university=university).first()
 
+# Function to add or replace a precomputed schedule in the database
+def add_precomputed_schedule(major, university, university_id, catalog_version, status, class_list=None, subjects=None, data_dict=None, seconds=None):
+    db.session.merge(PrecomputedSchedule(
+        major=major,
+        university=university,
+        university_id=university_id,
+        catalog_version=catalog_version,
+        status=status,
+        class_list=class_list,
+        subjects=subjects,
+        data_dict=data_dict,
+        seconds=seconds,
+        timestamp=datetime.utcnow()
+    ))
+    db.session.commit()
+
+# Function to retrieve a successfully precomputed schedule that was built w/ the current catalog
+def find_precomputed_schedule(major, university, catalog_version):
+    return db.session.query(PrecomputedSchedule).filter_by(major=major, university=university, catalog_version=catalog_version, status='ok').first()
+
+# Function to list the (university, major) pairs already precomputed w/ the current catalog, so the batch command can resume where it stopped
+def precomputed_pairs(catalog_version, include_failed=True):
+    query = db.session.query(PrecomputedSchedule.university, PrecomputedSchedule.major).filter_by(catalog_version=catalog_version)
+    if not include_failed:
+        query = query.filter_by(status='ok')
+    return {(university, major) for university, major in query.all()}
+
 # Function to convert a schedule object into dictionary format
 def schedule_to_dict(schedule): 
     data_dict = dict(zip(schedule.textbox_location, schedule.class_list))
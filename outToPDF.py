@@ -1,8 +1,14 @@
 import pdfrw
 import boto3
 import tempfile
+import threading
+from io import BytesIO
 s3 = boto3.client('s3')
 
+SEP_TEMPLATE_PATH = 'SEP.pdf'
+# Hidden bit of the field flags (/Ff)
+HIDDEN_FLAG = 0x200000
+
 # Takes in an input path to a PDF file, an output path for the resulting PDF, and a dictionary of field names and values. Its main purpose is to fill the given PDF with the provided data and save the resulting file to the specified output path.
 def write_fillable_pdf(input_pdf_path, output_pdf_path, data):
     """Writes a fillable PDF file with the given data."""
@@ -47,6 +53,81 @@ def write_fillable_pdf(input_pdf_path, output_pdf_path, data):
     # Write the modified PDF to the specified output path
     pdfrw.PdfWriter().write(output_pdf_path, template_pdf)
 
+# Copy of the object tree of a parsed PDF: every dictionary & array is copied, the names, strings & stream data (immutable) are shared w/ the original
+# memo maps id(original object) -> copy, so an object referenced twice (EX: a widget in the page /Annots & in the AcroForm /Fields) stays 1 object
+def _copy_tree(obj, memo):
+    copied = memo.get(id(obj))
+    if copied is not None:
+        return copied
+    if isinstance(obj, pdfrw.PdfDict):
+        copied = pdfrw.PdfDict()
+        memo[id(obj)] = copied
+        for key, value in obj.iteritems():
+            dict.__setitem__(copied, key, _copy_tree(value, memo))
+        copied.indirect = obj.indirect
+        copied._stream = obj.stream
+    elif isinstance(obj, pdfrw.PdfArray):
+        copied = pdfrw.PdfArray()
+        memo[id(obj)] = copied
+        copied.extend(_copy_tree(value, memo) for value in obj)
+        copied.indirect = obj.indirect
+    else:
+        return obj
+    return copied
+
+# The SEP form, parsed once. Filling it used to re-read SEP.pdf & write output.pdf on every export, & 2 users exporting at once overwrote each other's output.pdf
+    # 1.) The template is parsed once & every widget is indexed by its field name
+    # 2.) Every fill works on its own copy of the object tree (no re-parse), so the template is never modified & fills can run concurrently
+    # 3.) The filled PDF is written to memory (BytesIO), nothing is written to disk
+class SEPTemplate:
+    def __init__(self, pdf_path=SEP_TEMPLATE_PATH):
+        self.pdf_path = pdf_path
+        self.trailer = pdfrw.PdfReader(pdf_path)
+        # A 1st copy resolves every indirect object of the reader, after that the template is only read
+        _copy_tree(self.trailer, {})
+        # Field name -> widgets of the field
+        self.fields = {}
+        for page in self.trailer.pages:
+            for annotation in page['/Annots'] or []:
+                if annotation['/Subtype'] == '/Widget' and annotation['/T']:
+                    self.fields.setdefault(annotation['/T'][1:-1], []).append(annotation)
+
+    # The filled PDF (BytesIO) of a dictionary of field names & values. Names that aren't fields of the form are ignored
+    def fill(self, data):
+        memo = {}
+        trailer = _copy_tree(self.trailer, memo)
+        if trailer.Root.AcroForm is not None:
+            trailer.Root.AcroForm.update(pdfrw.PdfDict(NeedAppearances=pdfrw.PdfObject('true')))
+        for field_name, value in data.items():
+            for annotation in self.fields.get(field_name, ()):
+                annotation = memo[id(annotation)]
+                annotation.update(pdfrw.PdfDict(V=value))
+                # Make sure the filled field isn't hidden
+                if "/Ff" in annotation:
+                    try:
+                        annotation.update(pdfrw.PdfDict(Ff=int(str(annotation["/Ff"])) & ~HIDDEN_FLAG))
+                    except ValueError:
+                        continue
+        output = BytesIO()
+        pdfrw.PdfWriter().write(output, trailer)
+        output.seek(0)
+        return output
+
+_sep_template = None
+_sep_template_lock = threading.Lock()
+
+def get_sep_template():
+    global _sep_template
+    if _sep_template is None:
+        with _sep_template_lock:
+            if _sep_template is None:
+                _sep_template = SEPTemplate()
+    return _sep_template
+
+# The SEP form filled w/ the user's schedule, as an in-memory PDF
+def fill_sep_pdf(data):
+    return get_sep_template().fill(data)
+
 # Handles the user's uploaded PDF files from an S3 bucket (a cloud storage service by AWS)
 # It downloads the file from S3, stores it temporarily, and then processes it to extract field names and their values
 def inputSEP(input_pdf_s3_key):
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Page-parallel extraction of the agreement PDFs. Long agreements (EX: engineering majors at UC campuses) have many pages, and process_pdf scans the right-hand column of each page in turn.
+    # 1.) The pages are split into contiguous ranges, 1 range per worker process. Each worker opens the PDF itself & only parses the pages of its range (pdfplumber's pages=)
+    # 2.) Pages are read lazily: the layout objects of a page are released (page.close()) before the next page is parsed, so memory doesn't grow w/ the document
+    # 3.) The per-page results are merged in page order. A conjunction that ASSIST pushed to the top of the next page ('OR', 'AND') is attached to the last requirement of the previous page, so the AND/OR order clean_class_list depends on is the same as a sequential scan
+    # 4.) The merged items go through the same post-processing as process_pdf (w/ the university & major), so the result is a class list
+# The 2 steps of process_pdf have to come from pdfExtract: extract_page_items(page) (the right-column scan of 1 page) & finish_page_items(items, university_id, major) (what process_pdf does w/ the scanned lines).
+# W/o them the mode isn't available (see parallel_supported) & the app uses process_pdf. right_column_lines is a simple stand-in to inspect the layout of an agreement.
+# The worker processes are started w/ 'spawn' (not fork): the extraction runs in request & job threads of a gunicorn worker, and forking a process that has other threads can deadlock the child.
+
+# Pages per task when the document is split
+MIN_PAGES_PER_TASK = 2
+CONJUNCTION_PATTERN = re.compile(r'^\s*(OR|AND)\s*$')
+# Vertical distance (in points) under which words belong to the same line
+LINE_TOLERANCE = 3
+
+# Text lines of the right-hand column of a page, top to bottom
+def right_column_lines(page):
+    column = page.crop((page.width / 2, 0, page.width, page.height))
+    lines = []
+    last_top = None
+    for word in sorted(column.extract_words(), key=lambda word: (round(word['top']), word['x0'])):
+        if last_top is None or abs(word['top'] - last_top) > LINE_TOLERANCE:
+            lines.append(word['text'])
+            last_top = word['top']
+        else:
+            lines[-1] += ' ' + word['text']
+    return lines
+
+# The per-page extraction of pdfExtract when it has one, else the stand-in
+def default_page_extractor():
+    import pdfExtract
+    return getattr(pdfExtract, 'extract_page_items', right_column_lines)
+
+# True if pdfExtract has both steps of process_pdf, so the parallel extraction returns the same class lists
+def parallel_supported():
+    try:
+        import pdfExtract
+    except ImportError:
+        return False
+    return hasattr(pdfExtract, 'extract_page_items') and hasattr(pdfExtract, 'finish_page_items')
+
+# Pool of worker processes shared by every extraction of this process, created on the 1st parallel extraction
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool(workers=None):
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+# Lazily yield (page index, items of the page) for pages [start, end) of a PDF file
+def iter_page_items(pdf_path, extract_page, start=0, end=None):
+    import pdfplumber
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, end + 1)) if end is not None else None) as pdf:
+        for offset, page in enumerate(pdf.pages):
+            try:
+                yield start + offset, extract_page(page)
+            finally:
+                # Release the layout objects of the page before parsing the next one
+                page.close()
+
+def page_count(pdf_path):
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+# Runs in a worker process: the items of every page of a range
+def _extract_range(pdf_path, extract_page, start, end):
+    return list(iter_page_items(pdf_path, extract_page, start, end))
+
+# Merge the per-page items in page order. A page that starts w/ a lone conjunction continues the last requirement of the previous page
+def merge_page_items(pages):
+    merged = []
+    for _, items in sorted(pages, key=lambda page: page[0]):
+        for n, item in enumerate(items):
+            if n == 0 and merged and isinstance(item, str) and CONJUNCTION_PATTERN.match(item):
+                merged[-1] = f"{merged[-1].rstrip()} {item.strip()} "
+            else:
+                merged.append(item)
+    return merged
+
+# Contiguous page ranges, at most 1 per worker & at least MIN_PAGES_PER_TASK pages each
+def page_ranges(n_pages, workers):
+    n_tasks = max(1, min(workers, n_pages // MIN_PAGES_PER_TASK))
+    size, extra = divmod(n_pages, n_tasks)
+    ranges = []
+    start = 0
+    for i in range(n_tasks):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+# Items of every page of a PDF file, extracted in parallel & merged in page order. Short documents are read in this process
+def extract_pages_parallel(pdf_path, extract_page=None, workers=None, executor=None):
+    extract_page = extract_page or default_page_extractor()
+    ranges = page_ranges(page_count(pdf_path), workers or os.cpu_count() or 1)
+    if len(ranges) == 1:
+        return merge_page_items(iter_page_items(pdf_path, extract_page))
+    executor = executor or get_pool(workers)
+    futures = [executor.submit(_extract_range, pdf_path, extract_page, start, end) for start, end in ranges]
+    return merge_page_items(page for future in futures for page in future.result())
+
+# Same result as process_pdf, from the raw bytes of the agreement (EX: from the artifact store)
+def process_pdf_bytes_parallel(pdf_bytes, university_id, major, workers=None):
+    import pdfExtract
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as temp_pdf:
+        temp_pdf.write(pdf_bytes)
+        temp_pdf.flush()
+        items = extract_pages_parallel(temp_pdf.name, pdfExtract.extract_page_items, workers)
+    return pdfExtract.finish_page_items(items, university_id, major)
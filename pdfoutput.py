@@ -1,10 +1,8 @@
-import time
-import urllib.request
-import json
 import requests
-import pickle
-with open('u_map.pkl', 'rb') as f:
-    u_map_unpickled = pickle.load(f)
+from catalog import catalog
+from assist_client import get_assist_client
+# Read-only view of the university map, shared w/ the rest of the app through the catalog registry
+u_map_unpickled = catalog.view('u_map')
     
 def generate_universities():
     """
@@ -27,26 +25,29 @@ def generate_universities():
     
     return institution_dicts
 
+# School year of the PDF agreements of an agreement: the most recent receiving year
+# Disregard agreements that are 74 as they are 2023-2024 agreements and do NOT have any PDF agreements yet
+LATEST_PDF_SCHOOL_YEAR = 73
+def agreement_year(agreement):
+    return min(agreement['receivingYearIds'][-1], LATEST_PDF_SCHOOL_YEAR)
+
 # Class for the agreements between CCC and the Transfer University the user chose
+# Every ASSIST call goes through the shared ASSIST client (pooled connections, rate limiting, timeouts & retries, see assist_client.py)
 class PDFOutput:
     # Constructor that depends on transfer university_id
-    def __init__(self, university_id, school_year_id=None, delay=0.3):
+    # delay is kept for compatibility: requests are paced by the rate limiter of the ASSIST client instead of a fixed sleep
+    def __init__(self, university_id, school_year_id=None, delay=0.3, client=None):
         self.university_id = university_id
         self.school_year_id = school_year_id
         self.community_college_id = 150
         self.delay = delay
+        self.client = client or get_assist_client()
 
     # Fetches every agreement data CCC has with other Universities
     def get_agreements(self):
         try:
-            # Introduce delay
-            time.sleep(self.delay)
-            
             # Requesting the agreements data from the API
-            response = requests.get(f'https://assist.org/api/institutions/{self.community_college_id}/agreements')
-            response.raise_for_status()  # Check if response contains a 4xx or 5xx status code
-
-            agreements = response.json()
+            agreements = self.client.get_agreements(self.community_college_id)
 
             # Filtering out the most recent agreements
             recent_agreements = [agreement for agreement in agreements if 'receivingYearIds' in agreement and agreement['institutionParentId'] == self.university_id]
@@ -57,36 +58,47 @@ class PDFOutput:
             print(f"Error fetching agreements: {e}")
             return []
         
-    # This function returns the URL of the PDF for the given major & transfer university 
-    def get_pdf_url(self, major_name, school_year_id=None, button_clicked=None):
-        agreements = self.get_agreements()
-        for agreement in agreements:
-            time.sleep(self.delay)  # Delay to prevent spamming the server with requests
-            university_id = agreement['institutionParentId']
-            school_year_id = agreement['receivingYearIds'][-1]
-            if school_year_id > 73: # Disregard agreements that are 74 as they are 2023-2024 agreements and do NOT have any PDF agreements yet
-                school_year_id = 73
+    # Fetches the major reports of the agreement w/ a university for a school year
+    def get_reports(self, university_id, school_year_id):
+        return self.client.get_reports(university_id, self.community_college_id, school_year_id)
 
-            # Requesting the major data from the API
-            url = f'https://assist.org/api/agreements?receivingInstitutionId={university_id}&sendingInstitutionId={self.community_college_id}&academicYearId={school_year_id}&categoryCode=major'
+    # Fetches the major reports of every agreement concurrently, in the order of the agreements
+    def get_all_reports(self, agreements):
+        return self.client.map(lambda agreement: self.get_reports(agreement['institutionParentId'], agreement_year(agreement)), agreements)
 
-            # Open the url: 
-            with urllib.request.urlopen(f'https://assist.org/api/agreements?receivingInstitutionId={university_id}&sendingInstitutionId={self.community_college_id}&academicYearId={school_year_id}&categoryCode=major') as url:
-                # Store data in reports
-                reports = json.loads(url.read().decode())['reports']
-
-            # Go through each major in report: 
-            for report in reports:
-                # Checking if the major name matches the user input
-                if report['label'] == major_name:
+    # This function returns the URL of the PDF for the given major & transfer university 
+    # The report key comes from the local agreement index (see agreement_index.py). Only universities missing from the index are crawled on ASSIST
+    def get_pdf_url(self, major_name, school_year_id=None, button_clicked=None):
+        from agreement_index import agreement_index
+        if agreement_index.has_university(self.university_id):
+            key = agreement_index.lookup(self.university_id, major_name)
+        else:
+            key = self.find_report_key(major_name)
+        if key is None:
+            # If no matching major is found, return None
+            return None
+        if button_clicked == 'get-pdf-button': 
+            # Return PDF Link
+            return self.client.url(f"/transfer/report/{key}")
+        elif button_clicked == 'get-schedule':
+            # Return PDF Download where my back-end function will extract the necessary class data from it
+            return self.client.url(f"/api/artifacts/{key}")
+        return None
 
-                    if button_clicked == 'get-pdf-button': 
-                        # Return PDF Link
-                        return f"https://assist.org/transfer/report/{report['key']}"
-                    elif button_clicked == 'get-schedule':
-                        # Return PDF Download where my back-end function will extract the necessary class data from it
-                        return f"https://assist.org/api/artifacts/{report['key']}"
-        # If no matching major is found, return None
+    # Crawl ASSIST for the report key of the given major: the reports of the agreements w/ the transfer university are fetched concurrently, and the 1st report (in agreement order) w/ the same label wins
+    # The reports are checked as they come in, so the agreements after the match are not fetched (the calls that already started are finished)
+    def find_report_key(self, major_name):
+        agreements = self.get_agreements()
+        all_reports = self.client.imap(lambda agreement: self.get_reports(agreement['institutionParentId'], agreement_year(agreement)), agreements)
+        try:
+            for reports in all_reports:
+                # Go through each major in report: 
+                for report in reports:
+                    # Checking if the major name matches the user input
+                    if report['label'] == major_name:
+                        return report['key']
+        finally:
+            all_reports.close()
         return None
     
      # Old function that used to fetch all the majors available for the university of interest from the ASSIST API. Replaced by storing the information to save response time which increased user experience 
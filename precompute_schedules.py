@@ -0,0 +1,121 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Batch command that runs the schedule pipeline (get_pdf_url -> process_pdf -> createSchedule -> unverifiedScheduleGenerator) for every (university, major) pair ahead of time.
+# Results are stored in the 'precomputed_schedules' table (models.PrecomputedSchedule), so /generate_schedule can serve an unverified schedule w/ 1 lookup.
+# Every pair is committed as soon as it finishes, so if the command is interrupted, running it again only computes the pairs that are missing for the current catalog version.
+# EX: python precompute_schedules.py --workers 4
+# EX: python precompute_schedules.py --universities 11 117 --retry-failed
+
+# Offline we can afford a much bigger budget for the schedule solver than during a request
+DEFAULT_SOLVER_NODES = 500000
+
+# Runs in a worker process: the full pipeline for 1 pair. Returns a dictionary w/ the result and how long each step took
+def compute_pair(university_id, university_name, major, solver_nodes):
+    from pdfoutput import PDFOutput
+    from extraction import extract_class_list
+    from Schedule import createSchedule, unverifiedScheduleGenerator
+
+    result = {'university_id': university_id, 'university': university_name, 'major': major, 'timings': {}}
+    start = time.perf_counter()
+    try:
+        pdf_url = PDFOutput(university_id, 73).get_pdf_url(major, button_clicked='get-schedule') # 73 is school year id for 22-23
+        result['timings']['pdf_url'] = time.perf_counter() - start
+        if not pdf_url:
+            result['status'] = 'no-pdf'
+            return result
+
+        step = time.perf_counter()
+        classList = extract_class_list(pdf_url, university_id, major)
+        result['timings']['process_pdf'] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        result['subjects'] = createSchedule(classList)
+        result['data_dict'] = unverifiedScheduleGenerator(classList, optimize_nodes=solver_nodes)
+        result['timings']['schedule'] = time.perf_counter() - step
+
+        result['class_list'] = classList
+        result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = repr(e)
+    finally:
+        result['seconds'] = time.perf_counter() - start
+    return result
+
+# Every (university ID, university name, major) pair of the 31 target schools
+def all_pairs(university_ids=None):
+    from pdfoutput import u_map_unpickled
+    from Schedule import createUniversityMap
+
+    pairs = []
+    for university_id, name in createUniversityMap().items():
+        university_id = int(university_id)
+        if university_ids and university_id not in university_ids:
+            continue
+        majors = u_map_unpickled.get(university_id, {}).get('majors', [])
+        for major in sorted(majors):
+            pairs.append((university_id, name, major))
+    return pairs
+
+# The pairs left to compute for the catalog version: every pair not stored yet (w/ retry_failed, the pairs stored as 'no-pdf' or 'error' too)
+def pending_pairs(catalog_version, university_ids=None, retry_failed=False, limit=None):
+    from models import precomputed_pairs
+
+    done = precomputed_pairs(catalog_version, include_failed=not retry_failed)
+    todo = [pair for pair in all_pairs(university_ids) if (pair[1], pair[2]) not in done]
+    if limit:
+        todo = todo[:limit]
+    return done, todo
+
+# Flask app w/ only the database (not the rest of app.py: Redis sessions, SEP template, agreement index refresh...)
+def create_db_app():
+    from dotenv import load_dotenv
+    from flask import Flask
+    from models import init_db
+
+    load_dotenv()
+    app = Flask(__name__)
+    init_db(app, os.getenv('DATABASE_URL'))
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute unverified schedules for every (university, major) pair.')
+    parser.add_argument('--workers', type=int, default=4, help='Number of worker processes')
+    parser.add_argument('--universities', type=int, nargs='*', help='Only these ASSIST university IDs')
+    parser.add_argument('--limit', type=int, help='Stop after this many pairs')
+    parser.add_argument('--solver-nodes', type=int, default=DEFAULT_SOLVER_NODES, help='Search nodes of the schedule solver per pair')
+    parser.add_argument('--retry-failed', action='store_true', help="Also recompute pairs stored as 'no-pdf' or 'error'")
+    args = parser.parse_args()
+
+    # The database is only used by this (parent) process, the workers just compute
+    from models import add_precomputed_schedule
+    from Schedule import CATALOG_VERSION
+
+    with create_db_app().app_context():
+        done, todo = pending_pairs(CATALOG_VERSION, args.universities, args.retry_failed, args.limit)
+        print(f"{len(done)} pairs already precomputed for catalog {CATALOG_VERSION}, {len(todo)} to go")
+
+        start = time.perf_counter()
+        counts = {'ok': 0, 'no-pdf': 0, 'error': 0}
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(compute_pair, university_id, name, major, args.solver_nodes) for university_id, name, major in todo]
+            for n, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                add_precomputed_schedule(
+                    result['major'], result['university'], result['university_id'], CATALOG_VERSION, result['status'],
+                    class_list=result.get('class_list'), subjects=result.get('subjects'), data_dict=result.get('data_dict'), seconds=result['seconds']
+                )
+                counts[result['status']] += 1
+                # Per-pair report: total time & the time of every step
+                steps = ', '.join(f"{step} {seconds:.2f}s" for step, seconds in result['timings'].items())
+                error = f" {result['error']}" if 'error' in result else ''
+                print(f"[{n}/{len(todo)}] {result['university']} | {result['major']}: {result['status']} in {result['seconds']:.2f}s ({steps}){error}")
+
+        elapsed = time.perf_counter() - start
+        print(f"Done in {elapsed:.1f}s: {counts['ok']} ok, {counts['no-pdf']} without a PDF, {counts['error']} errors")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+from array import array
+
+# Compiled form of the 'PREREQUISITES' column of class_dict.
+# The raw values mix NaN floats, strings, tuples (AND) and lists (OR) nested up to two levels deep, so every check used to walk them with isinstance chains.
+# PrereqGraph does that type dispatch once when the catalog loads:
+    # 1.) Every course ID (and every prerequisite name that shows up, even if it is not a CCC course) is interned to a dense integer. Catalog courses come first, so their IDs are 0..n_courses-1
+    # 2.) Each PREREQUISITES value is normalized into an AND-of-OR expression (a list of clauses, where a clause is satisfied if ANY of its classes is completed)
+    # 3.) Clauses, referenced prerequisites, and prerequisite "pick plans" are stored in flat arrays indexed by course ID
+    # 4.) Each clause is also stored as an integer bitmask (bit i set = class w/ ID i satisfies it), so a set of completed classes can be kept as one int
+
+# Operations of a pick plan used by find_best_prerequisites (see _compile_pick_plan)
+OP_ADD_ALL = 0   # Add every class (a required class or a tuple of classes)
+OP_PICK = 1      # Add a standalone class and stop looking at the other options
+OP_PICK_MIN = 2  # If none of the options are taken yet, add the one with the lowest prereq depth and stop
+OP_ADD_BEST = 3  # Add the lowest prereq depth class that is not part of a tuple option
+
+# AND-of-OR shortcuts: TRUE has no clauses to satisfy, FALSE has one clause that can never be satisfied
+_TRUE = []
+_FALSE = [()]
+
+class PrereqGraph:
+    def __init__(self, class_dict):
+        # Intern course names: catalog courses first (in catalog order), then names only seen as prerequisites
+        self.names = list(class_dict.keys())
+        self.n_courses = len(self.names)
+        self.ids = {name: cid for cid, name in enumerate(self.names)}
+
+        raw = [class_dict[name]['PREREQUISITES'] for name in self.names]
+        for prereqs in raw:
+            for name in _mentioned_names(prereqs):
+                self.intern(name)
+
+        # Clause storage (CSR layout): clauses of course c are clause_start[c]..clause_start[c+1], the classes of clause k are literals[literal_start[k]:literal_start[k+1]]
+        self.clause_start = array('i', [0])
+        self.literal_start = array('i', [0])
+        self.literals = array('i')
+        # Prerequisites referenced by each course in the order find_all_prerequisites walks them
+        self.ref_start = array('i', [0])
+        self.refs = array('i')
+        # Pick plan for each course used by find_best_prerequisites
+        self.pick_plans = []
+        # Clause bitmasks for each course
+        self.clause_masks = []
+
+        for prereqs in raw:
+            clauses = _to_cnf(prereqs)
+            for clause in clauses:
+                self.literals.extend(self.ids[name] for name in clause)
+                self.literal_start.append(len(self.literals))
+            self.clause_start.append(len(self.literal_start) - 1)
+            self.clause_masks.append(tuple(self.mask(clause) for clause in clauses))
+            self.refs.extend(self.ids[name] for name in _referenced_names(prereqs))
+            self.ref_start.append(len(self.refs))
+            self.pick_plans.append(self._compile_pick_plan(prereqs, class_dict))
+
+    # Return the dense ID of a name, creating a new one if the name has not been seen yet
+    def intern(self, name):
+        cid = self.ids.get(name)
+        if cid is None:
+            cid = len(self.names)
+            self.ids[name] = cid
+            self.names.append(name)
+        return cid
+
+    # Return the ID of a catalog course or None if the name is not a CCC course
+    def course_id(self, name):
+        cid = self.ids.get(name)
+        if cid is None or cid >= self.n_courses:
+            return None
+        return cid
+
+    # Convert a list of class names to a set of IDs, ignoring names that never appear in the catalog
+    def id_set(self, class_list):
+        ids = self.ids
+        return {ids[name] for name in class_list if name in ids}
+
+    # Convert a list of class names to a bitmask, ignoring names that never appear in the catalog
+    def mask(self, class_list):
+        ids = self.ids
+        mask = 0
+        for name in class_list:
+            cid = ids.get(name)
+            if cid is not None:
+                mask |= 1 << cid
+        return mask
+
+    # Convert a bitmask back to class names, in ID order
+    def names_of(self, mask):
+        names = self.names
+        result = []
+        while mask:
+            low_bit = mask & -mask
+            result.append(names[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return result
+
+    # Return the classList followed by every prerequisite (and prerequisite of prerequisites) not already in it, in the breadth-first order find_all_prerequisites has always added them
+    # The classes already in the result are kept as a bitmask, so each check is a bit test instead of a scan of the result list
+    def all_prerequisites(self, class_list):
+        ids, names, n_courses = self.ids, self.names, self.n_courses
+        result = list(class_list)
+        in_result = self.mask(result)
+        idx = 0
+        while idx < len(result):
+            cid = ids.get(result[idx])
+            # Names that are not CCC courses have no prerequisites to follow
+            if cid is not None and cid < n_courses:
+                for prereq_id in self.referenced(cid):
+                    if not in_result >> prereq_id & 1:
+                        in_result |= 1 << prereq_id
+                        result.append(names[prereq_id])
+            idx += 1
+        return result
+
+    # Return the clauses of a course as tuples of IDs
+    def clauses(self, cid):
+        literal_start, literals = self.literal_start, self.literals
+        return [tuple(literals[literal_start[k]:literal_start[k + 1]]) for k in range(self.clause_start[cid], self.clause_start[cid + 1])]
+
+    # Return the prerequisite IDs referenced by a course
+    def referenced(self, cid):
+        return self.refs[self.ref_start[cid]:self.ref_start[cid + 1]]
+
+    # True if every clause of the course has at least one class in the completed set of IDs
+    def is_satisfied(self, cid, completed_ids):
+        literal_start, literals = self.literal_start, self.literals
+        for k in range(self.clause_start[cid], self.clause_start[cid + 1]):
+            for pos in range(literal_start[k], literal_start[k + 1]):
+                if literals[pos] in completed_ids:
+                    break
+            else:
+                return False
+        return True
+
+    # List version of is_satisfied: the `in` scans of the completed class list the original check_prereq_completion did (use_bitsets=False & the benchmark baseline)
+    def is_satisfied_list(self, cid, completed_classes):
+        names, literal_start, literals = self.names, self.literal_start, self.literals
+        for k in range(self.clause_start[cid], self.clause_start[cid + 1]):
+            if not any(names[literals[pos]] in completed_classes for pos in range(literal_start[k], literal_start[k + 1])):
+                return False
+        return True
+
+    # Bitmask version of is_satisfied: every clause mask must share at least one bit w/ the completed mask
+    def is_satisfied_mask(self, cid, completed_mask):
+        for clause_mask in self.clause_masks[cid]:
+            if not completed_mask & clause_mask:
+                return False
+        return True
+
+    # Resolve the raw prerequisite value into the ordered list of operations find_best_prerequisites runs for a course
+    def _compile_pick_plan(self, prereqs, class_dict):
+        ids = self.ids
+        # Classes w/ no prerequisites
+        if isinstance(prereqs, float):
+            return ()
+        # A single prerequisite or a tuple of required prerequisites
+        if isinstance(prereqs, str):
+            return ((OP_ADD_ALL, (ids[prereqs],)),)
+        if isinstance(prereqs, tuple) and all(isinstance(item, str) for item in prereqs):
+            return ((OP_ADD_ALL, tuple(ids[item] for item in prereqs)),)
+        if not isinstance(prereqs, (list, tuple)):
+            return ()
+
+        # Options are checked by type priority: standalone strings, tuples of strings, lists of strings, then everything else
+        items_to_check = sorted(prereqs, key=lambda x: (
+            0 if isinstance(x, str) else
+            1 if isinstance(x, tuple) and all(isinstance(i, str) for i in x) else
+            2 if isinstance(x, list) and all(isinstance(i, str) for i in x) else
+            3
+        ))
+
+        def lowest_depth(names):
+            names = [name for name in names if name in class_dict]
+            if not names:
+                return None
+            return ids[min(names, key=lambda x: class_dict[x]['prereq_depth'])]
+
+        plan = []
+        for item in items_to_check:
+            if isinstance(item, str):
+                if item in class_dict:
+                    plan.append((OP_PICK, ids[item]))
+            elif isinstance(item, tuple) and all(isinstance(sub_item, str) for sub_item in item):
+                plan.append((OP_ADD_ALL, tuple(ids[sub_item] for sub_item in item)))
+            elif isinstance(item, list):
+                if all(isinstance(sub_item, str) for sub_item in item):
+                    best = lowest_depth(item)
+                    if best is not None:
+                        plan.append((OP_PICK_MIN, tuple(ids[sub_item] for sub_item in item), best))
+                elif all(isinstance(sub_item, (str, tuple)) for sub_item in item):
+                    tuples = [sub_item for sub_item in item if isinstance(sub_item, tuple)]
+                    # Strings that are already part of a tuple option are not candidates
+                    strings = [sub_item for sub_item in item if isinstance(sub_item, str) and not any(sub_item in tuple_item for tuple_item in tuples)]
+                    best = lowest_depth(strings)
+                    if best is not None:
+                        plan.append((OP_ADD_BEST, best))
+        return tuple(plan)
+
+# Every string that can appear in a prerequisite value (up to the 2 levels of nesting the catalog uses)
+def _mentioned_names(prereqs):
+    if isinstance(prereqs, str):
+        yield prereqs
+    elif isinstance(prereqs, (list, tuple)):
+        for item in prereqs:
+            if isinstance(item, str):
+                yield item
+            elif isinstance(item, (list, tuple)):
+                for sub_item in item:
+                    if isinstance(sub_item, str):
+                        yield sub_item
+
+# Prerequisites in the order find_all_prerequisites adds them: strings, strings inside the lists of a tuple, and strings inside the tuples of a list
+def _referenced_names(prereqs):
+    if isinstance(prereqs, str):
+        return [prereqs]
+    names = []
+    if isinstance(prereqs, tuple):
+        nested = list
+    elif isinstance(prereqs, list):
+        nested = tuple
+    else:
+        return names
+    for item in prereqs:
+        if isinstance(item, nested):
+            names.extend(sub_item for sub_item in item if isinstance(sub_item, str))
+        elif isinstance(item, str):
+            names.append(item)
+    return names
+
+# Normalize a raw prerequisite value into a list of OR-clauses that must all be satisfied (AND-of-OR)
+# Follows the cases check_prereq_completion has always supported, anything else can never be satisfied
+def _to_cnf(prereqs):
+    # NaN: no prerequisites
+    if isinstance(prereqs, float):
+        return _TRUE
+    # One required class
+    if isinstance(prereqs, str):
+        return [(prereqs,)]
+    # List: any one of the options
+    if isinstance(prereqs, list):
+        if all(isinstance(item, str) for item in prereqs):
+            return [_unique(prereqs)]
+        if all(isinstance(item, (str, tuple)) for item in prereqs):
+            # Each option is a conjunction: a single class or every class of a tuple
+            options = []
+            for item in prereqs:
+                if isinstance(item, str):
+                    options.append((item,))
+                elif all(isinstance(sub_item, str) for sub_item in item):
+                    # An empty tuple is always complete, so the whole list is
+                    if not item:
+                        return _TRUE
+                    options.append(_unique(item))
+                # Tuples w/ non-string members can never be completed, so that option is dropped
+            return _or_of_ands(options)
+        return _FALSE
+    # Tuple: every item is required
+    if isinstance(prereqs, tuple):
+        if all(isinstance(item, (str, list)) for item in prereqs):
+            clauses = []
+            for item in prereqs:
+                if isinstance(item, str):
+                    clauses.append((item,))
+                else:
+                    clauses.append(_unique(sub_item for sub_item in item if isinstance(sub_item, str)))
+            return _dedupe(clauses)
+        return _FALSE
+    return _FALSE
+
+# Distribute an OR of conjunctions into AND-of-OR clauses: (A & B) | C -> (A | C) & (B | C)
+def _or_of_ands(options):
+    clauses = [()]
+    for option in options:
+        clauses = [clause + (name,) for clause in clauses for name in option]
+    return _dedupe(_unique(clause) for clause in clauses)
+
+# Remove duplicate names while keeping their order
+def _unique(names):
+    return tuple(dict.fromkeys(names))
+
+# Remove duplicate clauses while keeping their order
+def _dedupe(clauses):
+    return list(dict.fromkeys(clauses))
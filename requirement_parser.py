@@ -0,0 +1,107 @@
+import re
+
+# Single-pass parser for the requirement strings extracted from the ASSIST agreements.
+# EX of the strings: ['BIOL11A(5.00)', 'CHEM1A(5.00) & CHEM1B(5.00) OR ', 'ENGL1B(3.00) / ENGL1BH(3.00)', 'MATH17(5.00) OR ', '']
+# Each string is tokenized once into a requirement tree:
+    # item   = tuple of "OR" options          (split on 'OR')
+    # option = tuple of "AND" groups          (split on 'AND')
+    # group  = tuple of alternative classes   (split on '/')
+# EX: 'MATH1A/MATH1AHANDMATH2ORMATH3' -> ((('MATH1A', 'MATH1AH'), ('MATH2',)), (('MATH3',),))
+# '&' is not a separator of the tree: a class token can still contain it (EX: 'CHEM1A&CHEM1B'), just like in the bracket mini-language clean_and_format_class_list used to build.
+# resolve_requirements then picks the classes straight from the trees, w/ the same choices the bracket mini-language (v1 - v4) made.
+
+# Text inside parentheses (the units) is removed before tokenizing
+UNITS_PATTERN = re.compile(r'\(.*?\)')
+# Trailing conjunction of a line
+TRAILING_PATTERN = re.compile(r'(AND|OR|/&)$')
+# Separators of the tree, captured so one split returns the classes & the separators in order
+SEPARATOR_PATTERN = re.compile(r'(OR|AND|/)')
+# Characters removed from a class token when it's part of an "AND" group w/ alternatives
+GROUP_PUNCTUATION = str.maketrans('', '', '&()')
+PARENTHESES = str.maketrans('', '', '()')
+
+# Tokenize 1 requirement string into its tree
+def parse_requirement(class_item):
+    class_item = UNITS_PATTERN.sub('', class_item).replace(' ', '')
+    class_item = TRAILING_PATTERN.sub('', class_item)
+
+    options = []
+    groups = []
+    group = []
+    tokens = SEPARATOR_PATTERN.split(class_item)
+    # Tokens alternate between a class and the separator that follows it
+    for k in range(0, len(tokens), 2):
+        group.append(tokens[k])
+        separator = tokens[k + 1] if k + 1 < len(tokens) else None
+        if separator == '/':
+            continue
+        groups.append(tuple(group))
+        group = []
+        if separator == 'AND':
+            continue
+        options.append(tuple(groups))
+        groups = []
+    return tuple(options)
+
+# Tokenize every requirement string of the list, skipping exact duplicates
+def parse_requirements(class_list):
+    trees = []
+    seen = set()
+    for class_item in class_list:
+        tree = parse_requirement(class_item)
+        if tree not in seen:
+            seen.add(tree)
+            trees.append(tree)
+    return trees
+
+# True if the tree has a choice between classes ('/' between classes or 'OR' between options)
+def has_alternatives(tree):
+    return len(tree) > 1 or any(len(group) > 1 for group in tree[0])
+
+# Pick the required classes (that exist in class_dict) from the trees, in order & w/o duplicates:
+    # 1.) A single class (or classes joined w/ '&') -> every class
+    # 2.) Several "AND" groups where some groups have alternatives -> the 1st class of every group w/ alternatives
+    # 3.) "OR" options or alternatives w/o '&' -> the 1st class of the 1st option
+    # 4.) "OR" options or alternatives w/ '&' -> the classes of the 1st '&' group that is not completely taken yet
+def resolve_requirements(trees, class_dict):
+    result = []
+    seen = set()
+
+    def add(class_id):
+        if class_id in class_dict and class_id not in seen:
+            result.append(class_id)
+            seen.add(class_id)
+
+    for tree in trees:
+        if not has_alternatives(tree):
+            # 1.) Every class of the only option; an option w/ several groups is joined w/ '&'
+            groups = tree[0]
+            if len(groups) == 1 and '&' not in groups[0][0]:
+                token = groups[0][0]
+                # An unmatched '(' makes the token a group w/o any alternatives
+                if not token.startswith('('):
+                    add(token)
+            else:
+                for (token,) in groups:
+                    for class_id in token.translate(PARENTHESES).split('&'):
+                        add(class_id)
+        elif len(tree) == 1 and len(tree[0]) > 1:
+            # 2.) Only the groups w/ alternatives count, their 1st class is taken
+            for group in tree[0]:
+                if len(group) > 1:
+                    add(group[0].translate(GROUP_PUNCTUATION))
+        elif not any('&' in token for option in tree for group in option for token in group) and all(len(option) == 1 for option in tree):
+            # 3.) 1st class of the 1st option
+            add(tree[0][0][0])
+        else:
+            # 4.) Flatten the options into '&' groups of '/' alternatives
+            flat = '/'.join('&'.join('/'.join(group) for group in option) for option in tree).translate(PARENTHESES)
+            for group in flat.split('&'):
+                classes = group.split('/')
+                # If all classes in the group are already in the list, continue to next group
+                if all(class_ in seen for class_ in classes):
+                    continue
+                for class_ in classes:
+                    add(class_)
+                break
+    return result
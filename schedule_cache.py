@@ -0,0 +1,133 @@
+import hashlib
+import inspect
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+# Two-tier cache for the schedule pipeline (createSchedule & unverifiedScheduleGenerator).
+# Every student who picks the same university & major sends the same class list, so the result only depends on the class list, the arguments, and the catalog (class_dict) version.
+    # Tier 1: In-process LRU w/ a size bound
+    # Tier 2: The Redis instance the app already uses for sessions, shared by every worker, w/ a TTL
+# Values are stored pickled in both tiers, so callers always get their own copy and can't change a cached result by mutating it.
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+REDIS_PREFIX = 'schedule-cache:'
+
+class ScheduleCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis = None
+        self.catalog_version = ''
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'local_hits': 0, 'redis_hits': 0, 'misses': 0}
+
+    # Called once the app has created its Redis client (the cache works in-process only until then)
+    def configure(self, redis_client=None, max_entries=None, ttl_seconds=None):
+        if redis_client is not None:
+            self.redis = redis_client
+        if max_entries is not None:
+            self.max_entries = max_entries
+        if ttl_seconds is not None:
+            self.ttl_seconds = ttl_seconds
+
+    # The catalog version is part of every key, so a new class_dict never serves results computed w/ the old one
+    def set_catalog_version(self, version):
+        self.catalog_version = version
+
+    # Canonical hash of a call: function name, catalog version, and the JSON form of the arguments ({parameter name: value}, sorted by name)
+    def make_key(self, name, arguments):
+        payload = json.dumps([name, self.catalog_version, arguments], sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    # Arguments of a call by parameter name w/ the defaults filled in, so f(x), f(x, 6) & f(x, semesters=6) share 1 key
+    # unordered: parameters whose order doesn't change the result, sorted so any order gives the same key
+    # EX: bind_arguments(inspect.signature(unverifiedScheduleGenerator), (classList,), {'semesters': 6}) -> {'classList': [...], 'semesters': 6, 'max_units': 15.0, ...}
+    def bind_arguments(self, signature, args, kwargs, unordered=()):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        for parameter in unordered:
+            if arguments.get(parameter) is not None:
+                arguments[parameter] = sorted(arguments[parameter], key=str)
+        return arguments
+
+    # Return (True, value) on a hit or (False, None) on a miss
+    def get(self, key):
+        with self._lock:
+            data = self._local.get(key)
+            if data is not None:
+                self._local.move_to_end(key)
+                self.stats['local_hits'] += 1
+                return True, pickle.loads(data)
+
+        if self.redis is not None:
+            try:
+                data = self.redis.get(REDIS_PREFIX + key)
+            except Exception as e:
+                print(f"Schedule cache Redis error: {e}")
+                data = None
+            if data is not None:
+                self._store_local(key, data)
+                with self._lock:
+                    self.stats['redis_hits'] += 1
+                return True, pickle.loads(data)
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return False, None
+
+    def set(self, key, value):
+        data = pickle.dumps(value)
+        self._store_local(key, data)
+        if self.redis is not None:
+            try:
+                self.redis.set(REDIS_PREFIX + key, data, ex=self.ttl_seconds)
+            except Exception as e:
+                print(f"Schedule cache Redis error: {e}")
+
+    def _store_local(self, key, data):
+        with self._lock:
+            self._local[key] = data
+            self._local.move_to_end(key)
+            # Evict the least recently used entries
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    # Empty the in-process tier (the Redis tier expires on its own)
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+    # Hit/miss counters of this process plus the current size of the in-process tier
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['local_entries'] = len(self._local)
+        lookups = stats['local_hits'] + stats['redis_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['local_hits'] + stats['redis_hits']) / lookups if lookups else 0.0
+        return stats
+
+    # Decorator that caches a function by its canonical key
+    # unordered: names of the set-like parameters of the function (see bind_arguments)
+    def memoize(self, name, unordered=()):
+        def decorator(func):
+            signature = inspect.signature(func)
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = self.make_key(name, self.bind_arguments(signature, args, kwargs, unordered))
+                hit, value = self.get(key)
+                if hit:
+                    return value
+                value = func(*args, **kwargs)
+                self.set(key, value)
+                return value
+            return wrapper
+        return decorator
+
+# Shared cache used by Schedule.py and configured by app.py
+schedule_cache = ScheduleCache()
@@ -0,0 +1,172 @@
+import heapq
+from collections import defaultdict
+
+# Scheduling engine behind unverifiedScheduleGenerator. Places the classes of a final class list into semesters following the same insertion rules:
+    # 1.) Total Units <= max_units (15, or last_semester_units for the last semester)
+    # 2.) Class of the same subject & different prereq depth cannot be inserted into the same semester
+    # 3.) The prereq depth of a class must be less than our semester (or the class is the first one of the semester)
+    # 4.) The prerequisites for the class must be completed
+    # 5.) No duplicate classes can be inserted
+# Every semester also only has MAX_CLASSES_PER_SEMESTER rows on the SEP PDF.
+# Two modes:
+    # compat=True: reproduces the original stack algorithm exactly (including the order classes are tried in), using a heap instead of re-sorting the stack every semester
+    # compat=False: ready-queue scheduling. A class only enters the queue once all of its prerequisite clauses are satisfied by classes of EARLIER semesters (tracked as in-degrees), and deferred classes are never dropped, they end up in the leftovers
+
+# Textbox locations of the SEP PDF for every semester: class & units textboxes for each row
+SEMESTER_FIELDS = [
+    ['1_3', '1_4', '2_3', '2_4', '3_3', '3_4', '4_3', '4_4', '5_3', '5_4', '6_3', '6_4', '7_3', '7_4'],
+    ['1_5', '1_6', '2_5', '2_6', '3_5', '3_6', '4_5', '4_6', '5_5', '5_6', '6_5', '6_6', '7_5', '7_6'],
+    ['1_9', '1_10', '2_9', '2_10', '3_9', '3_10', '4_9', '4_10', '5_9', '5_10', '6_9', '6_10', '7_9', '7_10'],
+    ['1_11', '1_12', '2_11', '2_12', '3_11', '3_12', '4_11', '4_12', '5_11', '5_12', '6_11', '6_12', '7_11', '7_12'],
+    ['1_15', '1_16', '2_15', '2_16', '3_15', '3_16', '4_15', '4_16', '5_15', '5_16', '6_15', '6_16', '7_15', '7_16'],
+    ['1_17', '1_18', '2_17', '2_18', '3_17', '3_18', '4_17', '4_18', '5_17', '5_18', '6_17', '6_18', '7_17', '7_18'],
+]
+MAX_SEMESTERS = len(SEMESTER_FIELDS)
+MAX_CLASSES_PER_SEMESTER = len(SEMESTER_FIELDS[0]) // 2
+
+# Default caps: 15.0 is my suggested max Unit Cap. For the Last semester it's increased so we can try and fit all classes in schedule
+DEFAULT_SEMESTERS = 6
+DEFAULT_MAX_UNITS = 15.0
+DEFAULT_LAST_SEMESTER_UNITS = 18.0
+
+# Place the classes in `depths` ({classID: prereq depth}) into semesters.
+# Returns (semesters, leftovers) where semesters is a list w/ the classIDs of every semester in insertion order
+def schedule_classes(depths, class_dict, prereq_graph, semesters=DEFAULT_SEMESTERS, max_units=DEFAULT_MAX_UNITS, last_semester_units=DEFAULT_LAST_SEMESTER_UNITS, compat=True, use_bitsets=True):
+    if not 1 <= semesters <= MAX_SEMESTERS:
+        raise ValueError(f"semesters must be between 1 and {MAX_SEMESTERS}, got {semesters}")
+    if max_units <= 0 or last_semester_units <= 0:
+        raise ValueError("Unit caps must be positive")
+
+    # Read the attributes of every class once instead of inside the sort keys
+    units = {classID: float(class_dict[classID]['Units']) for classID in depths}
+    subjects = {classID: class_dict[classID]['Subject'] for classID in depths}
+    if compat:
+        return _schedule_compat(depths, units, subjects, prereq_graph, semesters, max_units, last_semester_units, use_bitsets)
+    return _schedule_ready_queue(depths, units, subjects, prereq_graph, semesters, max_units, last_semester_units)
+
+# Semester 'i' (1-based) accepts the class if it passes insertion rules 1-3 & the row limit (rules 4-5 are checked by the caller)
+def _fits(i, depth_of_class, class_units, subject, semester_units, semester_size, cap, subject_depth_scheduled):
+    already_scheduled = subject_depth_scheduled.get(subject, None) == depth_of_class
+    return (semester_size < MAX_CLASSES_PER_SEMESTER
+            and semester_units + class_units <= cap
+            and ((subject not in subject_depth_scheduled) or already_scheduled)
+            and (i > depth_of_class or semester_units == 0))
+
+# The original algorithm: every semester, the classes of the next prereq depth join the stack, the stack is ordered by (prereq depth, same subject as last semester first) and classes are tried in that order.
+# The first class that fails when nothing is left to try ends the semester and every failed class carries over to the next one.
+# The heap key (depth, same subject, -position) is the order the original `stack.sort(..., reverse=True)` + `stack.pop()` produced.
+def _schedule_compat(depths, units, subjects, prereq_graph, semesters, max_units, last_semester_units, use_bitsets):
+    prereq_dict = defaultdict(list)
+    for classID, depth in depths.items():
+        prereq_dict[depth].append(classID)
+
+    schedule = [[] for _ in range(semesters)]
+    leftover_classes = []
+    stack = []
+    subject_order = set()
+    completed_classes = []
+    completed_mask = 0
+    i = 0
+    for depth in range(semesters + 1):
+        i += 1 # Increase the Semester
+        if i > semesters:
+            # If semester exceeds the maximum, store the leftover classes
+            leftover_classes.extend(stack)
+            break
+        cap = last_semester_units if i == semesters else max_units
+
+        stack.extend(prereq_dict[depth])
+        heap = [(depths[classID], -(subjects[classID] in subject_order), -position, classID) for position, classID in enumerate(stack)]
+        heapq.heapify(heap)
+        stack = []
+
+        subject_order = set()
+        subject_depth_scheduled = {}
+        semester_units = 0.0
+        invalid_classes = []
+        while heap:
+            classID = heapq.heappop(heap)[3]
+            if use_bitsets:
+                cid = prereq_graph.ids[classID]
+                prereq_completion = prereq_graph.is_satisfied_mask(cid, completed_mask)
+                already_completed = completed_mask >> cid & 1
+            else:
+                prereq_completion = prereq_graph.is_satisfied_list(prereq_graph.ids[classID], completed_classes)
+                already_completed = classID in completed_classes
+
+            if _fits(i, depths[classID], units[classID], subjects[classID], semester_units, len(schedule[i - 1]), cap, subject_depth_scheduled) and prereq_completion and not already_completed:
+                schedule[i - 1].append(classID)
+                semester_units += units[classID]
+                subject_order.add(subjects[classID])
+                subject_depth_scheduled[subjects[classID]] = depths[classID]
+                completed_classes.append(classID)
+                if use_bitsets:
+                    completed_mask |= 1 << cid
+            else:
+                invalid_classes.append(classID)
+                # Go to next class if there is one, else the failed classes carry over to the next semester
+                if not heap:
+                    stack = invalid_classes
+    return schedule, leftover_classes
+
+# Ready-queue scheduling: a class becomes ready once every prerequisite clause has a class scheduled in an earlier semester.
+# Ready classes are kept in a heap keyed on (prereq depth, same subject as last semester first, more units first), every semester pops the ready classes once and defers the ones that don't fit.
+def _schedule_ready_queue(depths, units, subjects, prereq_graph, semesters, max_units, last_semester_units):
+    ids = prereq_graph.ids
+    class_ids = {classID: ids[classID] for classID in depths}
+    planned = {cid: classID for classID, cid in class_ids.items()}
+
+    # In-degree of a class = # of prerequisite clauses not satisfied yet. watchers maps a class to the (class, clause) pairs it satisfies
+    in_degree = {}
+    watchers = defaultdict(list)
+    satisfied = set()
+    ready = []
+    for classID, cid in class_ids.items():
+        clauses = prereq_graph.clauses(cid)
+        in_degree[classID] = len(clauses)
+        for k, clause in enumerate(clauses):
+            members = [literal for literal in clause if literal in planned]
+            # No class of the clause is in the class list, so this class can never be taken
+            if not members:
+                break
+            for literal in members:
+                watchers[literal].append((classID, k))
+        else:
+            if not clauses:
+                ready.append(classID)
+
+    schedule = [[] for _ in range(semesters)]
+    previous_subjects = set()
+    order = {classID: position for position, classID in enumerate(depths)}
+    for i in range(1, semesters + 1):
+        cap = last_semester_units if i == semesters else max_units
+        heap = [(depths[classID], subjects[classID] not in previous_subjects, -units[classID], order[classID], classID) for classID in ready]
+        heapq.heapify(heap)
+
+        subject_depth_scheduled = {}
+        semester_units = 0.0
+        deferred = []
+        while heap:
+            classID = heapq.heappop(heap)[-1]
+            if _fits(i, depths[classID], units[classID], subjects[classID], semester_units, len(schedule[i - 1]), cap, subject_depth_scheduled):
+                schedule[i - 1].append(classID)
+                semester_units += units[classID]
+                subject_depth_scheduled[subjects[classID]] = depths[classID]
+            else:
+                deferred.append(classID)
+
+        # Classes of this semester count as completed from the next semester on: release the classes waiting on them
+        ready = deferred
+        for classID in schedule[i - 1]:
+            for waiting, k in watchers[class_ids[classID]]:
+                if (waiting, k) not in satisfied:
+                    satisfied.add((waiting, k))
+                    in_degree[waiting] -= 1
+                    if in_degree[waiting] == 0:
+                        ready.append(waiting)
+        previous_subjects = {subjects[classID] for classID in schedule[i - 1]}
+
+    # Everything that was not scheduled: deferred or still waiting on prerequisites
+    scheduled = {classID for semester in schedule for classID in semester}
+    leftover_classes = sorted((classID for classID in depths if classID not in scheduled), key=lambda x: (depths[x], order[x]))
+    return schedule, leftover_classes
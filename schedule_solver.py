@@ -0,0 +1,131 @@
+from schedule_engine import MAX_SEMESTERS, MAX_CLASSES_PER_SEMESTER, DEFAULT_SEMESTERS, DEFAULT_MAX_UNITS, DEFAULT_LAST_SEMESTER_UNITS
+
+# Anytime branch-and-bound solver that improves a greedy schedule from schedule_engine within a budget of search nodes.
+# The budget is a node count (not a time), so the same input always gives the same schedule & the result can be cached like the greedy one (see schedule_cache.py)
+# A schedule is better if (in this order):
+    # 1.) Fewer classes are left over
+    # 2.) Fewer semesters are used
+    # 3.) The units are more balanced between the semesters used (difference between the heaviest & lightest semester)
+# The search uses the same insertion rules as the greedy engine, written as properties of the finished schedule:
+    # 1.) Total Units <= max_units (last_semester_units for the last semester) & at most MAX_CLASSES_PER_SEMESTER classes
+    # 2.) Classes of the same subject in a semester have the same prereq depth
+    # 3.) At most 1 class per semester has a prereq depth >= the semester (the greedy lets a class break this rule only if it's the first class of the semester)
+    # 4.) Every prerequisite clause is satisfied by a class of an EARLIER semester
+    #     The greedy is less strict: a prerequisite placed earlier in the SAME semester counts as completed. So a schedule found by the solver never has a class & its prerequisite in the same semester, but the greedy seed (returned when nothing better is found) can
+    # 5.) A class is placed at most once
+# When the node budget runs out, the best schedule found so far is returned, so the greedy seed is the worst case.
+
+# About 200ms of search for a 30 class list (~250 nodes per ms)
+DEFAULT_MAX_NODES = 50000
+
+class _BudgetExhausted(Exception):
+    pass
+
+# Score of a schedule, lower is better
+def score_schedule(schedule, leftover_classes, units):
+    used = [semester for semester in schedule if semester]
+    semesters_used = max((i for i, semester in enumerate(schedule, start=1) if semester), default=0)
+    loads = [sum(units[classID] for classID in semester) for semester in used]
+    imbalance = max(loads) - min(loads) if loads else 0.0
+    return (len(leftover_classes), semesters_used, imbalance)
+
+# Return (schedule, leftovers) w/ the best schedule found within max_nodes search nodes.
+# seed: (schedule, leftovers) from the greedy engine, its schedule is returned as is if nothing better is found
+# Unlike the greedy, a class is only placed in a semester AFTER the semesters of its prerequisites (never next to them in the same semester)
+def optimize_schedule(depths, class_dict, prereq_graph, seed, semesters=DEFAULT_SEMESTERS, max_units=DEFAULT_MAX_UNITS, last_semester_units=DEFAULT_LAST_SEMESTER_UNITS, max_nodes=DEFAULT_MAX_NODES):
+    if not 1 <= semesters <= MAX_SEMESTERS:
+        raise ValueError(f"semesters must be between 1 and {MAX_SEMESTERS}, got {semesters}")
+
+    units = {classID: float(class_dict[classID]['Units']) for classID in depths}
+    subjects = {classID: class_dict[classID]['Subject'] for classID in depths}
+    caps = [max_units] * (semesters - 1) + [last_semester_units]
+
+    # The compat engine drops classes (failed classes of a semester that ends on a successful pop, classes deeper than the last semester), so the leftovers of the seed are recomputed: every class of depths that isn't in the schedule
+    scheduled = {classID for semester in seed[0] for classID in semester}
+    seed_leftovers = [classID for classID in depths if classID not in scheduled]
+    best = {'score': score_schedule(seed[0], seed_leftovers, units), 'schedule': seed[0], 'leftovers': seed_leftovers}
+
+    # Classes are assigned in prereq depth order, so the prerequisites of a class are (normally) assigned before it
+    order = sorted(depths, key=lambda x: (depths[x], -units[x]))
+    ids = prereq_graph.ids
+    clauses = {classID: prereq_graph.clauses(ids[classID]) for classID in order}
+
+    semester_of = {}  # class ID (prereq_graph) -> semester index of the classes assigned so far
+    schedule = [[] for _ in range(semesters)]
+    loads = [0.0] * semesters
+    subject_depths = [dict() for _ in range(semesters)]
+    high_depth = [False] * semesters  # Semester already has a class w/ prereq depth >= the semester
+    leftover_classes = []
+    nodes = [0]
+
+    # Earliest semester index (0-based) where every prerequisite clause of the class is satisfied, or None if a clause can't be satisfied by the classes assigned so far
+    def earliest_semester(classID):
+        earliest = 0
+        for clause in clauses[classID]:
+            done = [semester_of[literal] for literal in clause if literal in semester_of]
+            if not done:
+                return None
+            earliest = max(earliest, min(done) + 1)
+        return earliest
+
+    def search(k):
+        nodes[0] += 1
+        if nodes[0] > max_nodes:
+            raise _BudgetExhausted()
+
+        # Bound: leftovers & semesters used only grow as we go deeper
+        used = max((s + 1 for s in range(semesters) if schedule[s]), default=0)
+        if (len(leftover_classes), used) > best['score'][:2]:
+            return
+
+        if k == len(order):
+            score = score_schedule(schedule, leftover_classes, units)
+            if score < best['score']:
+                best['score'] = score
+                best['schedule'] = [list(semester) for semester in schedule]
+                best['leftovers'] = list(leftover_classes)
+            return
+
+        classID = order[k]
+        depth, class_units, subject = depths[classID], units[classID], subjects[classID]
+        earliest = earliest_semester(classID)
+        if earliest is not None:
+            for s in range(earliest, semesters):
+                i = s + 1
+                if len(schedule[s]) >= MAX_CLASSES_PER_SEMESTER or loads[s] + class_units > caps[s]:
+                    continue
+                if subject_depths[s].get(subject, depth) != depth:
+                    continue
+                is_high = depth >= i
+                if is_high and high_depth[s]:
+                    continue
+
+                # Place the class, search deeper, then undo
+                added_subject = subject not in subject_depths[s]
+                schedule[s].append(classID)
+                loads[s] += class_units
+                subject_depths[s][subject] = depth
+                if is_high:
+                    high_depth[s] = True
+                semester_of[ids[classID]] = s
+
+                search(k + 1)
+
+                del semester_of[ids[classID]]
+                if is_high:
+                    high_depth[s] = False
+                if added_subject:
+                    del subject_depths[s][subject]
+                loads[s] -= class_units
+                schedule[s].pop()
+
+        # Last option: leave the class out of the schedule
+        leftover_classes.append(classID)
+        search(k + 1)
+        leftover_classes.pop()
+
+    try:
+        search(0)
+    except _BudgetExhausted:
+        pass
+    return best['schedule'], best['leftovers']
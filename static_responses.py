@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+import threading
+from flask import Response, request
+
+# Responses of the static lookup endpoints (/class_dict, /majors & the GET on /), built once per catalog version.
+# The catalog never changes while the app runs, so every body is serialized once and stored pre-compressed (gzip & brotli when the brotli package is installed).
+# Responses carry a strong ETag (hash of the body + catalog version) and 'If-None-Match' requests get a 304, so browsers & CDNs only download the data again after the catalog changes.
+
+try:
+    import brotli
+except ImportError: # brotli is optional, w/o it we serve gzip & identity only
+    brotli = None
+
+# Encodings in order of preference
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+class PrecomputedResponse:
+    def __init__(self, body, mimetype, version=''):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(version.encode('utf-8') + body).hexdigest()[:32]
+        self.bodies = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(body)
+
+    # Every representation gets its own strong ETag
+    def etag_for(self, encoding):
+        return self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+
+    # Pick the best encoding the client accepts
+    def negotiate(self):
+        for encoding in ENCODINGS:
+            if request.accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    # Build the Flask response for the current request: 304 if the client already has this representation, else the pre-compressed bytes
+    def serve(self):
+        encoding = self.negotiate()
+        etag = self.etag_for(encoding)
+        response = Response(status=200, mimetype=self.mimetype)
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        # Caches may store it but have to revalidate, which is cheap thanks to the ETag
+        response.headers['Cache-Control'] = 'public, no-cache'
+        if request.if_none_match.contains(etag) or request.if_none_match.star_tag:
+            response.status_code = 304
+            return response
+        response.set_data(self.bodies[encoding])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+# Precomputed responses by (name, catalog version). build() is only called the first time
+_responses = {}
+_lock = threading.Lock()
+
+def precomputed_response(name, version, build, mimetype='application/json'):
+    key = (name, version)
+    response = _responses.get(key)
+    if response is None:
+        with _lock:
+            response = _responses.get(key)
+            if response is None:
+                response = PrecomputedResponse(build(), mimetype, version)
+                _responses[key] = response
+    return response.serve()
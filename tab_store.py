@@ -0,0 +1,220 @@
+import json
+import time
+import uuid
+import zlib
+from collections import defaultdict
+from flask import session
+
+# Storage for the data of every schedule tab (university, major, class list, subjects, uploaded PDF data, ...).
+# Two modes:
+    # 'session': the original behavior, every tab is a key of the Flask session, so every request (de)serializes every tab of the user
+    # 'redis': every tab is its own Redis hash w/ its own TTL, so a request only loads the tab it needs. Each field is encoded w/ msgpack (JSON if msgpack isn't installed) and compressed w/ zstd (zlib if zstandard isn't installed).
+    #          Every user keeps at most max_tabs live tabs: the least recently used tabs are evicted when a new one is created.
+
+try:
+    import msgpack
+except ImportError: # msgpack is optional, JSON is the fallback
+    msgpack = None
+try:
+    import zstandard
+except ImportError: # zstandard is optional, zlib is the fallback
+    zstandard = None
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_TABS = 20
+# Fields smaller than this are stored uncompressed
+COMPRESS_MIN_BYTES = 256
+# Keys that older sessions stored a full copy of the catalog dictionaries under
+CATALOG_SESSION_KEYS = ('class_dict', 'ged', 'igetc')
+
+# Encoded fields start w/ 2 bytes: the serializer (M = msgpack, J = JSON) and the compression (z = zstd, l = zlib, n = none), so data written w/ one set of packages can still be read w/ another
+# msgpack & JSON only know lists & dicts w/ (string) keys, so the other types tabs store (EX: the subjects are a defaultdict, tuples, sets, dicts w/ int keys) are tagged before serializing & rebuilt after
+TYPE_TAG = '__type__'
+DEFAULT_FACTORIES = {None: None, 'list': list, 'dict': dict, 'set': set, 'int': int, 'str': str}
+
+def _tag(value):
+    if isinstance(value, defaultdict):
+        factory = value.default_factory.__name__ if value.default_factory is not None else None
+        if factory not in DEFAULT_FACTORIES:
+            raise TypeError(f"Can't store a defaultdict of {value.default_factory!r}")
+        return {TYPE_TAG: 'defaultdict', 'factory': factory, 'items': [[_tag(k), _tag(v)] for k, v in value.items()]}
+    if isinstance(value, dict):
+        if TYPE_TAG in value or not all(isinstance(k, str) for k in value):
+            return {TYPE_TAG: 'dict', 'items': [[_tag(k), _tag(v)] for k, v in value.items()]}
+        return {k: _tag(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return {TYPE_TAG: 'tuple', 'items': [_tag(v) for v in value]}
+    if isinstance(value, (set, frozenset)):
+        return {TYPE_TAG: 'set', 'items': [_tag(v) for v in value]}
+    if isinstance(value, list):
+        return [_tag(v) for v in value]
+    return value
+
+def _untag(value):
+    if isinstance(value, list):
+        return [_untag(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    kind = value.get(TYPE_TAG)
+    if kind is None:
+        return {k: _untag(v) for k, v in value.items()}
+    if kind == 'tuple':
+        return tuple(_untag(v) for v in value['items'])
+    if kind == 'set':
+        return {_untag(v) for v in value['items']}
+    items = ((_untag(k), _untag(v)) for k, v in value['items'])
+    if kind == 'defaultdict':
+        return defaultdict(DEFAULT_FACTORIES[value['factory']], items)
+    return dict(items)
+
+def encode_value(value):
+    value = _tag(value)
+    if msgpack is not None:
+        data, serializer = msgpack.packb(value, use_bin_type=True), b'M'
+    else:
+        data, serializer = json.dumps(value, separators=(',', ':')).encode('utf-8'), b'J'
+    if len(data) < COMPRESS_MIN_BYTES:
+        return serializer + b'n' + data
+    if zstandard is not None:
+        return serializer + b'z' + zstandard.ZstdCompressor(level=3).compress(data)
+    return serializer + b'l' + zlib.compress(data, 6)
+
+def decode_value(blob):
+    serializer, compression, data = blob[:1], blob[1:2], blob[2:]
+    if serializer not in (b'M', b'J') or compression not in (b'z', b'l', b'n'):
+        raise ValueError(f"Unknown tab field header: {blob[:2]!r}")
+    if compression == b'z':
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif compression == b'l':
+        data = zlib.decompress(data)
+    value = msgpack.unpackb(data, raw=False, strict_map_key=False) if serializer == b'M' else json.loads(data)
+    return _untag(value)
+
+# Drop the catalog copies older tabs still carry (the catalog dictionaries come from the in-process catalog). Returns True if the tab changed
+def strip_catalog_copies(tab_data, catalog_version):
+    if not any(key in tab_data for key in CATALOG_SESSION_KEYS):
+        return False
+    for key in CATALOG_SESSION_KEYS:
+        tab_data.pop(key, None)
+    tab_data.setdefault('catalog_version', catalog_version)
+    return True
+
+# ID of the current user, kept in the (small) Flask session
+def current_user_id():
+    if 'uid' not in session:
+        session['uid'] = uuid.uuid4().hex
+    return session['uid']
+
+# Original mode: tabs live inside the Flask session
+class SessionTabStore:
+    def __init__(self, catalog_version=''):
+        self.catalog_version = catalog_version
+
+    def create(self, tab_id, tab_data, user_id=None):
+        session[tab_id] = tab_data
+
+    # Return the data of a tab (or None if the tab_id is unknown). fields: only return these keys of the tab
+    def get(self, tab_id, user_id=None, fields=None):
+        tab_data = session.get(tab_id) if tab_id else None
+        if not isinstance(tab_data, dict):
+            return None
+        # Migration: remove the catalog copies the first time an old tab is read
+        if strip_catalog_copies(tab_data, self.catalog_version):
+            session.modified = True
+        if fields:
+            return {field: tab_data[field] for field in fields if field in tab_data}
+        return tab_data
+
+    def update(self, tab_id, user_id=None, **fields):
+        session[tab_id].update(fields)
+        session.modified = True
+
+# Redis mode: 1 hash per tab ('tab:<user>:<tab_id>', 1 field per key of the tab data) & 1 sorted set per user w/ the last time every tab was used
+class RedisTabStore:
+    def __init__(self, redis_client, ttl_seconds=DEFAULT_TTL_SECONDS, max_tabs=DEFAULT_MAX_TABS, catalog_version=''):
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.max_tabs = max_tabs
+        self.catalog_version = catalog_version
+
+    def _tab_key(self, user_id, tab_id):
+        return f"tab:{user_id}:{tab_id}"
+
+    def _user_key(self, user_id):
+        return f"user-tabs:{user_id}"
+
+    # Mark the tab as recently used, refresh the TTLs & evict the least recently used tabs over the cap
+    def _touch(self, pipe, user_id, tab_id):
+        user_key = self._user_key(user_id)
+        pipe.zadd(user_key, {tab_id: time.time()})
+        pipe.expire(self._tab_key(user_id, tab_id), self.ttl_seconds)
+        pipe.expire(user_key, self.ttl_seconds)
+
+    def _evict(self, user_id):
+        user_key = self._user_key(user_id)
+        extra = self.redis.zcard(user_key) - self.max_tabs
+        if extra > 0:
+            oldest = self.redis.zrange(user_key, 0, extra - 1)
+            pipe = self.redis.pipeline()
+            for tab_id in oldest:
+                tab_id = tab_id.decode() if isinstance(tab_id, bytes) else tab_id
+                pipe.delete(self._tab_key(user_id, tab_id))
+                pipe.zrem(user_key, tab_id)
+            pipe.execute()
+
+    def create(self, tab_id, tab_data, user_id=None):
+        user_id = user_id or current_user_id()
+        tab_key = self._tab_key(user_id, tab_id)
+        pipe = self.redis.pipeline()
+        pipe.delete(tab_key)
+        pipe.hset(tab_key, mapping={field: encode_value(value) for field, value in tab_data.items()})
+        self._touch(pipe, user_id, tab_id)
+        pipe.execute()
+        self._evict(user_id)
+
+    # Return the data of a tab (or None if the tab_id is unknown). fields: only load these keys of the tab
+    def get(self, tab_id, user_id=None, fields=None):
+        if not tab_id:
+            return None
+        user_id = user_id or current_user_id()
+        tab_key = self._tab_key(user_id, tab_id)
+        if fields:
+            blobs = dict(zip(fields, self.redis.hmget(tab_key, fields)))
+            if all(blob is None for blob in blobs.values()) and not self.redis.exists(tab_key):
+                return self._migrate_from_session(tab_id, user_id, fields)
+            tab_data = {field: decode_value(blob) for field, blob in blobs.items() if blob is not None}
+        else:
+            blobs = self.redis.hgetall(tab_key)
+            if not blobs:
+                return self._migrate_from_session(tab_id, user_id, fields)
+            tab_data = {(field.decode() if isinstance(field, bytes) else field): decode_value(blob) for field, blob in blobs.items()}
+        pipe = self.redis.pipeline()
+        self._touch(pipe, user_id, tab_id)
+        pipe.execute()
+        return tab_data
+
+    def update(self, tab_id, user_id=None, **fields):
+        user_id = user_id or current_user_id()
+        pipe = self.redis.pipeline()
+        pipe.hset(self._tab_key(user_id, tab_id), mapping={field: encode_value(value) for field, value in fields.items()})
+        self._touch(pipe, user_id, tab_id)
+        pipe.execute()
+
+    # Migration: a tab created while the tabs were stored in the Flask session is moved into its own hash the first time it's read
+    def _migrate_from_session(self, tab_id, user_id, fields=None):
+        tab_data = session.pop(tab_id, None)
+        if not isinstance(tab_data, dict):
+            return None
+        strip_catalog_copies(tab_data, self.catalog_version)
+        self.create(tab_id, tab_data, user_id)
+        if fields:
+            return {field: tab_data[field] for field in fields if field in tab_data}
+        return tab_data
+
+# Create the tab store for the mode configured in the app ('redis' or 'session')
+def create_tab_store(mode, redis_client=None, ttl_seconds=DEFAULT_TTL_SECONDS, max_tabs=DEFAULT_MAX_TABS, catalog_version=''):
+    if mode == 'redis':
+        return RedisTabStore(redis_client, ttl_seconds=ttl_seconds, max_tabs=max_tabs, catalog_version=catalog_version)
+    if mode == 'session':
+        return SessionTabStore(catalog_version=catalog_version)
+    raise ValueError(f"Unknown tab store mode: {mode}")
@@ -0,0 +1,47 @@
+import os
+import threading
+
+import agreement_index
+from agreement_index import AgreementIndex
+from assist_cache import DiskCacheBackend, ResponseCache
+from assist_client import AssistClient
+from assist_stub import AssistStub
+
+def test_concurrent_rebuilds_dont_share_a_temporary_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(agreement_index, 'build_index', lambda university_ids=None: {'built_at': 0, 'reports': {(11, 73, 'Computer Science, B.S.'): str(threading.get_ident())}, 'years': {11: [73]}})
+    path = str(tmp_path / 'agreement_index.pkl')
+    errors = []
+
+    def rebuild():
+        try:
+            for _ in range(20):
+                AgreementIndex(path).rebuild()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=rebuild) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert os.listdir(tmp_path) == ['agreement_index.pkl']
+    assert AgreementIndex(path).lookup(11, 'Computer Science, B.S.') is not None
+
+# A rebuild asks ASSIST even when the response cache has a fresh entry
+def test_revalidating_client_skips_fresh_cache_entries(tmp_path):
+    fixtures = {'agreements': {'150': [{'institutionParentId': 11, 'receivingYearIds': [72, 73]}]}}
+    stub = AssistStub(fixtures)
+    server, base_url = stub.serve()
+    try:
+        client = AssistClient(base_url, rate=1000, burst=1000, cache=ResponseCache(DiskCacheBackend(str(tmp_path))))
+        assert client.get_agreements(150) == fixtures['agreements']['150']
+        fixtures['agreements']['150'] = [{'institutionParentId': 11, 'receivingYearIds': [72, 73, 74]}]
+        # The cached entry is fresh
+        assert client.get_agreements(150)[0]['receivingYearIds'] == [72, 73]
+        assert client.revalidating().get_agreements(150)[0]['receivingYearIds'] == [72, 73, 74]
+        # The new response is cached for the other requests
+        assert client.get_agreements(150)[0]['receivingYearIds'] == [72, 73, 74]
+        assert stub.requests['/api/institutions/150/agreements'] == 2
+    finally:
+        server.shutdown()
@@ -0,0 +1,210 @@
+import importlib
+import sys
+import types
+from unittest import mock
+
+import pytest
+
+# Modules of app.py that need a service (Redis, S3, Postgres, SendGrid), the pickled catalog or the PDF libraries: replaced by mocks
+STUBBED_MODULES = [
+    'flask_session', 'dotenv', 'decouple', 'boto3', 'botocore', 'botocore.exceptions', 'redis',
+    'sendgrid', 'sendgrid.helpers', 'sendgrid.helpers.mail', 'pdfoutput', 'extraction', 'Schedule', 'outToPDF', 'models'
+]
+
+class StubModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = mock.MagicMock(name=f"{self.__name__}.{name}")
+        setattr(self, name, value)
+        return value
+
+# app.py imported w/ the stubs above, the indexes & catalog not built, and the Flask session in a cookie
+@pytest.fixture
+def app_module(monkeypatch):
+    for name in STUBBED_MODULES:
+        monkeypatch.setitem(sys.modules, name, StubModule(name))
+    sys.modules['botocore.exceptions'].NoCredentialsError = type('NoCredentialsError', (Exception,), {})
+    sys.modules['Schedule'].CATALOG_VERSION = 'catalog-1'
+    monkeypatch.setenv('DATABASE_URL', 'postgresql://localhost/test')
+    monkeypatch.setenv('SECRET_KEY', 'test')
+    for name in ('AGREEMENT_INDEX_REFRESH_HOURS', 'TAB_STORE', 'EXTRACTION_JOBS', 'FLASK_ENV'):
+        monkeypatch.delenv(name, raising=False)
+
+    import catalog
+    import degree_index
+    import ge_index
+    import schedule_cache
+    monkeypatch.setattr(catalog.catalog, 'preload', lambda: None)
+    monkeypatch.setattr(catalog.catalog, 'view', lambda name: {})
+    monkeypatch.setattr(catalog.catalog, 'get', lambda name: {})
+    monkeypatch.setattr(catalog.catalog, 'version', lambda name: f"{name}-1")
+    monkeypatch.setattr(degree_index, 'get_degree_index', lambda: mock.MagicMock(supported=True))
+    monkeypatch.setattr(ge_index, 'preload', lambda: None)
+    monkeypatch.setattr(schedule_cache.schedule_cache, 'configure', lambda **kwargs: None)
+
+    sys.modules.pop('app', None)
+    module = importlib.import_module('app')
+    module.app.config['TESTING'] = True
+    yield module
+    sys.modules.pop('app', None)
+
+# Session of the app that counts its writes
+class SessionSpy(dict):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def __setitem__(self, key, value):
+        self.writes.append([key])
+        super().__setitem__(key, value)
+
+    def update(self, *args, **kwargs):
+        values = dict(*args, **kwargs)
+        self.writes.append(sorted(values))
+        super().update(values)
+
+@pytest.fixture
+def evaluations(app_module, monkeypatch):
+    calls = []
+    def evaluation(name, result):
+        def evaluate(user_classes):
+            calls.append((name, list(user_classes)))
+            return result(user_classes)
+        return evaluate
+    monkeypatch.setattr(app_module, 'find_degrees', evaluation('degrees', lambda classes: (['Math'] if 'MATH1A' in classes else [], {'Physics': ['PHYS4A']})))
+    monkeypatch.setattr(app_module, 'complete_IGETC', evaluation('IGETC', lambda classes: (['Area 2'], {'Area 2': {'MATH': classes}})))
+    monkeypatch.setattr(app_module, 'complete_CSU_GE', evaluation('CSU_GE', lambda classes: (['B4'], {'B4': {'MATH': classes}})))
+    monkeypatch.setattr(app_module, 'cheapest_remaining_IGETC', evaluation('IGETC', lambda classes: {'Area 1A': 'ENGL1A'}))
+    monkeypatch.setattr(app_module, 'cheapest_remaining_CSU_GE', evaluation('CSU_GE', lambda classes: None))
+    return calls
+
+GRID = {'1_3': ' math1a', '1_5': 'MATH1B ', '1_9': '', '2_3': 'MATH1A'}
+
+# 1 request: the classes are normalized once, every evaluation gets the same classes & the session is written once
+def test_evaluate_requirements(app_module, evaluations, monkeypatch):
+    session = SessionSpy()
+    monkeypatch.setattr(app_module, 'session', session)
+    response = app_module.app.test_client().post('/evaluate-requirements', json=GRID)
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'completed_degrees': ['Math'],
+        'almost_completed_degrees': {'Physics': ['PHYS4A']},
+        'IGETC_results': [['Area 2'], {'Area 2': {'MATH': ['MATH1A', 'MATH1B']}}],
+        'CSU_GE_results': [['B4'], {'B4': {'MATH': ['MATH1A', 'MATH1B']}}],
+        'IGETC_cheapest_remaining': {'Area 1A': 'ENGL1A'},
+        'CSU_GE_cheapest_remaining': None
+    }
+    assert {tuple(user_classes) for _, user_classes in evaluations} == {('MATH1A', 'MATH1B')}
+    assert session.writes == [['completed_degrees', 'user_classes']]
+    assert session == {'user_classes': ['MATH1A', 'MATH1B'], 'completed_degrees': ['Math']}
+
+# The legacy endpoints normalize the classes the same way, so they return the same results as /evaluate-requirements
+def test_legacy_endpoints_match_evaluate_requirements(app_module, evaluations):
+    client = app_module.app.test_client()
+    combined = client.post('/evaluate-requirements', json=GRID).get_json()
+    degrees = client.post('/calculate-degrees', json=GRID).get_json()
+    assert degrees == {'completed_degrees': combined['completed_degrees'], 'almost_completed_degrees': combined['almost_completed_degrees']}
+    assert client.post('/complete_IGETC', json=GRID).get_json() == {'IGETC_results': combined['IGETC_results']}
+    assert client.post('/complete_CSU_GE', json=GRID).get_json() == {'results': combined['CSU_GE_results']}
+    assert {tuple(user_classes) for _, user_classes in evaluations} == {('MATH1A', 'MATH1B')}
+
+# /generate_schedule w/o a verified schedule: the precomputed schedule of the agreement, or a live schedule of the tab's class list
+@pytest.fixture
+def generate_schedule(app_module, monkeypatch):
+    calls = []
+    def unverified_schedule_generator(classList, **kwargs):
+        calls.append(classList)
+        return {'1_3': 'LIVE'}
+    monkeypatch.setattr(app_module, 'find_verified_schedule', lambda major, university: None)
+    monkeypatch.setattr(app_module, 'find_precomputed_schedule', lambda major, university, catalog_version: types.SimpleNamespace(class_list=['MATH1A(5.00)', 'MATH1B(5.00)'], data_dict={'1_3': 'PRECOMPUTED'}))
+    monkeypatch.setattr(app_module, 'unverifiedScheduleGenerator', unverified_schedule_generator)
+    def generate(class_list):
+        monkeypatch.setattr(app_module, 'get_tab', lambda tab_id, fields=None: {'classList': class_list})
+        response = app_module.app.test_client().get('/generate_schedule?tab_id=1&major=Math&university=UCLA')
+        return response.get_json()['data_dict']
+    generate.calls = calls
+    return generate
+
+@pytest.mark.parametrize('class_list', [[], ['MATH1A(5.00)', 'MATH1B(5.00)']])
+def test_precomputed_schedule_for_the_same_class_list(generate_schedule, class_list):
+    assert generate_schedule(class_list) == {'1_3': 'PRECOMPUTED'}
+    assert generate_schedule.calls == []
+
+def test_live_schedule_for_another_class_list(generate_schedule):
+    assert generate_schedule(['MATH1A(5.00)', 'PHYS4A(4.00)']) == {'1_3': 'LIVE'}
+    assert generate_schedule.calls == [['MATH1A(5.00)', 'PHYS4A(4.00)']]
+
+# / & /majors are served from static_responses.py: a small index template & university map instead of the real ones
+@pytest.fixture
+def static_client(app_module, monkeypatch):
+    import jinja2
+    import static_responses
+    monkeypatch.setattr(static_responses, '_responses', {})
+    # brotli is optional: a fake one so 'br' can be negotiated
+    monkeypatch.setattr(static_responses, 'brotli', types.SimpleNamespace(compress=lambda body: b'br:' + body))
+    monkeypatch.setattr(static_responses, 'ENCODINGS', ('br', 'gzip'))
+    monkeypatch.setattr(app_module.app.jinja_env, 'loader', jinja2.DictLoader({'index.html': '{% for university in universities %}{{ university.name }};{% endfor %}'}))
+    monkeypatch.setattr(app_module, 'generate_universities', lambda: [{'id': '117', 'code': 'UCLA', 'name': 'UCLA'}, {'id': '79', 'code': 'UCB', 'name': 'UC Berkeley'}])
+    monkeypatch.setattr(app_module, 'u_map_unpickled', {11: {'majors': ['Physics', 'Math']}, 117: {'majors': ['Chemistry']}})
+    return app_module.app.test_client()
+
+@pytest.mark.parametrize('path, body', [('/', b'UC Berkeley;UCLA;'), ('/majors?university_id=11', b'["Math", "Physics"]')])
+def test_static_response_encodings(static_client, path, body):
+    import gzip
+
+    identity = static_client.get(path)
+    assert identity.status_code == 200
+    assert identity.data == body
+    assert 'Content-Encoding' not in identity.headers
+    assert identity.headers['Vary'] == 'Accept-Encoding'
+    etag = identity.get_etag()[0]
+
+    gzipped = static_client.get(path, headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(gzipped.data) == body
+    assert gzipped.get_etag()[0] == f"{etag}-gzip"
+    assert gzipped.headers['Vary'] == 'Accept-Encoding'
+
+    # br is preferred over gzip, & an encoding w/ q=0 is never used
+    brotli = static_client.get(path, headers={'Accept-Encoding': 'gzip, deflate, br'})
+    assert brotli.headers['Content-Encoding'] == 'br'
+    assert brotli.data == b'br:' + body
+    assert brotli.get_etag()[0] == f"{etag}-br"
+    assert static_client.get(path, headers={'Accept-Encoding': 'br;q=0, gzip'}).headers['Content-Encoding'] == 'gzip'
+
+@pytest.mark.parametrize('path', ['/', '/majors?university_id=11'])
+def test_static_response_not_modified(static_client, path):
+    etag = static_client.get(path, headers={'Accept-Encoding': 'gzip'}).get_etag()[0]
+    not_modified = static_client.get(path, headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+    assert not_modified.get_etag()[0] == etag
+    assert not_modified.headers['Vary'] == 'Accept-Encoding'
+    assert static_client.get(path, headers={'If-None-Match': '*'}).status_code == 304
+
+    # The ETag of another encoding (or another catalog) doesn't match
+    assert static_client.get(path, headers={'If-None-Match': f'"{etag}"'}).status_code == 200
+    assert static_client.get(path, headers={'Accept-Encoding': 'gzip', 'If-None-Match': '"other"'}).status_code == 200
+
+# Every university has its own response, & a response is only built once
+def test_majors_are_built_once_per_university(static_client, app_module, monkeypatch):
+    assert static_client.get('/majors?university_id=117').get_json() == ['Chemistry']
+    assert static_client.get('/majors?university_id=11').get_json() == ['Math', 'Physics']
+    monkeypatch.setattr(app_module, 'u_map_unpickled', {11: {'majors': ['Art']}, 117: {'majors': ['Art']}})
+    assert static_client.get('/majors?university_id=11').get_json() == ['Math', 'Physics']
+
+# /schedule on a tab of an old session: the template gets the catalog dictionaries from the catalog & the copies are dropped from the session
+def test_schedule_migrates_old_tabs(app_module, monkeypatch):
+    import jinja2
+    monkeypatch.setattr(app_module.app.jinja_env, 'loader', jinja2.DictLoader({'schedule.html': '{{ major }} {{ class_dict|tojson }}'}))
+    monkeypatch.setattr(app_module.catalog, 'get', lambda name: {'class_dict': {'MATH1A': {'Units': '5.00'}}}.get(name, {}))
+    client = app_module.app.test_client()
+    with client.session_transaction() as session:
+        session['tab'] = {'university_name': 'UCLA', 'major': 'Math', 'classList': ['MATH1A'], 'class_dict': {'OLD1': {}}, 'ged': {}, 'igetc': {}}
+
+    response = client.get('/schedule?tab_id=tab')
+    assert response.status_code == 200
+    assert response.data == b'Math {"MATH1A": {"Units": "5.00"}}'
+    with client.session_transaction() as session:
+        assert session['tab'] == {'university_name': 'UCLA', 'major': 'Math', 'classList': ['MATH1A'], 'catalog_version': 'catalog-1'}
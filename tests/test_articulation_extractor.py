@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+from articulation_extractor import extract_requirements, format_articulation, process_articulation
+from assist_client import AssistClient
+from assist_stub import AssistStub
+from requirement_parser import parse_requirements, resolve_requirements
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'assist_26298705.json')
+REPORT_KEY = '26298705'
+
+@pytest.fixture(scope='module')
+def fixtures():
+    with open(FIXTURES) as f:
+        return json.load(f)
+
+@pytest.fixture(scope='module')
+def client(fixtures):
+    server, base_url = AssistStub(fixtures).serve()
+    yield AssistClient(base_url, rate=1000, burst=1000)
+    server.shutdown()
+
+def _class_dict(class_list):
+    return {class_id: {} for tree in parse_requirements(class_list) for option in tree for group in option for token in group for class_id in token.split('&') if class_id}
+
+# The JSON of the agreement, served by the stub, gives the same lines as the PDF (w/o its blank lines)
+def test_json_lines_match_the_pdf(fixtures, client):
+    pdf_lines = fixtures['pdf_class_lists'][REPORT_KEY]
+    assert process_articulation(REPORT_KEY, client) == [line for line in pdf_lines if line]
+
+# Both class lists pick the same required classes
+def test_json_and_pdf_resolve_to_the_same_classes(fixtures, client):
+    pdf_lines = fixtures['pdf_class_lists'][REPORT_KEY]
+    json_lines = process_articulation(REPORT_KEY, client)
+    class_dict = _class_dict(pdf_lines)
+    assert resolve_requirements(parse_requirements(json_lines), class_dict) == resolve_requirements(parse_requirements(pdf_lines), class_dict)
+
+def test_json_and_pdf_clean_to_the_same_list(fixtures, client):
+    pdfExtract = pytest.importorskip('pdfExtract')
+    pdf_lines = fixtures['pdf_class_lists'][REPORT_KEY]
+    assert pdfExtract.clean_class_list(process_articulation(REPORT_KEY, client)) == pdfExtract.clean_class_list(pdf_lines)
+
+def _articulation(*groups, conjunction='Or'):
+    items = [{'courseConjunction': 'And', 'position': i, 'items': [{'prefix': prefix, 'courseNumber': number, 'maxUnits': 3.0} for prefix, number in group]} for i, group in enumerate(groups)]
+    return {'sendingArticulation': {'items': items, 'courseGroupConjunctions': [{'groupConjunction': conjunction, 'sendingCourseGroupBeginPosition': 0, 'sendingCourseGroupEndPosition': len(groups) - 1}]}}
+
+def test_sending_groups_are_separate_lines():
+    assert format_articulation(_articulation([('ART', '1')], [('ART', '2')])) == ['ART1(3.00) OR ', 'ART2(3.00)']
+    assert format_articulation(_articulation([('ART', '1')], [('ART', '2')], conjunction='And')) == ['ART1(3.00) AND ', 'ART2(3.00)']
+    assert format_articulation({'sendingArticulation': {'noArticulationReason': 'No Course Articulated'}}) == []
+
+def test_choose_n_of_the_receiving_courses():
+    articulations = [{'templateCellId': f'c{i}', 'articulation': _articulation([('ART', str(i))])} for i in range(1, 4)]
+    assets = [{'type': 'RequirementGroup', 'groupId': 'g', 'instruction': {'conjunction': 'Or', 'amount': 2}, 'sections': [{'rows': [{'cells': [{'id': f'c{i}'}]} for i in range(1, 4)]}]}]
+    assert extract_requirements(articulations, assets) == ['ART1(3.00)', 'ART2(3.00)']
+    assets[0]['instruction']['amount'] = 1
+    assert extract_requirements(articulations, json.dumps(assets)) == ['ART1(3.00) OR ', 'ART2(3.00) OR ', 'ART3(3.00)']
+    # W/o the template assets every course is required
+    assert extract_requirements(articulations) == ['ART1(3.00)', 'ART2(3.00)', 'ART3(3.00)']
@@ -0,0 +1,64 @@
+import hashlib
+import io
+import os
+
+from artifact_store import ArtifactStore
+
+def test_put_get_by_digest(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    digest = store.put(b'agreement')
+    assert digest == hashlib.sha256(b'agreement').hexdigest()
+    assert store.get(digest) == b'agreement'
+    assert store.get(hashlib.sha256(b'other').hexdigest()) is None
+    # Same bytes, same blob
+    assert store.put(b'agreement') == digest
+    assert os.listdir(tmp_path / 'blobs') == [digest]
+
+def test_get_artifact_fetches_once(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    fetches = []
+    def fetch():
+        fetches.append(1)
+        return b'agreement'
+    assert store.get_artifact('26298705', fetch) == b'agreement'
+    assert store.get_artifact('26298705', fetch) == b'agreement'
+    assert len(fetches) == 1
+    assert store.get_artifact('unknown') is None
+
+def test_memo_is_keyed_by_extractor_version(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    store.set_class_list('26298705', 'pdf-1', ['MATH1A(5.00)'])
+    assert store.get_class_list('26298705', 'pdf-1') == ['MATH1A(5.00)']
+    assert store.get_class_list('26298705', 'pdf-2') is None
+    assert store.get_class_list('26298706', 'pdf-1') is None
+
+# The least recently used blobs (by mtime, refreshed on every read) are evicted first
+def test_lru_eviction(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=25)
+    old, used, new = b'a' * 10, b'b' * 10, b'c' * 10
+    old_digest, used_digest = store.put(old), store.put(used)
+    os.utime(tmp_path / 'blobs' / old_digest, (1, 1))
+    os.utime(tmp_path / 'blobs' / used_digest, (2, 2))
+    assert store.get(used_digest) == used # Marks it as recently used
+    os.utime(tmp_path / 'blobs' / old_digest, (1, 1))
+    new_digest = store.put(new)
+    assert store.get(old_digest) is None
+    assert store.get(used_digest) == used
+    assert store.get(new_digest) == new
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)])}
+
+# A blob evicted locally (or stored by another server) comes back from S3 w/o fetching it again
+def test_s3_backs_the_local_store(tmp_path):
+    s3 = FakeS3()
+    ArtifactStore(str(tmp_path / 'server1'), s3_client=s3, s3_bucket='bucket').get_artifact('26298705', lambda: b'agreement')
+    store = ArtifactStore(str(tmp_path / 'server2'), s3_client=s3, s3_bucket='bucket')
+    assert store.get_artifact('26298705') == b'agreement'
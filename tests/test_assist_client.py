@@ -0,0 +1,88 @@
+import importlib
+import pickle
+import time
+
+import pytest
+import requests
+
+from assist_client import AssistClient
+from assist_stub import AssistStub
+from catalog import catalog
+
+AGREEMENTS = [{'institutionParentId': 11, 'receivingYearIds': [70 + n, 73]} for n in range(3)]
+
+# Answers w/ a 503 until `failures` requests were made
+class FlakyStub(AssistStub):
+    def __init__(self, fixtures, failures, **kwargs):
+        super().__init__(fixtures, **kwargs)
+        self.failures = failures
+
+    def respond(self, path, query):
+        if self.failures > 0:
+            self.failures -= 1
+            return 503, 'application/json', b'{"error": "unavailable"}'
+        return super().respond(path, query)
+
+@pytest.fixture
+def serve():
+    servers = []
+    def serve(stub):
+        server, base_url = stub.serve()
+        servers.append(server)
+        return base_url
+    yield serve
+    for server in servers:
+        server.shutdown()
+
+def test_retries_until_assist_answers(serve):
+    stub = FlakyStub({'agreements': {'150': AGREEMENTS}}, failures=2)
+    client = AssistClient(serve(stub), rate=1000, burst=1000, backoff=0.01)
+    assert client.get_agreements(150) == AGREEMENTS
+    assert stub.failures == 0
+
+# A huge Retry-After is clamped to max_backoff instead of blocking the request thread
+def test_retry_after_is_capped(serve):
+    stub = FlakyStub({'agreements': {'150': AGREEMENTS}}, failures=1, retry_after=3600)
+    client = AssistClient(serve(stub), rate=1000, burst=1000, max_backoff=0.05)
+    start = time.monotonic()
+    assert client.get_agreements(150) == AGREEMENTS
+    assert time.monotonic() - start < 1
+
+# The client gives up w/ the last error once the next wait would go past the deadline
+def test_gives_up_at_the_deadline(serve):
+    stub = AssistStub({}, fail_rate=1.0, retry_after=1)
+    client = AssistClient(serve(stub), rate=1000, burst=1000, retries=10, max_backoff=1, deadline=0.5)
+    start = time.monotonic()
+    with pytest.raises(requests.HTTPError):
+        client.get_agreements(150)
+    assert time.monotonic() - start < 0.5
+    assert stub.requests['/api/institutions/150/agreements'] == 1
+
+@pytest.fixture
+def pdfoutput(tmp_path, monkeypatch):
+    # pdfoutput reads the university map of the catalog when it's imported
+    path = tmp_path / 'u_map.pkl'
+    path.write_bytes(pickle.dumps({'11': {'code': 'CPSLO', 'institutionName': 'Cal Poly', 'majors': []}}))
+    monkeypatch.setitem(catalog.files, 'u_map', str(path))
+    monkeypatch.setattr(catalog, '_objects', {})
+    return importlib.reload(importlib.import_module('pdfoutput'))
+
+# find_report_key stops fetching the reports of the agreements once the major is found
+def test_find_report_key_stops_at_the_first_match(serve, pdfoutput):
+    agreements = [{'institutionParentId': 11, 'receivingYearIds': [year]} for year in range(40, 70)]
+    reports = {f"11:{year}": [{'label': f"Major {year}", 'key': str(year)}] for year in range(40, 70)}
+    stub = AssistStub({'agreements': {'150': agreements}, 'reports': reports}, latency=0.02)
+    client = AssistClient(serve(stub), rate=1000, burst=1000, concurrency=2)
+    assert pdfoutput.PDFOutput(11, client=client).find_report_key('Major 41') == '41'
+    time.sleep(0.1)
+    assert stub.requests['/api/agreements'] < len(agreements)
+    assert pdfoutput.PDFOutput(11, client=client).find_report_key('Unknown') is None
+
+# Responses of the stub & of ASSIST are cached under different keys
+def test_cache_keys_include_the_base_url(serve, tmp_path):
+    from assist_cache import DiskCacheBackend, ResponseCache
+    cache = ResponseCache(DiskCacheBackend(str(tmp_path)))
+    stub_client = AssistClient(serve(AssistStub({'agreements': {'150': AGREEMENTS}})), rate=1000, burst=1000, cache=cache)
+    other_client = AssistClient(serve(AssistStub({'agreements': {'150': []}})), rate=1000, burst=1000, cache=cache)
+    assert stub_client.get_agreements(150) == AGREEMENTS
+    assert other_client.get_agreements(150) == []
@@ -0,0 +1,46 @@
+import io
+import json
+import sys
+import types
+
+import batch_degree_audit
+from batch_degree_audit import audit_students, read_csv, read_jsonl
+from degree_index import normalize_classes
+
+def test_read_csv_classes_column():
+    f = io.StringIO('student_id,classes\n1,"MATH1A; MATH1B ;"\n2,ENGL1A | ENGL1B\n3,\n,CHEM1A\n')
+    assert list(read_csv(f)) == [('1', ['MATH1A', 'MATH1B']), ('2', ['ENGL1A', 'ENGL1B']), ('3', []), ('4', ['CHEM1A'])]
+
+def test_read_csv_one_class_per_column():
+    f = io.StringIO('student_id,class1,class2,class3\n1, MATH1A ,,PHYS4A\n')
+    assert list(read_csv(f)) == [('1', ['MATH1A', 'PHYS4A'])]
+
+def test_read_jsonl_skips_malformed_lines(capsys):
+    lines = [
+        json.dumps({'student_id': 'a', 'classes': ['MATH1A']}),
+        '{"student_id": "b", "classes": [',
+        '',
+        '["not", "an", "object"]',
+        json.dumps({'classes': {'textbox1': 'ENGL1A'}}),
+    ]
+    assert list(read_jsonl(io.StringIO('\n'.join(lines)))) == [('a', ['MATH1A']), ('5', ['ENGL1A'])]
+    err = capsys.readouterr().err
+    assert 'line 2' in err and 'line 4' in err
+
+def test_audit_students(monkeypatch):
+    degree_index = types.ModuleType('degree_index')
+    degree_index.normalize_classes = normalize_classes
+    degree_index.find_degrees = lambda user_classes: (['Math'] if 'MATH1A' in user_classes else [], {})
+    ge_index = types.ModuleType('ge_index')
+    ge_index.complete_IGETC = lambda user_classes: ('IGETC', len(user_classes))
+    ge_index.complete_CSU_GE = lambda user_classes: ('CSU_GE', len(user_classes))
+    monkeypatch.setitem(sys.modules, 'degree_index', degree_index)
+    monkeypatch.setitem(sys.modules, 'ge_index', ge_index)
+    # The classes are normalized like /evaluate-requirements does
+    assert audit_students([('1', [' math1a', 'ENGL1A', 'MATH1A']), ('2', [])]) == [
+        {'student_id': '1', 'completed_degrees': ['Math'], 'almost_completed_degrees': {}, 'IGETC_results': ('IGETC', 2), 'CSU_GE_results': ('CSU_GE', 2)},
+        {'student_id': '2', 'completed_degrees': [], 'almost_completed_degrees': {}, 'IGETC_results': ('IGETC', 0), 'CSU_GE_results': ('CSU_GE', 0)},
+    ]
+
+def test_chunked():
+    assert list(batch_degree_audit.chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
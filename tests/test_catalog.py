@@ -0,0 +1,29 @@
+import pickle
+
+import pytest
+
+from catalog import CatalogRegistry
+
+@pytest.fixture
+def registry(tmp_path):
+    path = tmp_path / 'IGETC.pkl'
+    path.write_bytes(pickle.dumps({'Area 1A': {'ENGL': ['ENGL1A']}}))
+    return CatalogRegistry({'IGETC': str(path)})
+
+def test_view_is_read_only(registry):
+    view = registry.view('IGETC')
+    with pytest.raises(TypeError):
+        view['Area 1A'] = {}
+    with pytest.raises(TypeError):
+        del view['Area 1A']
+    assert view['Area 1A'] == {'ENGL': ['ENGL1A']}
+
+def test_copy_doesnt_change_the_shared_object(registry):
+    copied = registry.copy('IGETC')
+    copied['Area 1A']['ENGL'].append('ENGL1AH')
+    copied['Area 2'] = {}
+    assert registry.get('IGETC') == {'Area 1A': {'ENGL': ['ENGL1A']}}
+
+def test_artifact_is_loaded_once(registry):
+    assert registry.get('IGETC') is registry.get('IGETC')
+    assert registry.view('IGETC')['Area 1A'] is registry.get('IGETC')['Area 1A']
@@ -0,0 +1,109 @@
+import os
+import random
+import sys
+import types
+
+import pytest
+
+import degree_index
+from degree_index import DegreeIndex
+
+CLASS_DICT = {class_id: {'Units': units} for class_id, units in [('MATH1A', '5.00'), ('MATH1B', '5.00'), ('PHYS4A', '4.00'), ('CHEM1A', '5.00'), ('ART1', '3.00'), ('ART2', '3.00'), ('ART3', '3.00')]}
+
+def test_completed_and_almost_completed():
+    index = DegreeIndex({
+        'Math': ['MATH1A', 'MATH1B'],
+        'Science': {'required': ['MATH1A'], 'optional': [['PHYS4A', 'CHEM1A'], {'classes': ['ART1', 'ART2', 'ART3'], 'count': 2}]},
+    }, CLASS_DICT)
+    assert index.supported
+    completed, almost = index.get_complete_degrees(['MATH1A', 'MATH1B', 'ART1', '', None])
+    assert completed == ['Math']
+    assert almost == {'Science': ['PHYS4A', 'ART2']}
+
+def test_normalize_classes():
+    assert degree_index.normalize_classes([' math1a', 'MATH1A', 'MATH1B ', '', '  ', None, 3]) == ['MATH1A', 'MATH1B']
+
+# The ranker normalizes the classes it gets (& the class of add/remove) like the endpoints do
+def test_ranker_normalizes_classes():
+    index = DegreeIndex({'Math': ['MATH1A', 'MATH1B']}, CLASS_DICT)
+    ranker = degree_index.DegreeRanker(index, [' math1a', 'MATH1A'])
+    assert ranker.classes == ['MATH1A']
+    ranker.add('math1b ')
+    assert ranker.classes == ['MATH1A', 'MATH1B']
+    ranker.remove(' Math1a')
+    assert ranker.classes == ['MATH1B']
+
+# A dict entry w/ keys the index doesn't know can't be compiled: it must make the index unsupported, not compile to an empty degree
+@pytest.mark.parametrize('entry', [
+    {'Required Classes': ['MATH1A'], 'Optional Classes': [['PHYS4A']]},
+    {'required': ['MATH1A'], 'units': 6},
+    {},
+])
+def test_unrecognized_keys_are_unsupported(entry):
+    index = DegreeIndex({'Math': ['MATH1A'], 'Other': entry}, CLASS_DICT)
+    assert index.unsupported == ['Other']
+    assert not index.supported
+
+def test_unsupported_index_is_reported(capsys):
+    index = DegreeIndex({'Math': ['MATH1A'], 'Other': {'Required Classes': ['MATH1A']}}, CLASS_DICT)
+    degree_index.warn_if_unsupported(index)
+    err = capsys.readouterr().err
+    assert 'WARNING' in err and '1 of 2' in err and "'Other'" in err and 'Required Classes' in err
+    degree_index.warn_if_unsupported(DegreeIndex({'Math': ['MATH1A']}, CLASS_DICT))
+    assert capsys.readouterr().err == ''
+
+def test_find_degrees_falls_back_to_the_legacy_function(monkeypatch):
+    index = DegreeIndex({'Other': {'Required Classes': ['MATH1A']}}, CLASS_DICT)
+    legacy = types.ModuleType('degree')
+    legacy.get_complete_degrees = lambda user_classes: (['Other'], {})
+    monkeypatch.setitem(sys.modules, 'degree', legacy)
+    monkeypatch.setattr(degree_index, 'get_degree_index', lambda: index)
+    assert degree_index.find_degrees(['MATH1A']) == (['Other'], {})
+
+def test_schema_from_env(monkeypatch):
+    monkeypatch.setenv('DEGREE_ALMOST_COMPLETED_MAX', '1')
+    monkeypatch.setenv('DEGREE_REQUIRED_KEYS', 'Required Classes')
+    monkeypatch.setenv('DEGREE_OPTIONAL_KEYS', 'Optional Classes')
+    index = DegreeIndex({'Science': {'Required Classes': ['MATH1A', 'MATH1B'], 'Optional Classes': [['PHYS4A', 'CHEM1A']]}}, CLASS_DICT)
+    assert index.supported
+    assert index.get_complete_degrees(['MATH1A', 'MATH1B']) == ([], {'Science': ['PHYS4A']})
+    assert index.get_complete_degrees(['MATH1A']) == ([], {})
+
+# The index must give the same result as degree.get_complete_degrees on the real degree_dict (needs degree.py & the catalog pickles)
+def test_matches_the_legacy_function():
+    if not os.path.exists('file_dictionaries/degree_dict.pkl'):
+        pytest.skip('catalog pickles not available')
+    legacy = pytest.importorskip('degree')
+    from catalog import catalog
+    index = DegreeIndex(catalog.get('degree_dict'), catalog.get('class_dict'))
+    if not index.supported:
+        pytest.skip(f"degree_dict entries not supported by the index: {index.unsupported[:5]}")
+    rng = random.Random(0)
+    classes = list(index.classes)
+    for _ in range(200):
+        user_classes = rng.sample(classes, rng.randint(1, min(25, len(classes))))
+        expected_completed, expected_almost = legacy.get_complete_degrees(list(user_classes))
+        completed, almost = index.get_complete_degrees(user_classes)
+        assert sorted(completed) == sorted(expected_completed)
+        assert {name: sorted(leftover) for name, leftover in almost.items()} == {name: sorted(leftover) for name, leftover in expected_almost.items()}
+
+# The incremental ranking must match a full re-ranking after every add/remove, also when its state goes through the tab store
+def test_ranker_matches_a_full_ranking():
+    from degree_index import DegreeRanker
+    from tab_store import decode_value, encode_value
+    rng = random.Random(0)
+    class_ids = list(CLASS_DICT)
+    degree_dict = {f"Degree {n}": rng.sample(class_ids, rng.randint(1, 4)) for n in range(30)}
+    index = DegreeIndex(degree_dict, CLASS_DICT)
+    ranker = DegreeRanker(index, ['MATH1A'])
+    for _ in range(50):
+        class_id = rng.choice(class_ids)
+        if class_id in ranker.classes:
+            ranker.remove(class_id)
+        else:
+            ranker.add(class_id)
+        ranker = DegreeRanker.from_state(index, decode_value(encode_value(ranker.to_state())))
+        expected = DegreeRanker(index, ranker.classes)
+        full = sorted(range(len(index.names)), key=lambda degree_id: (expected.remaining_units(degree_id), degree_id))
+        for k in (0, 1, 5, len(index.names) + 1):
+            assert [entry['degree'] for entry in ranker.top(k)] == [index.names[degree_id] for degree_id in full[:k]]
@@ -0,0 +1,72 @@
+import os
+import sys
+import types
+
+import pytest
+
+class FakeAssistClient:
+    def __init__(self):
+        self.downloads = []
+
+    def get(self, path):
+        self.downloads.append(path)
+        return types.SimpleNamespace(content=f"PDF of {path}".encode())
+
+# pdfExtract w/ process_pdf only (no per-page steps). reads_files=False: process_pdf only understands URLs
+def fake_pdf_extract(reads_files=True):
+    pdf_extract = types.ModuleType('pdfExtract')
+    pdf_extract.calls = []
+    def process_pdf(pdf_url, university_id, major):
+        pdf_extract.calls.append(pdf_url)
+        if os.path.exists(pdf_url):
+            if not reads_files:
+                raise ValueError('not a URL')
+            with open(pdf_url, 'rb') as f:
+                return [f.read().decode()]
+        return [f"downloaded {pdf_url}"]
+    pdf_extract.process_pdf = process_pdf
+    return pdf_extract
+
+@pytest.fixture
+def extraction(monkeypatch, tmp_path):
+    pdf_extract = fake_pdf_extract()
+    monkeypatch.setitem(sys.modules, 'pdfExtract', pdf_extract)
+    import assist_client
+    import extraction
+    from artifact_store import ArtifactStore
+    client = FakeAssistClient()
+    monkeypatch.setattr(assist_client, 'get_assist_client', lambda: client)
+    monkeypatch.setattr(extraction, 'pdfExtract', pdf_extract)
+    monkeypatch.setattr(extraction, '_store', ArtifactStore(str(tmp_path)))
+    monkeypatch.setattr(extraction, '_parallel_fallback_warned', False)
+    monkeypatch.setattr(extraction, '_process_pdf_reads_files', None)
+    extraction.client = client
+    return extraction
+
+# process_pdf parses the stored bytes: a new extractor version re-parses w/o downloading again
+def test_pdf_extractor_reads_the_stored_artifact(extraction, monkeypatch):
+    url = 'https://assist.org/api/artifacts/26298705'
+    assert extraction.extract_class_list(url, 11, 'Math') == ['PDF of /api/artifacts/26298705']
+    assert extraction.extract_class_list(url, 11, 'Math') == ['PDF of /api/artifacts/26298705']
+    assert len(extraction.pdfExtract.calls) == 1
+    monkeypatch.setattr(extraction, 'EXTRACTOR_VERSION', 'pdf-2')
+    assert extraction.extract_class_list(url, 11, 'Math') == ['PDF of /api/artifacts/26298705']
+    assert len(extraction.pdfExtract.calls) == 2
+    assert extraction.client.downloads == ['/api/artifacts/26298705']
+
+def test_pdf_extractor_falls_back_to_the_url(extraction, monkeypatch, capsys):
+    pdf_extract = fake_pdf_extract(reads_files=False)
+    monkeypatch.setattr(extraction, 'pdfExtract', pdf_extract)
+    assert extraction.extract_class_list('https://assist.org/api/artifacts/1', 11, 'Math') == ['downloaded https://assist.org/api/artifacts/1']
+    assert extraction.extract_class_list('https://assist.org/api/artifacts/2', 11, 'Math') == ['downloaded https://assist.org/api/artifacts/2']
+    # Only the 1st extraction tries the local copy
+    assert pdf_extract.calls[1:] == ['https://assist.org/api/artifacts/1', 'https://assist.org/api/artifacts/2']
+    assert capsys.readouterr().err.count("can't read a local PDF") == 1
+
+def test_parallel_mode_warns_when_it_falls_back(extraction, monkeypatch, capsys):
+    monkeypatch.setenv('AGREEMENT_EXTRACTOR', 'pdf-parallel')
+    assert extraction.extract_class_list('https://assist.org/api/artifacts/1', 11, 'Math') == ['PDF of /api/artifacts/1']
+    assert extraction.extract_class_list('https://assist.org/api/artifacts/2', 11, 'Math') == ['PDF of /api/artifacts/2']
+    assert len(extraction.pdfExtract.calls) == 2
+    # Warned once per process
+    assert capsys.readouterr().err.count('pdf-parallel') == 1
@@ -0,0 +1,81 @@
+import json
+import os
+import random
+import sys
+import types
+
+import pytest
+
+import ge_index
+from ge_index import AreaIndex, load_rules
+
+CLASS_DICT = {class_id: {'Units': units, 'prereq_depth': 0} for class_id, units in [('ART1', '3.00'), ('ART2', '3.00'), ('MUS1', '3.00'), ('HIST1', '3.00'), ('BIOL1', '4.00'), ('BIOL1L', '1.00'), ('PHYS1', '4.00')]}
+AREAS = {
+    'Area 3': {'Arts': ['ART1', 'ART2'], 'Humanities': ['MUS1', 'HIST1']},
+    'Area 5': {'5A': ['PHYS1'], '5B': ['BIOL1'], '5C': ['BIOL1L']},
+}
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / 'ge_rules.json'
+    path.write_text(json.dumps({'IGETC': {'Area 3': {'classes': 3, 'units': 9, 'subjects': 2}, 'Area 5': {'classes': 2, 'required_subjects': ['5C']}}}))
+    return str(path)
+
+def test_discipline_rule(rules_file):
+    index = AreaIndex(AREAS, load_rules(rules_file)['IGETC'], CLASS_DICT)
+    # 3 classes & 9 units, but only 1 discipline
+    assert index.evaluate(['ART1', 'ART2']) == ([], {'Area 3': {'Arts': ['ART1', 'ART2']}})
+    assert 'Area 3' in index.cheapest_remaining(['ART1', 'ART2'])
+    completed_areas, area_classes = index.evaluate(['ART1', 'ART2', 'MUS1'])
+    assert completed_areas == ['Area 3']
+    assert area_classes['Area 3'] == {'Arts': ['ART1', 'ART2'], 'Humanities': ['MUS1']}
+
+def test_lab_rule(rules_file):
+    index = AreaIndex(AREAS, load_rules(rules_file)['IGETC'], CLASS_DICT)
+    assert index.evaluate(['PHYS1', 'BIOL1']) == ([], {'Area 5': {'5A': ['PHYS1'], '5B': ['BIOL1']}})
+    assert index.cheapest_remaining(['PHYS1', 'BIOL1']) == {'Area 3': 'ART1', 'Area 5': 'BIOL1L'}
+    assert index.evaluate(['BIOL1', 'BIOL1L'])[0] == ['Area 5']
+    assert 'Area 5' not in index.cheapest_remaining(['BIOL1', 'BIOL1L'])
+
+# W/ GE_RULES_FILE, complete_* go through the index built from the catalog & keep the degree.py shape, the cheapest classes come separately
+def test_complete_uses_the_index_with_a_rules_file(rules_file, monkeypatch):
+    catalog = types.SimpleNamespace(get={'IGETC': AREAS, 'CSU_GE': AREAS, 'class_dict': CLASS_DICT}.get)
+    monkeypatch.setenv('GE_RULES_FILE', rules_file)
+    monkeypatch.setattr(ge_index, 'catalog', catalog)
+    monkeypatch.setattr(ge_index, '_indexes', {})
+    monkeypatch.setattr(ge_index, '_rules', None)
+    assert ge_index.complete_IGETC(['ART1', 'ART2', 'MUS1', 'PHYS1']) == (['Area 3'], {'Area 3': {'Arts': ['ART1', 'ART2'], 'Humanities': ['MUS1']}, 'Area 5': {'5A': ['PHYS1']}})
+    assert ge_index.cheapest_remaining_IGETC(['ART1', 'ART2', 'MUS1', 'PHYS1']) == {'Area 5': 'BIOL1L'}
+    # The rules file has no CSU-GE rules: degree.py is used for it
+    legacy = types.ModuleType('degree')
+    legacy.complete_CSU_GE = lambda user_classes: ('legacy CSU_GE', user_classes)
+    monkeypatch.setitem(sys.modules, 'degree', legacy)
+    assert ge_index.complete_CSU_GE(['ART1']) == ('legacy CSU_GE', ['ART1'])
+    assert ge_index.cheapest_remaining_CSU_GE(['ART1']) is None
+
+# W/o a rules file the Backend Python Functions give the results (same response shape as always)
+def test_falls_back_to_the_legacy_functions(monkeypatch):
+    legacy = types.ModuleType('degree')
+    legacy.complete_IGETC = lambda user_classes: ('legacy IGETC', user_classes)
+    legacy.complete_CSU_GE = lambda user_classes: ('legacy CSU_GE', user_classes)
+    monkeypatch.setitem(sys.modules, 'degree', legacy)
+    monkeypatch.setattr(ge_index, '_indexes', {'IGETC': None, 'CSU_GE': None})
+    assert ge_index.complete_IGETC(['ART1']) == ('legacy IGETC', ['ART1'])
+    assert ge_index.complete_CSU_GE(['ART1']) == ('legacy CSU_GE', ['ART1'])
+
+# W/ a rules file, the index must give the same results (& response shape) as degree.py (needs degree.py, the catalog pickles & GE_RULES_FILE)
+@pytest.mark.parametrize('name', ge_index.CATALOG_NAMES)
+def test_matches_the_legacy_functions(name):
+    if not os.path.exists('file_dictionaries/class_dict.pkl') or not os.getenv('GE_RULES_FILE'):
+        pytest.skip('catalog pickles or GE_RULES_FILE not available')
+    legacy = pytest.importorskip('degree')
+    rules = load_rules().get(name)
+    if rules is None:
+        pytest.skip(f"no rules for {name}")
+    from catalog import catalog
+    index = AreaIndex(catalog.get(name), rules, catalog.get('class_dict'))
+    legacy_function = getattr(legacy, f"complete_{name}")
+    rng = random.Random(0)
+    for _ in range(200):
+        user_classes = rng.sample(index.classes, rng.randint(1, min(15, len(index.classes))))
+        assert index.evaluate(user_classes) == legacy_function(list(user_classes))
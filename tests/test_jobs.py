@@ -0,0 +1,53 @@
+import threading
+import time
+
+from jobs import JobQueue, MemoryJobStatus
+
+def wait_for(queue, job_id, statuses=('done', 'error'), timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = queue.status(job_id)
+        if status['status'] in statuses:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {queue.status(job_id)}")
+
+def test_job_result_and_error():
+    queue = JobQueue(workers=2)
+    job_id = queue.submit(lambda progress, x: x * 2, 21, owner='u1')
+    status = wait_for(queue, job_id)
+    assert status['status'] == 'done' and status['result'] == 42
+    assert status['owner'] == 'u1' and status['pid'] and status['host']
+
+    def fail(progress):
+        raise ValueError('bad PDF')
+    status = wait_for(queue, queue.submit(fail))
+    assert status['status'] == 'error' and status['error'] == 'bad PDF'
+
+def test_only_the_owner_reads_the_status():
+    queue = JobQueue()
+    job_id = queue.submit(lambda progress: None, owner='u1')
+    wait_for(queue, job_id)
+    assert queue.status(job_id, owner='u1')['status'] == 'done'
+    assert queue.status(job_id, owner='u2') is None
+
+# The job of a process that died stays 'running' in the store: w/o heartbeats it's reported as an error
+def test_job_of_a_dead_process_is_reported_as_an_error():
+    store = MemoryJobStatus()
+    store.set('j1', {'status': 'running', 'step': 'extracting', 'owner': 'u1', 'host': 'web-1', 'pid': 123, 'updated': time.time() - 120, 'heartbeat': time.time() - 120})
+    status = JobQueue(store).status('j1')
+    assert status['status'] == 'error'
+    assert 'web-1:123' in status['error']
+    assert store.get('j1')['status'] == 'error'
+
+def test_heartbeat_keeps_a_long_job_alive():
+    queue = JobQueue(workers=1, heartbeat_seconds=0.02, stale_seconds=0.1)
+    release = threading.Event()
+    job_id = queue.submit(lambda progress: release.wait(5) and 'ok')
+    time.sleep(0.3)
+    assert queue.status(job_id)['status'] == 'running'
+    release.set()
+    assert wait_for(queue, job_id)['result'] == 'ok'
+    # The final status isn't overwritten by a late heartbeat
+    time.sleep(0.1)
+    assert queue.status(job_id)['status'] == 'done'
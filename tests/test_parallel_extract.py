@@ -0,0 +1,36 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from parallel_extract import extract_pages_parallel, iter_page_items, merge_page_items, page_ranges, right_column_lines
+
+def test_merge_keeps_page_order():
+    pages = [(1, ['MATH5B(4.00)']), (0, ['BIOL11A(5.00)', 'MATH5A(5.00)'])]
+    assert merge_page_items(pages) == ['BIOL11A(5.00)', 'MATH5A(5.00)', 'MATH5B(4.00)']
+
+# ASSIST sometimes pushes the conjunction of the last requirement of a page to the top of the next page
+def test_merge_attaches_a_lone_conjunction_to_the_previous_page():
+    pages = [(0, ['BIOL11A(5.00)', 'CHEM1A(5.00) & CHEM1B(5.00)']), (1, ['OR', 'CHEM28A(3.00) & CHEM28B(3.00)'])]
+    assert merge_page_items(pages) == ['BIOL11A(5.00)', 'CHEM1A(5.00) & CHEM1B(5.00) OR ', 'CHEM28A(3.00) & CHEM28B(3.00)']
+
+def test_merge_only_attaches_at_the_top_of_a_page():
+    pages = [(0, ['MATH17(5.00)']), (1, ['PHYS4A(4.00)', ' AND ']), (2, [])]
+    assert merge_page_items(pages) == ['MATH17(5.00)', 'PHYS4A(4.00)', ' AND ']
+    # Nothing to attach to on the 1st page
+    assert merge_page_items([(0, ['OR', 'MATH17(5.00)'])]) == ['OR', 'MATH17(5.00)']
+
+@pytest.mark.parametrize('n_pages, workers', [(1, 4), (2, 4), (7, 3), (20, 4), (5, 1)])
+def test_page_ranges_cover_every_page_once(n_pages, workers):
+    ranges = page_ranges(n_pages, workers)
+    assert ranges[0][0] == 0 and ranges[-1][1] == n_pages
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    assert len(ranges) <= workers
+
+# The parallel scan must give the same items as a sequential scan of the same PDF
+def test_parallel_scan_matches_sequential_scan():
+    pytest.importorskip('pdfplumber')
+    pdf_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'SEP-EX.pdf')
+    sequential = merge_page_items(iter_page_items(pdf_path, right_column_lines))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert extract_pages_parallel(pdf_path, right_column_lines, workers=2, executor=executor) == sequential
@@ -0,0 +1,49 @@
+import sys
+import types
+
+import pytest
+
+import precompute_schedules
+
+PAIRS = [(11, 'UC Berkeley', 'Math'), (11, 'UC Berkeley', 'Physics'), (117, 'UCLA', 'Math'), (117, 'UCLA', 'Physics')]
+# Rows of the precomputed_schedules table: (university, major, catalog version, status)
+ROWS = [('UC Berkeley', 'Math', 'catalog-2', 'ok'), ('UC Berkeley', 'Physics', 'catalog-2', 'error'), ('UCLA', 'Math', 'catalog-1', 'ok'), ('UCLA', 'Physics', 'catalog-2', 'no-pdf')]
+
+# models.precomputed_pairs over ROWS
+@pytest.fixture
+def stored_rows(monkeypatch):
+    models = types.ModuleType('models')
+    def precomputed_pairs(catalog_version, include_failed=True):
+        return {(university, major) for university, major, version, status in ROWS if version == catalog_version and (include_failed or status == 'ok')}
+    models.precomputed_pairs = precomputed_pairs
+    monkeypatch.setitem(sys.modules, 'models', models)
+    monkeypatch.setattr(precompute_schedules, 'all_pairs', lambda university_ids=None: [pair for pair in PAIRS if not university_ids or pair[0] in university_ids])
+
+# A rerun only computes the pairs that are missing for the current catalog version (failed pairs only w/ retry_failed)
+def test_resume_skips_stored_pairs(stored_rows):
+    done, todo = precompute_schedules.pending_pairs('catalog-2')
+    assert todo == [(117, 'UCLA', 'Math')]
+    assert len(done) == 3
+
+def test_resume_retries_failed_pairs(stored_rows):
+    done, todo = precompute_schedules.pending_pairs('catalog-2', retry_failed=True)
+    assert todo == [(11, 'UC Berkeley', 'Physics'), (117, 'UCLA', 'Math'), (117, 'UCLA', 'Physics')]
+    assert done == {('UC Berkeley', 'Math')}
+
+def test_resume_w_a_new_catalog_version(stored_rows):
+    assert precompute_schedules.pending_pairs('catalog-3')[1] == PAIRS
+    assert precompute_schedules.pending_pairs('catalog-3', university_ids=[117], limit=1)[1] == [(117, 'UCLA', 'Math')]
+
+# The real query, on an in-memory SQLite database
+def test_precomputed_pairs():
+    pytest.importorskip('flask_sqlalchemy')
+    from flask import Flask
+    from models import add_precomputed_schedule, init_db, precomputed_pairs
+
+    app = Flask(__name__)
+    init_db(app, 'sqlite://')
+    with app.app_context():
+        for university, major, version, status in ROWS:
+            add_precomputed_schedule(major, university, 11, version, status)
+        assert precomputed_pairs('catalog-2') == {('UC Berkeley', 'Math'), ('UC Berkeley', 'Physics'), ('UCLA', 'Physics')}
+        assert precomputed_pairs('catalog-2', include_failed=False) == {('UC Berkeley', 'Math')}
@@ -0,0 +1,66 @@
+import math
+import random
+
+from prereq_graph import PrereqGraph
+
+# The original find_all_prerequisites of Schedule.py, w/ class_dict as a parameter
+def original_find_all_prerequisites(classList, class_dict):
+    result = classList.copy()
+    idx = 0
+    while idx < len(result):
+        classID = result[idx]
+        if classID in class_dict:
+            prereqs = class_dict[classID]['PREREQUISITES']
+            if isinstance(prereqs, str) and prereqs not in result:
+                result.append(prereqs)
+            elif isinstance(prereqs, tuple):
+                for item in prereqs:
+                    if isinstance(item, list):
+                        for sub_item in item:
+                            if isinstance(sub_item, str) and sub_item not in result:
+                                result.append(sub_item)
+                    elif isinstance(item, str) and item not in result:
+                        result.append(item)
+            elif isinstance(prereqs, list):
+                for item in prereqs:
+                    if isinstance(item, tuple):
+                        for sub_item in item:
+                            if isinstance(sub_item, str) and sub_item not in result:
+                                result.append(sub_item)
+                    elif isinstance(item, str) and item not in result:
+                        result.append(item)
+        idx += 1
+    return result
+
+def class_dict_of(prereqs):
+    return {classID: {'PREREQUISITES': value, 'Units': '3.00', 'prereq_depth': 0} for classID, value in prereqs.items()}
+
+# The new prerequisites come in breadth-first order (not catalog order), like find_all_prerequisites always added them
+def test_all_prerequisites_keeps_the_breadth_first_order():
+    class_dict = class_dict_of({
+        'CHEM1A': math.nan,
+        'MATH1A': math.nan,
+        'MATH1B': 'MATH1A',
+        'PHYS4A': ('MATH1B', ['CHEM1A', 'NONCCC1']),
+        'PHYS4B': 'PHYS4A',
+    })
+    graph = PrereqGraph(class_dict)
+    assert graph.all_prerequisites(['PHYS4B']) == ['PHYS4B', 'PHYS4A', 'MATH1B', 'CHEM1A', 'NONCCC1', 'MATH1A']
+    assert graph.all_prerequisites(['PHYS4B', 'MATH1A', 'XYZ']) == ['PHYS4B', 'MATH1A', 'XYZ', 'PHYS4A', 'MATH1B', 'CHEM1A', 'NONCCC1']
+
+def test_all_prerequisites_matches_the_original_function():
+    rand = random.Random(3)
+    for _ in range(200):
+        names = [f"C{n}" for n in range(rand.randint(2, 40))]
+        prereqs = {}
+        for n, name in enumerate(names):
+            # Prerequisites can point anywhere (cycles included) & to names that aren't CCC courses
+            pool = names + ['NONCCC1', 'NONCCC2']
+            pick = lambda: rand.choice(pool)
+            shape = rand.randrange(6)
+            prereqs[name] = [math.nan, pick(), [pick(), (pick(), pick())], (pick(), pick()), ([pick(), pick()], [pick()]), (pick(), [pick(), pick()])][shape]
+        class_dict = class_dict_of(prereqs)
+        graph = PrereqGraph(class_dict)
+        class_list = rand.sample(names + ['XYZ'], rand.randint(1, 3))
+        class_list += rand.sample(class_list, rand.randint(0, len(class_list)))
+        assert graph.all_prerequisites(class_list) == original_find_all_prerequisites(class_list, class_dict)
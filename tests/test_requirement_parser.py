@@ -0,0 +1,159 @@
+import random
+import re
+
+import pytest
+
+from requirement_parser import parse_requirement, parse_requirements, resolve_requirements
+
+CLASS_DICT = dict.fromkeys(['BIOL11A', 'CHEM1A', 'CHEM1B', 'CHEM28A', 'CHEM28B', 'ENGL1A', 'ENGL1AH', 'ENGL1B', 'ENGL1BH', 'MATH1A', 'MATH1AH', 'MATH2', 'MATH3', 'MATH5A', 'MATH5B', 'MATH17', 'PHYS4A', 'PHYS4B'], {})
+
+def resolve(class_list):
+    return resolve_requirements(parse_requirements(class_list), CLASS_DICT)
+
+def test_parse_requirement_tree():
+    assert parse_requirement('MATH1A/MATH1AHANDMATH2ORMATH3') == ((('MATH1A', 'MATH1AH'), ('MATH2',)), (('MATH3',),))
+    assert parse_requirement('CHEM1A(5.00) & CHEM1B(5.00) OR ') == ((('CHEM1A&CHEM1B',),),)
+
+# Expected values are the outputs of the removed v1 - v4 pipeline (process_complex_class_item & format_classes), 1 table per rule of resolve_requirements
+# 1.) A single class (or classes joined w/ '&') -> every class
+@pytest.mark.parametrize('class_list, expected', [
+    (['BIOL11A(5.00)'], ['BIOL11A']),
+    (['CHEM1A(5.00) & CHEM1B(5.00)'], ['CHEM1A', 'CHEM1B']),
+    (['BIOL11A(5.00)', 'BIOL11A(5.00)', 'MATH5A(5.00) AND '], ['BIOL11A', 'MATH5A']),
+    (['XYZ1(3.00)', 'PHYS4A(4.00) &'], ['PHYS4A']),
+    (['(MATH5A'], []),
+])
+def test_rule_1_single_class(class_list, expected):
+    assert resolve(class_list) == expected
+    assert old_pipeline(class_list, CLASS_DICT) == expected
+
+# 2.) Several "AND" groups where some groups have alternatives -> the 1st class of every group w/ alternatives
+@pytest.mark.parametrize('class_list, expected', [
+    (['MATH1A(5.00) / MATH1AH(5.00) AND MATH2(4.00)'], ['MATH1A']),
+    (['ENGL1A(3.00)/ENGL1AH(3.00) AND ENGL1B(3.00)/ENGL1BH(3.00)'], ['ENGL1A', 'ENGL1B']),
+    (['MATH2(4.00) AND MATH1A(5.00)/MATH1AH(5.00)'], ['MATH1A']),
+])
+def test_rule_2_and_groups_with_alternatives(class_list, expected):
+    assert resolve(class_list) == expected
+    assert old_pipeline(class_list, CLASS_DICT) == expected
+
+# 3.) "OR" options or alternatives w/o '&' -> the 1st class of the 1st option
+@pytest.mark.parametrize('class_list, expected', [
+    (['ENGL1B(3.00) / ENGL1BH(3.00)'], ['ENGL1B']),
+    (['MATH17(5.00) OR MATH5A(5.00)'], ['MATH17']),
+    (['PHYS4A(4.00) OR ', 'XYZ1 OR MATH3'], ['PHYS4A']),
+])
+def test_rule_3_first_option(class_list, expected):
+    assert resolve(class_list) == expected
+    assert old_pipeline(class_list, CLASS_DICT) == expected
+
+# 4.) "OR" options or alternatives w/ '&' -> the classes of the 1st '&' group that is not completely taken yet
+@pytest.mark.parametrize('class_list, expected', [
+    (['CHEM1A(5.00) & CHEM1B(5.00) OR CHEM28A(3.00) & CHEM28B(3.00)'], ['CHEM1A']),
+    (['CHEM1A(5.00) & CHEM1B(5.00) OR CHEM28A(3.00) & CHEM28B(3.00)', 'CHEM1A(5.00) OR CHEM28A(3.00) & CHEM28B(3.00)'], ['CHEM1A', 'CHEM28A']),
+    (['MATH1A/MATH1AHANDMATH2ORMATH3'], ['MATH1A', 'MATH1AH']),
+    (['MATH5A & MATH5B OR MATH17', 'MATH5A OR MATH17 & PHYS4A'], ['MATH5A', 'MATH17']),
+])
+def test_rule_4_first_group_not_taken(class_list, expected):
+    assert resolve(class_list) == expected
+    assert old_pipeline(class_list, CLASS_DICT) == expected
+
+# Random requirement strings (w/ duplicates, unknown classes, unmatched parentheses & trailing conjunctions) give the same classes as the removed pipeline
+def test_matches_the_removed_pipeline():
+    rand = random.Random(8)
+    classes = list(CLASS_DICT) + ['XYZ1', '(MATH5A', 'CHEM1A)']
+    def requirement():
+        text = rand.choice(classes) + rand.choice(['', '(5.00)', '(3.00)'])
+        for _ in range(rand.randint(0, 3)):
+            text += rand.choice([' / ', ' & ', ' AND ', ' OR ', '/', 'AND', 'OR']) + rand.choice(classes) + rand.choice(['', '(4.00)'])
+        return text + rand.choice(['', '', ' OR ', ' AND ', '/&'])
+    for _ in range(5000):
+        class_list = [requirement() for _ in range(rand.randint(1, 6))]
+        class_list += rand.sample(class_list, rand.randint(0, len(class_list)))
+        assert resolve(class_list) == old_pipeline(class_list, CLASS_DICT), class_list
+
+# The v1 - v4 steps of clean_and_format_class_list before requirement_parser.py (v5 adds the prerequisites & is unchanged), w/ class_dict as a parameter
+def old_pipeline(class_list, class_dict):
+    v1 = []
+    for class_item in class_list:
+        class_item = re.sub(r'\(.*?\)', '', class_item)
+        class_item = class_item.replace(" ", "")
+        class_item = re.sub(r'(AND|OR|/&)$', '', class_item)
+        substrings = class_item.split("OR")
+        for i, substring in enumerate(substrings):
+            groups = substring.split("AND")
+            for j, group in enumerate(groups):
+                classes = group.split("/")
+                if len(classes) > 1:
+                    groups[j] = "[" + "/".join(classes) + "]"
+            if len(groups) > 1:
+                substrings[i] = "(" + "&".join(groups) + ")"
+            else:
+                substrings[i] = groups[0]
+        if len(substrings) > 1:
+            class_item = "[" + "/".join(substrings) + "]"
+        else:
+            class_item = substrings[0]
+        v1.append(class_item)
+    v2 = []
+    seen = set()
+    seen_items = set()
+    for item in v1:
+        if item not in seen_items:
+            seen_items.add(item)
+            if '/' in item:
+                v2.append(item)
+            elif '&' in item:
+                item = item.replace('(', '').replace(')', '')
+                for subitem in item.split('&'):
+                    if subitem not in seen:
+                        v2.append(subitem)
+                        seen.add(subitem)
+            else:
+                if item not in seen:
+                    v2.append(item)
+                    seen.add(item)
+    v3 = [old_process_complex_class_item(item) for item in v2]
+    return old_format_classes(v3, class_dict)
+
+def old_process_complex_class_item(class_item):
+    if class_item.startswith('('):
+        class_item = re.findall(r'\[.*?\]', class_item)
+        class_item = [re.sub(r'[&()]', '', item) for item in class_item]
+    return class_item
+
+def old_format_classes(classList, class_dict):
+    v4 = []
+    seen = set()
+    for item in classList:
+        if isinstance(item, list):
+            for sublist in item:
+                sublist = sublist.split('/')[0]
+                sublist = re.sub(r'[\[\]]', '', sublist)
+                if sublist in class_dict.keys() and sublist not in seen:
+                    v4.append(sublist)
+                    seen.add(sublist)
+        elif item.startswith('[') and '&' not in item:
+            item = item.split('/')[0]
+            item = re.sub(r'[\[\]]', '', item)
+            if item in class_dict.keys() and item not in seen:
+                v4.append(item)
+                seen.add(item)
+        elif item.startswith('[') and '&' in item:
+            item = re.sub(r'[\[\]()]', '', item)
+            groups = item.split('&')
+            for group in groups:
+                classes = group.split('/')
+                if all(class_ in seen for class_ in classes):
+                    continue
+                else:
+                    for class_ in classes:
+                        if class_ in class_dict.keys() and class_ not in seen:
+                            v4.append(class_)
+                            seen.add(class_)
+                    break
+        else:
+            if item in class_dict.keys() and item not in seen:
+                v4.append(item)
+                seen.add(item)
+    return v4
@@ -0,0 +1,114 @@
+from schedule_cache import REDIS_PREFIX, ScheduleCache
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+class BrokenRedis:
+    def get(self, key):
+        raise ConnectionError('Redis is down')
+
+    def set(self, key, value, ex=None):
+        raise ConnectionError('Redis is down')
+
+def memoized(cache, unordered=()):
+    calls = []
+    @cache.memoize('schedule', unordered=unordered)
+    def schedule(classList, semesters=6, max_units=15.0):
+        calls.append((list(classList), semesters, max_units))
+        return {'classes': list(classList), 'semesters': semesters}
+    return schedule, calls
+
+# Positional, keyword & default arguments of the same call share 1 key
+def test_key_binds_the_arguments():
+    cache = ScheduleCache()
+    schedule, calls = memoized(cache)
+    schedule(['MATH1A', 'MATH1B'])
+    schedule(['MATH1A', 'MATH1B'], 6)
+    schedule(['MATH1A', 'MATH1B'], semesters=6, max_units=15.0)
+    schedule(classList=['MATH1A', 'MATH1B'])
+    assert len(calls) == 1
+    schedule(['MATH1A', 'MATH1B'], 5)
+    assert len(calls) == 2
+
+def test_key_order_of_unordered_parameters():
+    cache = ScheduleCache()
+    ordered, ordered_calls = memoized(cache)
+    ordered(['MATH1A', 'MATH1B'])
+    ordered(['MATH1B', 'MATH1A'])
+    assert len(ordered_calls) == 2
+
+    cache = ScheduleCache()
+    schedule, calls = memoized(cache, unordered=('classList',))
+    schedule(['MATH1A', 'MATH1B'])
+    schedule(['MATH1B', 'MATH1A'])
+    assert len(calls) == 1
+
+def test_key_includes_the_catalog_version():
+    cache = ScheduleCache()
+    schedule, calls = memoized(cache)
+    schedule(['MATH1A'])
+    cache.set_catalog_version('catalog-2')
+    schedule(['MATH1A'])
+    assert len(calls) == 2
+
+# Callers get their own copy of a cached value
+def test_cached_values_are_copies():
+    cache = ScheduleCache()
+    schedule, calls = memoized(cache)
+    schedule(['MATH1A'])['classes'].append('MATH1B')
+    assert schedule(['MATH1A']) == {'classes': ['MATH1A'], 'semesters': 6}
+
+def test_lru_eviction():
+    cache = ScheduleCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == (True, 1) # 'b' is now the least recently used
+    cache.set('c', 3)
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('c') == (True, 3)
+
+# A miss of the in-process tier is looked up in Redis (w/ the TTL set by the app), & a Redis hit fills the in-process tier
+def test_redis_fallthrough():
+    redis = FakeRedis()
+    cache = ScheduleCache()
+    cache.configure(redis_client=redis, ttl_seconds=60)
+    cache.set('a', [1, 2])
+    assert redis.ttls == {REDIS_PREFIX + 'a': 60}
+
+    other_worker = ScheduleCache()
+    other_worker.configure(redis_client=redis)
+    assert other_worker.get('a') == (True, [1, 2])
+    assert other_worker.get('a') == (True, [1, 2])
+    assert other_worker.get_stats()['redis_hits'] == 1
+    assert other_worker.get_stats()['local_hits'] == 1
+
+# Redis errors are only a miss, the in-process tier keeps working
+def test_redis_errors_are_misses(capsys):
+    cache = ScheduleCache()
+    cache.configure(redis_client=BrokenRedis())
+    cache.set('a', 1)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('b') == (False, None)
+    assert 'Redis is down' in capsys.readouterr().out
+
+def test_stats():
+    cache = ScheduleCache()
+    assert cache.get_stats() == {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'local_entries': 0, 'hit_rate': 0.0}
+    schedule, _ = memoized(cache)
+    schedule(['MATH1A'])
+    schedule(['MATH1A'])
+    schedule(['MATH1A'])
+    schedule(['MATH1B'])
+    assert cache.get_stats() == {'local_hits': 2, 'redis_hits': 0, 'misses': 2, 'local_entries': 2, 'hit_rate': 0.5}
+    cache.clear()
+    assert cache.get_stats()['local_entries'] == 0
@@ -0,0 +1,181 @@
+import math
+import random
+
+import pytest
+
+from prereq_graph import PrereqGraph
+from schedule_engine import MAX_CLASSES_PER_SEMESTER, schedule_classes
+
+SUBJECTS = ['MATH', 'CHEM', 'PHYS', 'ENGL']
+
+# The stack algorithm unverifiedScheduleGenerator ran before schedule_engine.py, w/ the semester count & unit caps as parameters
+# The only addition is the row cut-off: the original took the next textbox of the semester w/o checking there was one left
+def original_schedule(depths, class_dict, semesters=6, max_units=15.0, last_semester_units=18.0):
+    prereq_dict = {}
+    for class_name in depths:
+        prereq_dict.setdefault(depths[class_name], []).append(class_name)
+    schedule = [[] for _ in range(semesters)]
+    stack = []
+    i = 0
+    subject_order = set()
+    leftover_classes = []
+    completed_classes = []
+    for depth in range(semesters + 1):
+        i += 1
+        if i > semesters:
+            leftover_classes.extend(stack)
+            break
+        cap = last_semester_units if i == semesters else max_units
+        semesterUnits = 0.0
+        stack.extend(prereq_dict.get(depth, []))
+        invalid_classes = []
+        stack.sort(key=lambda x: (depths[x], -1 * (class_dict[x]['Subject'] in subject_order)), reverse=True)
+        subject_order = set()
+        subject_depth_scheduled = {}
+        while stack:
+            classID = stack.pop()
+            units = float(class_dict[classID]['Units'])
+            subject = class_dict[classID]['Subject']
+            depth_of_class = depths[classID]
+            already_scheduled = subject_depth_scheduled.get(subject, None) == depth_of_class
+            prereq_completion = original_check_prereq_completion(class_dict[classID]['PREREQUISITES'], completed_classes)
+            if (len(schedule[i - 1]) < MAX_CLASSES_PER_SEMESTER and semesterUnits + units <= cap and ((subject not in subject_depth_scheduled) or already_scheduled)
+                    and (i > depth_of_class or semesterUnits == 0) and prereq_completion and classID not in completed_classes):
+                schedule[i - 1].append(classID)
+                semesterUnits += units
+                subject_order.add(subject)
+                subject_depth_scheduled[subject] = depth_of_class
+                completed_classes.append(classID)
+            else:
+                invalid_classes.append(classID)
+                if stack:
+                    continue
+                stack.extend(invalid_classes)
+                break
+    return schedule, leftover_classes
+
+# The original check_prereq_completion, on the raw PREREQUISITES value
+def original_check_prereq_completion(prereqs, class_list):
+    if isinstance(prereqs, float):
+        return True
+    if isinstance(prereqs, str):
+        return prereqs in class_list
+    if isinstance(prereqs, list) and all(isinstance(item, str) for item in prereqs):
+        return any(item in class_list for item in prereqs)
+    if isinstance(prereqs, list) and all(isinstance(item, (str, tuple)) for item in prereqs):
+        for item in prereqs:
+            if isinstance(item, str) and item in class_list:
+                return True
+            elif isinstance(item, tuple) and all(sub_item in class_list for sub_item in item):
+                return True
+        return False
+    if isinstance(prereqs, tuple) and all(isinstance(item, str) for item in prereqs):
+        return all(item in class_list for item in prereqs)
+    if isinstance(prereqs, tuple) and all(isinstance(item, list) for item in prereqs):
+        for item in prereqs:
+            if not any(sub_item in class_list for sub_item in item):
+                return False
+        return True
+    if isinstance(prereqs, tuple) and all(isinstance(item, (str, list)) for item in prereqs):
+        for item in prereqs:
+            if isinstance(item, str) and item not in class_list:
+                return False
+            elif isinstance(item, list) and not any(sub_item in class_list for sub_item in item):
+                return False
+        return True
+    return False
+
+# Catalog w/ the prerequisite shapes of the real one (NaN, str, OR list, AND tuple & the nested combinations). Prerequisites come from the previous classes, depth = 1 + deepest prerequisite
+def random_catalog(rand, n_classes):
+    class_dict = {}
+    names = []
+    for n in range(n_classes):
+        name = f"{SUBJECTS[n % len(SUBJECTS)]}{n}"
+        pool = names[-12:]
+        pick = lambda: rand.choice(pool)
+        shape = rand.randrange(7) if pool else 0
+        if shape == 0:
+            prereqs, mentioned = math.nan, []
+        elif shape == 1:
+            prereqs = pick()
+            mentioned = [prereqs]
+        elif shape == 2:
+            prereqs = mentioned = [pick(), pick()]
+        elif shape == 3:
+            a, b, c = pick(), pick(), pick()
+            prereqs, mentioned = [a, (b, c)], [a, b, c]
+        elif shape == 4:
+            prereqs = (pick(), pick())
+            mentioned = list(prereqs)
+        elif shape == 5:
+            a, b, c = pick(), pick(), pick()
+            prereqs, mentioned = ([a, b], [c]), [a, b, c]
+        else:
+            a, b, c = pick(), pick(), pick()
+            prereqs, mentioned = (a, [b, c]), [a, b, c]
+        depth = 1 + max((class_dict[x]['prereq_depth'] for x in mentioned), default=-1)
+        class_dict[name] = {'Subject': SUBJECTS[n % len(SUBJECTS)], 'Units': rand.choice(['1.00', '2.00', '3.00', '4.00', '5.00']), 'PREREQUISITES': prereqs, 'prereq_depth': depth}
+        names.append(name)
+    return class_dict
+
+def random_depths(rand, class_dict):
+    class_list = rand.sample(list(class_dict), rand.randint(1, len(class_dict)))
+    return {classID: class_dict[classID]['prereq_depth'] for classID in class_list}
+
+# compat=True must give exactly the schedule & leftovers of the original algorithm, w/ both prerequisite modes
+@pytest.mark.parametrize('use_bitsets', [True, False])
+def test_compat_matches_the_original_algorithm(use_bitsets):
+    rand = random.Random(4)
+    full_semesters = 0
+    for _ in range(300):
+        class_dict = random_catalog(rand, rand.randint(5, 60))
+        graph = PrereqGraph(class_dict)
+        depths = random_depths(rand, class_dict)
+        semesters = rand.randint(1, 6)
+        max_units = rand.choice([15.0, 30.0])
+        expected = original_schedule(depths, class_dict, semesters, max_units, max_units + 3)
+        assert schedule_classes(depths, class_dict, graph, semesters=semesters, max_units=max_units, last_semester_units=max_units + 3, use_bitsets=use_bitsets) == expected
+        full_semesters += sum(len(semester) == MAX_CLASSES_PER_SEMESTER for semester in expected[0])
+    # The row cut-off was reached
+    assert full_semesters > 0
+
+# Golden case of the row cut-off: 10 1-unit classes of 1 subject at depth 0 only fill the 7 rows of semester 1
+def test_compat_row_cut_off():
+    class_dict = {f"ENGL{n}": {'Subject': 'ENGL', 'Units': '1.00', 'PREREQUISITES': math.nan, 'prereq_depth': 0} for n in range(10)}
+    depths = {classID: 0 for classID in class_dict}
+    schedule, leftovers = schedule_classes(depths, class_dict, PrereqGraph(class_dict))
+    # The stack pops the last classes first & the failed classes carry over in the order they failed
+    assert schedule[0] == ['ENGL9', 'ENGL8', 'ENGL7', 'ENGL6', 'ENGL5', 'ENGL4', 'ENGL3']
+    assert schedule[1] == ['ENGL0', 'ENGL1', 'ENGL2']
+    assert leftovers == []
+
+def test_ready_queue_waits_for_prerequisites_of_earlier_semesters():
+    class_dict = {
+        'MATH1A': {'Subject': 'MATH', 'Units': '5.00', 'PREREQUISITES': math.nan, 'prereq_depth': 0},
+        'MATH1B': {'Subject': 'MATH', 'Units': '5.00', 'PREREQUISITES': 'MATH1A', 'prereq_depth': 1},
+        'PHYS4A': {'Subject': 'PHYS', 'Units': '4.00', 'PREREQUISITES': ('MATH1A', 'MATH1B'), 'prereq_depth': 2},
+        'CHEM1B': {'Subject': 'CHEM', 'Units': '5.00', 'PREREQUISITES': 'CHEM1A', 'prereq_depth': 1},
+    }
+    depths = {classID: info['prereq_depth'] for classID, info in class_dict.items() if classID != 'CHEM1A'}
+    schedule, leftovers = schedule_classes(depths, class_dict, PrereqGraph(class_dict), compat=False)
+    assert schedule[:3] == [['MATH1A'], ['MATH1B'], ['PHYS4A']]
+    # CHEM1A isn't in the class list, so CHEM1B can never be taken
+    assert leftovers == ['CHEM1B']
+
+# compat=False never drops a class, only schedules a class after its prerequisites & respects the caps
+def test_ready_queue_invariants():
+    rand = random.Random(5)
+    for _ in range(200):
+        class_dict = random_catalog(rand, rand.randint(5, 60))
+        graph = PrereqGraph(class_dict)
+        depths = random_depths(rand, class_dict)
+        schedule, leftovers = schedule_classes(depths, class_dict, graph, compat=False)
+        placed = [classID for semester in schedule for classID in semester]
+        assert sorted(placed + leftovers) == sorted(depths)
+        semester_of = {classID: s for s, semester in enumerate(schedule) for classID in semester}
+        for s, semester in enumerate(schedule):
+            assert len(semester) <= MAX_CLASSES_PER_SEMESTER
+            assert sum(float(class_dict[classID]['Units']) for classID in semester) <= (18.0 if s == len(schedule) - 1 else 15.0)
+            completed = {classID for classID, earlier in semester_of.items() if earlier < s}
+            for classID in semester:
+                assert original_check_prereq_completion(class_dict[classID]['PREREQUISITES'], completed)
@@ -0,0 +1,59 @@
+import math
+
+from prereq_graph import PrereqGraph
+from schedule_engine import schedule_classes
+from schedule_solver import optimize_schedule
+
+def make_class_dict(classes, prerequisites={}):
+    return {classID: {'Units': units, 'Subject': subject, 'prereq_depth': 0, 'PREREQUISITES': prerequisites.get(classID, math.nan)} for classID, subject, units in classes}
+
+# The compat engine drops Q0: it fails in semester 1, then P0 & R0 fit, so the failed class is never carried over
+def test_seed_leftovers_include_classes_dropped_by_the_greedy_engine():
+    class_dict = make_class_dict([('R0', 'R', '3.00'), ('Q0', 'Q', '10.00'), ('P0', 'P', '10.00')])
+    graph = PrereqGraph(class_dict)
+    depths = {'R0': 0, 'Q0': 0, 'P0': 0}
+
+    seed = schedule_classes(depths, class_dict, graph, compat=True)
+    assert seed[0][0] == ['P0', 'R0']
+    assert seed[1] == []
+
+    schedule, leftovers = optimize_schedule(depths, class_dict, graph, seed)
+    scheduled = [classID for semester in schedule for classID in semester]
+    assert sorted(scheduled) == ['P0', 'Q0', 'R0']
+    assert leftovers == []
+
+def test_seed_is_returned_w_its_real_leftovers_when_nothing_fits():
+    class_dict = make_class_dict([('R0', 'R', '3.00'), ('Q0', 'Q', '10.00'), ('P0', 'P', '10.00')])
+    graph = PrereqGraph(class_dict)
+    depths = {'R0': 0, 'Q0': 0, 'P0': 0}
+
+    seed = schedule_classes(depths, class_dict, graph, semesters=1, last_semester_units=13.0, compat=True)
+    schedule, leftovers = optimize_schedule(depths, class_dict, graph, seed, semesters=1, last_semester_units=13.0)
+    scheduled = {classID for semester in schedule for classID in semester}
+    assert sorted(leftovers) == sorted(set(depths) - scheduled)
+    assert len(leftovers) == 1
+
+# The greedy counts a prerequisite placed earlier in the same semester as completed (A0 carries over into semester 2 & Z1 follows it there), the solver only places a class after the semester of its prerequisites
+def test_solver_places_prerequisites_in_earlier_semesters_only():
+    class_dict = make_class_dict([('A0', 'A', '5.00'), ('C0', 'C', '10.00'), ('B0', 'B', '10.00'), ('D0', 'D', '3.00'), ('Z1', 'Z', '3.00')], {'Z1': 'A0'})
+    graph = PrereqGraph(class_dict)
+    depths = {'A0': 0, 'C0': 0, 'B0': 0, 'D0': 0, 'Z1': 1}
+
+    seed = schedule_classes(depths, class_dict, graph, semesters=2, compat=True)
+    assert seed == ([['D0', 'B0'], ['A0', 'C0', 'Z1']], [])
+
+    schedule, leftovers = optimize_schedule(depths, class_dict, graph, seed, semesters=2)
+    assert schedule == [['C0', 'A0'], ['B0', 'D0', 'Z1']]
+    assert leftovers == []
+
+# The budget is a number of search nodes, so the result doesn't depend on how fast the machine is (& can be cached)
+def test_node_budget_is_deterministic():
+    class_dict = make_class_dict([('R0', 'R', '3.00'), ('Q0', 'Q', '10.00'), ('P0', 'P', '10.00')])
+    graph = PrereqGraph(class_dict)
+    depths = {'R0': 0, 'Q0': 0, 'P0': 0}
+    seed = schedule_classes(depths, class_dict, graph, compat=True)
+
+    # No node left to search: the seed is returned
+    assert optimize_schedule(depths, class_dict, graph, seed, max_nodes=0) == (seed[0], ['Q0'])
+    results = {repr(optimize_schedule(depths, class_dict, graph, seed, max_nodes=max_nodes)) for max_nodes in [5] * 10}
+    assert len(results) == 1
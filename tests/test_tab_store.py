@@ -0,0 +1,89 @@
+from collections import defaultdict
+
+import pytest
+
+import tab_store
+from tab_store import decode_value, encode_value
+
+def _tab_data():
+    subject = defaultdict(list)
+    subject['MATH'].append(('MATH1A', 'MATH1B'))
+    return {
+        'university': 'University of California, Irvine',
+        'subject': subject,
+        'empty_subject': defaultdict(),
+        'pdf_data': {'Name': 'Anteater', 'Years': (2024, 2025)},
+        'depths': {1: ['CS1'], 2: ['CS2']},
+        'tags': {'GE'},
+        'tricky': {'__type__': 'not a tag'},
+        'class_list': ['CS1'] * 200, # Large enough to be compressed
+    }
+
+@pytest.fixture(params=['msgpack', 'json'])
+def serializer(request, monkeypatch):
+    if request.param == 'msgpack':
+        if tab_store.msgpack is None:
+            pytest.skip('msgpack is not installed')
+    else:
+        monkeypatch.setattr(tab_store, 'msgpack', None)
+    return request.param
+
+def test_round_trip_keeps_the_types(serializer):
+    data = _tab_data()
+    decoded = decode_value(encode_value(data))
+    assert decoded == data
+    assert type(decoded['subject']) is defaultdict and decoded['subject'].default_factory is list
+    assert decoded['empty_subject'].default_factory is None
+    assert decoded['subject']['MATH'] == [('MATH1A', 'MATH1B')]
+    assert decoded['pdf_data']['Years'] == (2024, 2025)
+    assert decoded['tags'] == {'GE'}
+    assert 1 in decoded['depths']
+
+def test_large_values_are_compressed(serializer):
+    blob = encode_value(_tab_data())
+    assert blob[1:2] in (b'z', b'l')
+
+@pytest.mark.parametrize('blob', [b'jn{"subject":{}}', b'mn\x80', b'Jx{}', b''])
+def test_unknown_headers_are_refused(blob):
+    with pytest.raises(ValueError):
+        decode_value(blob)
+
+def test_unknown_default_factory_is_refused():
+    with pytest.raises(TypeError):
+        encode_value(defaultdict(lambda: 0))
+
+# Tab created before sessions only stored the catalog version
+def _old_tab():
+    return {'university_name': 'UCLA', 'major': 'Math', 'classList': ['MATH1A'], 'class_dict': {'MATH1A': {'Units': '5.00'}}, 'ged': {'B4': {}}, 'igetc': {'2': {}}}
+
+def test_strip_catalog_copies():
+    tab_data = _old_tab()
+    assert tab_store.strip_catalog_copies(tab_data, 'catalog-2')
+    assert tab_data == {'university_name': 'UCLA', 'major': 'Math', 'classList': ['MATH1A'], 'catalog_version': 'catalog-2'}
+    # Migrated once
+    assert not tab_store.strip_catalog_copies(tab_data, 'catalog-3')
+    assert tab_data['catalog_version'] == 'catalog-2'
+
+# A tab that already has a catalog version keeps it
+def test_strip_catalog_copies_keeps_the_catalog_version():
+    tab_data = dict(_old_tab(), catalog_version='catalog-1')
+    assert tab_store.strip_catalog_copies(tab_data, 'catalog-2')
+    assert tab_data['catalog_version'] == 'catalog-1'
+
+# The session tab store migrates an old tab the 1st time it's read & saves it back to the session
+def test_session_tab_store_migrates_old_tabs():
+    from flask import Flask, session
+
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    store = tab_store.SessionTabStore(catalog_version='catalog-2')
+    with app.test_request_context():
+        session['tab'] = _old_tab()
+        session.modified = False
+        assert store.get('tab', fields=['major', 'class_dict']) == {'major': 'Math'}
+        assert session.modified
+        assert session['tab'] == {'university_name': 'UCLA', 'major': 'Math', 'classList': ['MATH1A'], 'catalog_version': 'catalog-2'}
+
+        session.modified = False
+        assert store.get('tab')['catalog_version'] == 'catalog-2'
+        assert not session.modified